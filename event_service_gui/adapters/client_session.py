@@ -0,0 +1,134 @@
+"""Module for shared, pooled http sessions towards the backend services."""
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from aiohttp import ClientSession, TCPConnector, TraceConfig, web
+
+from event_service_gui.profiling import get_current_profile
+
+from .request_cache import invalidate_request_cache
+
+COMPETITION_FORMAT_SERVICE = "competition-format-service"
+EVENT_SERVICE = "event-service"
+PHOTO_SERVICE = "photo-service"
+RACE_SERVICE = "race-service"
+USER_SERVICE = "user-service"
+BACKEND_SERVICES = [
+    COMPETITION_FORMAT_SERVICE,
+    EVENT_SERVICE,
+    PHOTO_SERVICE,
+    RACE_SERVICE,
+    USER_SERVICE,
+]
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+
+# one session (and connection pool) per backend service and event loop
+_sessions: dict[str, tuple[ClientSession, asyncio.AbstractEventLoop]] = {}
+# sessions being closed, referenced so the tasks are not garbage collected
+_closing: set[asyncio.Task] = set()
+
+
+def get_pool_limit(service: str) -> int:
+    """Return max pooled connections for service, HTTP_POOL_LIMIT unless overridden."""
+    service_key = service.removesuffix("-service").replace("-", "_").upper()
+    return int(os.getenv(f"HTTP_POOL_LIMIT_{service_key}", str(HTTP_POOL_LIMIT)))
+
+
+async def _on_request_start(_session, trace_config_ctx, params) -> None:
+    """Start timing, forget memoized reads for the request if data may change."""
+    trace_config_ctx.started = time.perf_counter()
+    if params.method not in ("GET", "HEAD"):
+        invalidate_request_cache()
+
+
+async def _on_request_done(_session, _trace_config_ctx, params) -> None:
+    """Forget memoized reads again after a write, also those made while it ran."""
+    if params.method not in ("GET", "HEAD"):
+        invalidate_request_cache()
+
+
+def get_trace_configs(service: str) -> list[TraceConfig]:
+    """Return trace configs attached to the session of a backend service."""
+
+    async def on_request_done(_session, trace_config_ctx, _params) -> None:
+        # time spent by the backend call, counted for the incoming request
+        profile = get_current_profile()
+        if profile:
+            profile.add_backend_call(
+                service, time.perf_counter() - trace_config_ctx.started
+            )
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_request_end.append(on_request_done)
+    trace_config.on_request_end.append(_on_request_done)
+    trace_config.on_request_exception.append(on_request_done)
+    trace_config.on_request_exception.append(_on_request_done)
+    return [trace_config]
+
+
+def get_backend_session(service: str) -> ClientSession:
+    """Return the shared session for a backend service, create it if needed."""
+    loop = asyncio.get_running_loop()
+    if service in _sessions:
+        session, session_loop = _sessions[service]
+        if not session.closed and session_loop is loop:
+            return session
+        _drop_session(service, session, session_loop)
+    connector = TCPConnector(
+        limit=get_pool_limit(service),
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+    )
+    session = ClientSession(
+        connector=connector, trace_configs=get_trace_configs(service)
+    )
+    _sessions[service] = (session, loop)
+    logging.debug(f"Created pooled session for {service}")
+    return session
+
+
+def _drop_session(
+    service: str, session: ClientSession, session_loop: asyncio.AbstractEventLoop
+) -> None:
+    """Close a session left by another event loop, when that loop has closed."""
+    if session.closed:
+        return
+    if session_loop.is_closed():
+        task = asyncio.get_running_loop().create_task(session.close())
+        _closing.add(task)
+        task.add_done_callback(_closing.discard)
+        logging.debug(f"Closing session for {service} left by a closed event loop")
+    else:
+        logging.warning(f"Dropped session for {service} owned by another event loop")
+
+
+@asynccontextmanager
+async def backend_session(service: str) -> AsyncIterator[ClientSession]:
+    """Borrow the shared session for a backend service, kept open on exit."""
+    yield get_backend_session(service)
+
+
+async def close_backend_sessions() -> None:
+    """Close all shared sessions owned by the running event loop."""
+    loop = asyncio.get_running_loop()
+    for service, (session, session_loop) in list(_sessions.items()):
+        if session_loop is loop:
+            await session.close()
+            del _sessions[service]
+
+
+async def backend_sessions_ctx(_app: web.Application) -> AsyncIterator[None]:
+    """Open backend sessions on startup and close them on shutdown."""
+    for service in BACKEND_SERVICES:
+        get_backend_session(service)
+    yield
+    await close_backend_sessions()
@@ -6,9 +6,14 @@ import os
 from http import HTTPStatus
 from pathlib import Path
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import COMPETITION_FORMAT_SERVICE, backend_session
+from .request_cache import request_cached
+
 COMPETITION_FORMAT_HOST_SERVER = os.getenv(
     "COMPETITION_FORMAT_HOST_SERVER", "localhost"
 )
@@ -32,7 +37,7 @@ class CompetitionFormatAdapter:
         )
         url = f"{COMPETITION_FORMAT_SERVICE_URL}/competition-formats"
         async with (
-            ClientSession() as session,
+            backend_session(COMPETITION_FORMAT_SERVICE) as session,
             session.post(url, headers=headers, json=request_body) as resp,
         ):
             res = resp.status
@@ -41,12 +46,12 @@ class CompetitionFormatAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return f"Opprettet competition format {resp.status}."
 
@@ -60,7 +65,7 @@ class CompetitionFormatAdapter:
         )
         url = f"{COMPETITION_FORMAT_SERVICE_URL}/competition-formats/{my_id}"
         async with (
-            ClientSession() as session,
+            backend_session(COMPETITION_FORMAT_SERVICE) as session,
             session.delete(url, headers=headers) as resp,
         ):
             res = resp.status
@@ -69,15 +74,16 @@ class CompetitionFormatAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return f"Slettet competition format {resp.status}."
 
+    @request_cached
     async def get_competition_formats(self, token: str) -> list:
         """Get competition_formats function."""
         competition_formats = []
@@ -89,7 +95,7 @@ class CompetitionFormatAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(COMPETITION_FORMAT_SERVICE) as session,
             session.get(
                 f"{COMPETITION_FORMAT_SERVICE_URL}/competition-formats", headers=headers
             ) as resp,
@@ -102,13 +108,13 @@ class CompetitionFormatAdapter:
                 )
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 servicename = "get_competition_formats"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return competition_formats
 
@@ -152,7 +158,7 @@ class CompetitionFormatAdapter:
             f"{COMPETITION_FORMAT_SERVICE_URL}/competition-formats/{request_body['id']}"
         )
         async with (
-            ClientSession() as session,
+            backend_session(COMPETITION_FORMAT_SERVICE) as session,
             session.put(url, headers=headers, json=request_body) as resp,
         ):
             res = resp.status
@@ -161,12 +167,12 @@ class CompetitionFormatAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return f"Oppdatert competition format {resp.status}."
 
@@ -181,7 +187,7 @@ class CompetitionFormatAdapter:
         )
         url = f"{COMPETITION_FORMAT_SERVICE_URL}/race-configs"
         async with (
-            ClientSession() as session,
+            backend_session(COMPETITION_FORMAT_SERVICE) as session,
             session.post(url, headers=headers, json=request_body) as resp,
         ):
             res = resp.status
@@ -190,12 +196,12 @@ class CompetitionFormatAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return f"Opprettet race-config {resp.status}."
 
@@ -209,7 +215,7 @@ class CompetitionFormatAdapter:
         )
         url = f"{COMPETITION_FORMAT_SERVICE_URL}/race-configs/{my_id}"
         async with (
-            ClientSession() as session,
+            backend_session(COMPETITION_FORMAT_SERVICE) as session,
             session.delete(url, headers=headers) as resp,
         ):
             res = resp.status
@@ -218,15 +224,16 @@ class CompetitionFormatAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return f"Slettet race-config {resp.status}."
 
+    @request_cached
     async def get_race_configs(self, token: str) -> list:
         """Get race_configs function."""
         race_configs = []
@@ -238,7 +245,7 @@ class CompetitionFormatAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(COMPETITION_FORMAT_SERVICE) as session,
             session.get(
                 f"{COMPETITION_FORMAT_SERVICE_URL}/race-configs", headers=headers
             ) as resp,
@@ -249,13 +256,13 @@ class CompetitionFormatAdapter:
                 logging.debug(f"race_configs - got response {race_configs}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 servicename = "get_race_configs"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return race_configs
 
@@ -270,7 +277,7 @@ class CompetitionFormatAdapter:
         )
         url = f"{COMPETITION_FORMAT_SERVICE_URL}/race-configs/{request_body['id']}"
         async with (
-            ClientSession() as session,
+            backend_session(COMPETITION_FORMAT_SERVICE) as session,
             session.put(url, headers=headers, json=request_body) as resp,
         ):
             res = resp.status
@@ -279,11 +286,11 @@ class CompetitionFormatAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return f"Oppdatert race-config {resp.status}."
@@ -5,15 +5,18 @@ import json
 import logging
 import os
 from http import HTTPStatus
-from pathlib import Path
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import PHOTO_SERVICE, backend_session
+from .config_store import GLOBAL_SETTINGS_FILE, config_store
+
 PHOTOS_HOST_SERVER = os.getenv("PHOTOS_HOST_SERVER", "localhost")
 PHOTOS_HOST_PORT = os.getenv("PHOTOS_HOST_PORT", "8092")
 PHOTO_SERVICE_URL = f"http://{PHOTOS_HOST_SERVER}:{PHOTOS_HOST_PORT}"
-PROJECT_ROOT = f"{Path.cwd()}/event_service_gui"
 
 
 class ConfigAdapter:
@@ -31,7 +34,7 @@ class ConfigAdapter:
         servicename = "get_config"
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(
                 f"{PHOTO_SERVICE_URL}/config?key={key}&eventId={event_id}",
                 headers=headers,
@@ -41,25 +44,24 @@ class ConfigAdapter:
                 config = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise BackendError(resp.status, reason=informasjon)
             elif resp.status == HTTPStatus.NOT_FOUND:
                 # config not found - find default value
-                config_file = Path(f"{PROJECT_ROOT}/config/global_settings.json")
-                with config_file.open() as json_file:
-                    settings = json.load(json_file)
-                    if key in settings:
-                        value = settings[key]
-                        # create config
-                        await self.create_config(token, event_id, key, value)
-                        return value
+                settings = config_store.get_file(GLOBAL_SETTINGS_FILE)
+                if key in settings:
+                    value = settings[key]
+                    # create config
+                    await self.create_config(token, event_id, key, value)
+                    return value
+                config_file = config_store.path(GLOBAL_SETTINGS_FILE)
                 informasjon = f"Config {key} not found in config file {config_file}."
                 logging.error(informasjon)
-                raise web.HTTPBadRequest(reason=informasjon)
+                raise BackendError(resp.status, reason=informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
                 logging.error(informasjon)
-                raise web.HTTPBadRequest(reason=informasjon)
+                raise BackendError(resp.status, reason=informasjon)
         return config["value"]
 
     async def get_all_configs(self, token: str, event_id: str) -> list:
@@ -78,7 +80,7 @@ class ConfigAdapter:
             url = f"{PHOTO_SERVICE_URL}/configs"
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(
                 url,
                 headers=headers,
@@ -88,12 +90,12 @@ class ConfigAdapter:
                 config = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise BackendError(resp.status, reason=informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
                 logging.error(informasjon)
-                raise web.HTTPBadRequest(reason=informasjon)
+                raise BackendError(resp.status, reason=informasjon)
         return config
 
     async def get_config_bool(self, token: str, event_id: str, key: str) -> bool:
@@ -155,7 +157,7 @@ class ConfigAdapter:
         request_body = copy.deepcopy(config)
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.post(
                 f"{PHOTO_SERVICE_URL}/config",
                 headers=headers,
@@ -168,12 +170,12 @@ class ConfigAdapter:
                 result = location.split(os.path.sep)[-1]
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise BackendError(resp.status, reason=informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
                 logging.error(informasjon)
-                raise web.HTTPBadRequest(reason=informasjon)
+                raise BackendError(resp.status, reason=informasjon)
 
         return result
 
@@ -211,7 +213,7 @@ class ConfigAdapter:
         }
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.put(
                 f"{PHOTO_SERVICE_URL}/config",
                 headers=headers,
@@ -223,23 +225,22 @@ class ConfigAdapter:
                 logging.debug(f"update config - got response {resp}")
             elif resp.status == HTTPStatus.NOT_FOUND:
                 # config not found - find default value
-                config_file = Path(f"{PROJECT_ROOT}/config/global_settings.json")
-                with config_file.open() as json_file:
-                    settings = json.load(json_file)
-                    if key in settings:
-                        value = settings[key]
-                        # create config
-                        await self.create_config(token, event_id, key, value)
-                        return value
+                settings = config_store.get_file(GLOBAL_SETTINGS_FILE)
+                if key in settings:
+                    value = settings[key]
+                    # create config
+                    await self.create_config(token, event_id, key, value)
+                    return value
+                config_file = config_store.path(GLOBAL_SETTINGS_FILE)
                 informasjon = f"Config {key} not found in config file {config_file}."
                 logging.error(informasjon)
-                raise web.HTTPBadRequest(reason=informasjon)
+                raise BackendError(resp.status, reason=informasjon)
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise BackendError(resp.status, reason=informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
                 logging.error(informasjon)
-                raise web.HTTPBadRequest(reason=informasjon)
+                raise BackendError(resp.status, reason=informasjon)
         return response
@@ -0,0 +1,72 @@
+"""Module for json config files kept in memory."""
+
+import copy
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+CONFIG_DIR = f"{Path.cwd()}/event_service_gui/config"
+CONFIG_RELOAD_INTERVAL = float(os.getenv("CONFIG_RELOAD_INTERVAL", "5"))
+GLOBAL_SETTINGS_FILE = "global_settings.json"
+SPORTS_CLUBS_FILE = "sports_clubs.json"
+
+
+class ConfigStore:
+    """Class representing json config files in memory, reloaded when changed on disk."""
+
+    def __init__(
+        self,
+        config_dir: str = CONFIG_DIR,
+        reload_interval: float = CONFIG_RELOAD_INTERVAL,
+    ) -> None:
+        """Initialize an empty store."""
+        self.config_dir = config_dir
+        self.reload_interval = reload_interval
+        # file name -> (mtime, next time to check mtime, parsed content)
+        self._files: dict[str, tuple[float, float, dict]] = {}
+
+    def path(self, file_name: str) -> Path:
+        """Return path to a config file."""
+        return Path(self.config_dir) / file_name
+
+    def get_file(self, file_name: str) -> dict:
+        """Return a copy of the parsed content of a config file."""
+        return copy.deepcopy(self._content(file_name))
+
+    def get(self, file_name: str, key: str) -> str:
+        """Return value for key in a config file - KeyError if not found."""
+        return copy.deepcopy(self._content(file_name)[key])
+
+    def _content(self, file_name: str) -> dict:
+        """Return shared parsed content of a config file, reload if changed on disk."""
+        now = time.monotonic()
+        cached = self._files.get(file_name)
+        if cached and now < cached[1]:
+            return cached[2]
+        config_file = self.path(file_name)
+        try:
+            mtime = config_file.stat().st_mtime
+            if cached and cached[0] == mtime:
+                content = cached[2]
+            else:
+                with config_file.open() as json_file:
+                    content = json.load(json_file)
+                logging.debug(f"Loaded config file {config_file}")
+        except (OSError, ValueError):
+            if not cached:
+                raise
+            # e.g. the file is being written - keep last good content, try again later
+            logging.exception(f"Error reloading config file {config_file}")
+            mtime, content = cached[0], cached[2]
+        self._files[file_name] = (mtime, now + self.reload_interval, content)
+        return content
+
+    def load(self) -> None:
+        """Load the config files used by the application, e.g. at startup."""
+        for file_name in [GLOBAL_SETTINGS_FILE, SPORTS_CLUBS_FILE]:
+            self._content(file_name)
+
+
+config_store = ConfigStore()
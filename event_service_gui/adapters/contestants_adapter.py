@@ -8,9 +8,14 @@ from datetime import datetime
 from http import HTTPStatus
 from typing import Any
 
-from aiohttp import ClientSession, FormData, hdrs, web
+from aiohttp import FormData, hdrs, web
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import EVENT_SERVICE, backend_session
+from .event_cache import event_cached, invalidates
+from .request_cache import request_cached
 from .start_adapter import StartAdapter
 
 EVENTS_HOST_SERVER = os.getenv("EVENTS_HOST_SERVER", "localhost")
@@ -35,6 +40,7 @@ class ContestantsAdapter:
                 continue
         raise ValueError(f"Ugyldig fødselsdato '{value}'. Forventet format: DD.MM.YYYY.")
 
+    @invalidates("contestants", "raceclasses")
     async def assign_bibs(
         self, token: str, event_id: str, start_bib: int | None = None
     ) -> str:
@@ -46,7 +52,7 @@ class ContestantsAdapter:
         if start_bib:
             url += f"?start-bib={start_bib}"
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.post(url, headers=headers) as resp,
         ):
             res = resp.status
@@ -55,15 +61,16 @@ class ContestantsAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return "Startnummer tildelt."
 
+    @invalidates("contestants", "raceclasses")
     async def create_contestant(
         self, token: str, event_id: str, request_body: dict
     ) -> str:
@@ -83,7 +90,7 @@ class ContestantsAdapter:
         # Exclude values that are empty or None - this allows for partial updates
         request_body = {k: v for k, v in request_body.items() if v not in ("", None)}
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.post(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants",
                 headers=headers,
@@ -94,13 +101,14 @@ class ContestantsAdapter:
                 logging.debug(f"result - got response {resp}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
                 return body["detail"]
         return "201"
 
+    @invalidates("contestants", "raceclasses")
     async def create_contestants(
         self, token: str, event_id: str, inputfile: Any
     ) -> str:
@@ -115,9 +123,10 @@ class ContestantsAdapter:
             "file",
             inputfile,
             content_type="text/csv",
+            filename="file",
         )
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.post(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants/file",
                 headers=headers,
@@ -130,12 +139,12 @@ class ContestantsAdapter:
                 body = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         # trying to parse result - skip if it fails
         informasjon = ""
@@ -154,6 +163,7 @@ class ContestantsAdapter:
 
         return informasjon
 
+    @invalidates("contestants", "raceclasses")
     async def delete_all_contestants(self, token: str, event_id: str) -> str:
         """Delete all contestants in one event function."""
         servicename = "delete_all_contestants"
@@ -162,7 +172,7 @@ class ContestantsAdapter:
         }
 
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.delete(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants",
                 headers=headers,
@@ -174,15 +184,16 @@ class ContestantsAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(res)
 
+    @invalidates("contestants", "raceclasses")
     async def delete_contestant(
         self, token: str, event_id: str, contestant: dict
     ) -> str:
@@ -205,7 +216,7 @@ class ContestantsAdapter:
             hdrs.AUTHORIZATION: f"Bearer {token}",
         }
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.delete(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants/{contestant['id']}",
                 headers=headers,
@@ -217,15 +228,17 @@ class ContestantsAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(res)
 
+    @request_cached
+    @event_cached("contestants")
     async def get_all_contestants(self, token: str, event_id: str) -> list:
         """Get all contestants function."""
         headers = MultiDict(
@@ -236,7 +249,7 @@ class ContestantsAdapter:
         )
         contestants = []
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants", headers=headers
             ) as resp,
@@ -248,11 +261,12 @@ class ContestantsAdapter:
                 servicename = "get_all_contestants"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return contestants
 
+    @request_cached
     async def get_all_contestants_by_ageclass(
         self, token: str, event_id: str, ageclass_name: str
     ) -> list:
@@ -267,7 +281,7 @@ class ContestantsAdapter:
         ageclass_name_url = urllib.parse.quote(ageclass_name, safe="")
         query_param = f"ageclass={ageclass_name_url}"
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants?{query_param}",
                 headers=headers,
@@ -280,11 +294,12 @@ class ContestantsAdapter:
                 servicename = "get_all_contestants_by_ageclass"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return contestants
 
+    @request_cached
     async def get_all_contestants_by_raceclass(
         self, token: str, event_id: str, raceclass_name: str
     ) -> list:
@@ -298,7 +313,7 @@ class ContestantsAdapter:
         contestants = []
         raceclass_name_url = urllib.parse.quote(raceclass_name, safe="")
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants?raceclass={raceclass_name_url}",
                 headers=headers,
@@ -315,11 +330,12 @@ class ContestantsAdapter:
                 logging.error(
                     f"{servicename} ({raceclass_name}) failed - {resp.status} - {body}"
                 )
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return contestants
 
+    @request_cached
     async def get_contestant_by_bib(self, token: str, event_id: str, bib: int) -> dict:
         """Get contestant by bib function."""
         headers = MultiDict(
@@ -330,7 +346,7 @@ class ContestantsAdapter:
         )
         contestant = []
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants?bib={bib}",
                 headers=headers,
@@ -343,13 +359,14 @@ class ContestantsAdapter:
                 servicename = "get_contestants_by_bib"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         if len(contestant) == 0:
             return {}
         return contestant[0]
 
+    @request_cached
     async def get_contestants_by_raceclass(
         self, token: str, event_id: str, raceclass: str
     ) -> list:
@@ -363,7 +380,7 @@ class ContestantsAdapter:
         contestants = []
         raceclass_url = urllib.parse.quote(raceclass, safe="")
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants?raceclass={raceclass_url}",
                 headers=headers,
@@ -376,11 +393,12 @@ class ContestantsAdapter:
                 servicename = "get_contestants_by_raceclass"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return contestants
 
+    @request_cached
     async def get_contestant(
         self, token: str, event_id: str, contestant_id: str
     ) -> dict:
@@ -393,7 +411,7 @@ class ContestantsAdapter:
         )
         contestant = {}
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants/{contestant_id}",
                 headers=headers,
@@ -406,8 +424,8 @@ class ContestantsAdapter:
                 servicename = "get_contestant"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return contestant
 
@@ -425,7 +443,7 @@ class ContestantsAdapter:
             ]
         )
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.post(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/contestants/search",
                 headers=headers,
@@ -437,15 +455,16 @@ class ContestantsAdapter:
                 logging.debug(f"result - got response {resp}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"{resp.status} Error - {body['detail']}"
+                raise BackendError(
+                    resp.status, reason=f"{resp.status} Error - {body['detail']}"
                 )
         return contestants
 
+    @invalidates("contestants", "raceclasses")
     async def update_contestant(
         self, token: str, event_id: str, contestant: dict
     ) -> str:
@@ -475,7 +494,7 @@ class ContestantsAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.put(url, headers=headers, json=request_body) as resp,
         ):
             res = resp.status
@@ -483,12 +502,12 @@ class ContestantsAdapter:
                 logging.debug(f"result - got response {resp}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
 
         return str(resp.status)
@@ -0,0 +1,178 @@
+"""Module for process wide caching of event data that rarely changes."""
+
+import copy
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "200"))
+# off by default - invalidation only reaches the process making the write
+CACHE_TTLS = {
+    "contestants": float(os.getenv("CACHE_TTL_CONTESTANTS", "0")),
+    "raceclasses": float(os.getenv("CACHE_TTL_RACECLASSES", "0")),
+    "races": float(os.getenv("CACHE_TTL_RACES", "0")),
+}
+# "time_events" is never cached, writes only bump its generation for the poller
+# values computed from other cached data, and the namespaces they depend on
+CACHE_DEPENDENCIES = {
+    "late_registration": ("races", "raceclasses"),
+}
+CACHE_TTLS["late_registration"] = min(
+    CACHE_TTLS[namespace] for namespace in CACHE_DEPENDENCIES["late_registration"]
+)
+
+
+class EventCache:
+    """Class representing an LRU cache with time to live, per namespace, event and user."""
+
+    def __init__(self, max_entries: int) -> None:
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._generations: dict[tuple, int] = {}
+
+    def get(self, namespace: str, event_id: str, token: str) -> tuple[bool, Any]:
+        """Return (found, value) - expired entries are not found."""
+        key = (namespace, event_id, principal(token))
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(  # noqa: PLR0913
+        self,
+        namespace: str,
+        event_id: str,
+        token: str,
+        value: Any,
+        *,
+        ttl: float,
+        generation: int,
+    ) -> None:
+        """Store value, unless invalidated since generation was read."""
+        key = (namespace, event_id, principal(token))
+        if ttl <= 0 or generation != self.generation(namespace, event_id):
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def generation(self, namespace: str, event_id: str) -> int:
+        """Return a counter that changes every time the entry is invalidated."""
+        return sum(
+            self._generations.get((source, key), 0)
+            for source in (namespace, *CACHE_DEPENDENCIES.get(namespace, ()))
+            for key in (event_id, None)
+        )
+
+    def invalidate(self, namespace: str, event_id: str | None = None) -> None:
+        """Remove entry for one event, or for all events if event_id is None."""
+        key = (namespace, event_id)
+        self._generations[key] = self._generations.get(key, 0) + 1
+        namespaces = {namespace} | {
+            derived
+            for derived, sources in CACHE_DEPENDENCIES.items()
+            if namespace in sources
+        }
+        for cached_key in [
+            k for k in self._entries if k[0] in namespaces and event_id in (None, k[1])
+        ]:
+            del self._entries[cached_key]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+
+event_cache = EventCache(CACHE_MAX_ENTRIES)
+
+
+def principal(token: str) -> str:
+    """Return key of the user behind a token, so data is only served to its reader."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def event_cached(
+    namespace: str,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorate an adapter read method (self, token, event_id) to be cached per event."""
+
+    def decorator(
+        func: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        async def shared(self, token: str, event_id: str) -> Any:
+            found, value = event_cache.get(namespace, event_id, token)
+            if not found:
+                generation = event_cache.generation(namespace, event_id)
+                value = await func(self, token, event_id)
+                event_cache.set(
+                    namespace,
+                    event_id,
+                    token,
+                    value,
+                    ttl=CACHE_TTLS[namespace],
+                    generation=generation,
+                )
+            else:
+                logging.debug(f"event_cache hit - {namespace} {event_id}")
+            return value
+
+        @functools.wraps(func)
+        async def wrapper(self, token: str, event_id: str) -> Any:
+            return copy.deepcopy(await shared(self, token, event_id))
+
+        # lets request_cached copy the shared value once, instead of twice
+        wrapper.shared = shared  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+def invalidates(
+    *namespaces: str,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorate an adapter write method to invalidate cached data of the event."""
+
+    def decorator(
+        func: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(func)
+
+        def invalidate(event_id: str | None) -> None:
+            for namespace in namespaces:
+                event_cache.invalidate(namespace, event_id)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            event_id = find_event_id(signature.bind(*args, **kwargs).arguments)
+            invalidate(event_id)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                invalidate(event_id)
+
+        return wrapper
+
+    return decorator
+
+
+def find_event_id(arguments: dict) -> str | None:
+    """Find event_id among the arguments to a method call."""
+    if arguments.get("event_id"):
+        return arguments["event_id"]
+    for value in arguments.values():
+        if isinstance(value, dict) and value.get("event_id"):
+            return value["event_id"]
+    return None
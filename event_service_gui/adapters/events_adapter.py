@@ -2,17 +2,21 @@
 
 import copy
 import datetime
-import json
 import logging
 import os
 from http import HTTPStatus
-from pathlib import Path
 from zoneinfo import ZoneInfo
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import EVENT_SERVICE, backend_session
 from .competition_format_adapter import CompetitionFormatAdapter
+from .config_store import GLOBAL_SETTINGS_FILE, SPORTS_CLUBS_FILE, config_store
+from .event_cache import invalidates
+from .request_cache import request_cached
 
 EVENTS_HOST_SERVER = os.getenv("EVENTS_HOST_SERVER", "localhost")
 EVENTS_HOST_PORT = os.getenv("EVENTS_HOST_PORT", "8082")
@@ -22,6 +26,7 @@ EVENT_SERVICE_URL = f"http://{EVENTS_HOST_SERVER}:{EVENTS_HOST_PORT}"
 class EventsAdapter:
     """Class representing events."""
 
+    @invalidates("contestants", "raceclasses", "races")
     async def generate_classes(self, token: str, event_id: str) -> str:
         """Generate classes based upon registered contestants."""
         servicename = "generate_classes"
@@ -32,7 +37,7 @@ class EventsAdapter:
         )
         url = f"{EVENT_SERVICE_URL}/events/{event_id}/generate-raceclasses"
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.post(url, headers=headers) as resp,
         ):
             res = resp.status
@@ -41,15 +46,16 @@ class EventsAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return "Opprettet klasser."
 
+    @request_cached
     async def get_all_events(self, token: str) -> list:
         """Get all events function."""
         events = []
@@ -61,7 +67,7 @@ class EventsAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(f"{EVENT_SERVICE_URL}/events", headers=headers) as resp,
         ):
             logging.debug(f"get_all_events - got response {resp.status}")
@@ -70,12 +76,13 @@ class EventsAdapter:
                 logging.debug(f"events - got response {events}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
 
             else:
                 logging.error(f"Error {resp.status} getting events: {resp} ")
         return events
 
+    @request_cached
     async def get_event(self, token: str, my_id: str) -> dict:
         """Get event function."""
         event = {}
@@ -87,7 +94,7 @@ class EventsAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(f"{EVENT_SERVICE_URL}/events/{my_id}", headers=headers) as resp,
         ):
             logging.debug(f"get_event {my_id} - got response {resp.status}")
@@ -96,29 +103,24 @@ class EventsAdapter:
                 logging.debug(f"event - got response {event}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
 
             else:
                 servicename = "get_event"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return event
 
     def get_global_setting(self, param_name: str) -> str:
         """Get global settings from .env file."""
-        config_file = Path(
-            f"{Path.cwd()}/event_service_gui/config/global_settings.json"
-        )
         try:
-            with config_file.open() as json_file:
-                settings = json.load(json_file)
-                global_setting = settings[param_name]
+            global_setting = config_store.get(GLOBAL_SETTINGS_FILE, param_name)
         except Exception as e:
             logging.exception(
-                f"Global setting {param_name} not found. File path {config_file}"
+                f"Global setting {param_name} not found. File path {config_store.path(GLOBAL_SETTINGS_FILE)}"
             )
             raise Exception from e
         return global_setting
@@ -172,14 +174,11 @@ class EventsAdapter:
 
     def get_club_logo_url(self, club_name: str) -> str:
         """Get url to club logo - input is 4 first chars of club name."""
-        config_file = Path(f"{Path.cwd()}/event_service_gui/config/sports_clubs.json")
         logo_url = ""
         if club_name:
             try:
                 club_name_short = club_name[:4].ljust(4)
-                with config_file.open() as json_file:
-                    logo_urls = json.load(json_file)
-                logo_url = logo_urls[club_name_short]
+                logo_url = config_store.get(SPORTS_CLUBS_FILE, club_name_short)
             except Exception:
                 logging.exception(f"Club logo not found - {club_name}")
         return logo_url
@@ -214,7 +213,7 @@ class EventsAdapter:
         # Exclude values that are empty strings or None, as the event service will set default values for these
         request_body = {k: v for k, v in request_body.items() if v not in ["", None]}
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.post(
                 f"{EVENT_SERVICE_URL}/events", headers=headers, json=request_body
             ) as resp,
@@ -225,15 +224,16 @@ class EventsAdapter:
                 result = location.split(os.path.sep)[-1]
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return result
 
+    @invalidates("contestants", "raceclasses", "races")
     async def delete_event(self, token: str, my_id: str) -> str:
         """Delete event function."""
         servicename = "delete_event"
@@ -245,7 +245,7 @@ class EventsAdapter:
         )
         url = f"{EVENT_SERVICE_URL}/events/{my_id}"
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.delete(url, headers=headers) as resp,
         ):
             if resp.status == HTTPStatus.NO_CONTENT:
@@ -253,8 +253,8 @@ class EventsAdapter:
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(resp.status)
 
@@ -269,7 +269,7 @@ class EventsAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.put(
                 f"{EVENT_SERVICE_URL}/events/{my_id}",
                 headers=headers,
@@ -281,11 +281,11 @@ class EventsAdapter:
                 logging.debug(f"update event - got response {resp}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(result)
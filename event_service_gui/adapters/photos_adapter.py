@@ -5,9 +5,13 @@ import logging
 import os
 from http import HTTPStatus
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import PHOTO_SERVICE, backend_session
+
 PHOTOS_HOST_SERVER = os.getenv("PHOTOS_HOST_SERVER", "localhost")
 PHOTOS_HOST_PORT = os.getenv("PHOTOS_HOST_PORT", "8092")
 PHOTO_SERVICE_URL = f"http://{PHOTOS_HOST_SERVER}:{PHOTOS_HOST_PORT}"
@@ -34,7 +38,7 @@ class PhotosAdapter:
             url += f"&limit={limit}"
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(url, headers=headers) as resp,
         ):
             if resp.status == HTTPStatus.OK:
@@ -42,7 +46,7 @@ class PhotosAdapter:
                 logging.debug(f"photos - got response {photos}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 logging.error(f"Error {resp.status} getting photos: {resp} ")
 
@@ -59,7 +63,7 @@ class PhotosAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(f"{PHOTO_SERVICE_URL}/photos/{my_id}", headers=headers) as resp,
         ):
             logging.debug(f"get_photo {my_id} - got response {resp.status}")
@@ -68,13 +72,13 @@ class PhotosAdapter:
                 logging.debug(f"photo - got response {photo}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 servicename = "get_photo"
                 body = await resp.json()
                 logging.debug(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return photo
 
@@ -97,7 +101,7 @@ class PhotosAdapter:
             url += f"&limit={limit}"
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(url, headers=headers) as resp,
         ):
             if resp.status == HTTPStatus.OK:
@@ -105,7 +109,7 @@ class PhotosAdapter:
                 logging.debug(f"photos - got response {photos}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 logging.error(f"Error {resp.status} getting photos: {resp} ")
         return photos
@@ -133,7 +137,7 @@ class PhotosAdapter:
             url += f"&limit={limit}"
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(url, headers=headers) as resp,
         ):
             logging.debug(f"get_photos_by_raceclass - got response {resp.status}")
@@ -142,7 +146,7 @@ class PhotosAdapter:
                 logging.debug(f"photos - got response {photos}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 logging.error(f"Error {resp.status} getting photos: {resp} ")
         return photos
@@ -158,7 +162,7 @@ class PhotosAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(
                 f"{PHOTO_SERVICE_URL}/photos?gBaseUrl={g_base_url}", headers=headers
             ) as resp,
@@ -170,13 +174,13 @@ class PhotosAdapter:
                 photo = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 servicename = "get_photo_by_g_base_url"
                 body = await resp.json()
                 logging.debug(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return photo
 
@@ -193,7 +197,7 @@ class PhotosAdapter:
         request_body = copy.deepcopy(photo)
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.post(
                 f"{PHOTO_SERVICE_URL}/photos", headers=headers, json=request_body
             ) as resp,
@@ -204,12 +208,12 @@ class PhotosAdapter:
                 result = location.split(os.path.sep)[-1]
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return result
 
@@ -224,7 +228,7 @@ class PhotosAdapter:
         )
         url = f"{PHOTO_SERVICE_URL}/photos/{my_id}"
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.delete(url, headers=headers) as resp,
         ):
             logging.debug(f"Delete photo: {my_id} - res {resp.status}")
@@ -232,7 +236,9 @@ class PhotosAdapter:
                 logging.debug(f"result - got response {resp}")
             else:
                 logging.error(f"{servicename} failed - {resp.status} - {resp}")
-                raise web.HTTPBadRequest(reason=f"Error - {resp.status}: {resp}.")
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {resp}."
+                )
         return resp.status
 
     async def update_photo(self, token: str, my_id: str, request_body: dict) -> int:
@@ -247,7 +253,7 @@ class PhotosAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.put(
                 f"{PHOTO_SERVICE_URL}/photos/{my_id}",
                 headers=headers,
@@ -259,12 +265,12 @@ class PhotosAdapter:
                 logging.debug(f"update photo - got response {resp}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
             logging.debug(f"Updated photo: {my_id} - res {resp.status}")
         return result
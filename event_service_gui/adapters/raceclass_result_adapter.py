@@ -5,9 +5,13 @@ import os
 import random
 import urllib.parse
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import EVENT_SERVICE, backend_session
+
 EVENTS_HOST_SERVER = os.getenv("EVENTS_HOST_SERVER", "localhost")
 EVENTS_HOST_PORT = os.getenv("EVENTS_HOST_PORT", "8082")
 EVENT_SERVICE_URL = f"http://{EVENTS_HOST_SERVER}:{EVENTS_HOST_PORT}"
@@ -28,7 +32,7 @@ class RaceclassResultsAdapter:
                 (hdrs.AUTHORIZATION, f"Bearer {token}"),
             ]
         )
-        async with ClientSession() as session:
+        async with backend_session(EVENT_SERVICE) as session:
             async with session.post(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/results",
                 headers=headers,
@@ -40,12 +44,14 @@ class RaceclassResultsAdapter:
                     w_id = location.split(os.path.sep)[-1]
                     logging.debug(f"{servicename} - got response {resp}, id {w_id}")
                 elif resp.status == 401:
-                    raise web.HTTPBadRequest(reason=f"401 Unathorized - {servicename}")
+                    raise BackendError(
+                        resp.status, reason=f"401 Unathorized - {servicename}"
+                    )
                 else:
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
 
         return res
@@ -60,7 +66,7 @@ class RaceclassResultsAdapter:
         }
         raceclass_url = urllib.parse.quote(raceclass, safe="")
 
-        async with ClientSession() as session:
+        async with backend_session(EVENT_SERVICE) as session:
             async with session.delete(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/results/{raceclass_url}",
                 headers=headers,
@@ -70,12 +76,14 @@ class RaceclassResultsAdapter:
                 if res == 204:
                     pass
                 elif resp.status == 401:
-                    raise web.HTTPBadRequest(reason=f"401 Unathorized - {servicename}")
+                    raise BackendError(
+                        resp.status, reason=f"401 Unathorized - {servicename}"
+                    )
                 else:
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return res
 
@@ -89,7 +97,7 @@ class RaceclassResultsAdapter:
         servicename = "get_raceclass_result"
         raceclass_result = {}
         raceclass_url = urllib.parse.quote(raceclass, safe="")
-        async with ClientSession() as session:
+        async with backend_session(EVENT_SERVICE) as session:
             async with session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/results/{raceclass_url}",
                 headers=headers,
@@ -99,14 +107,15 @@ class RaceclassResultsAdapter:
                     raceclass_result = await resp.json()
                 elif resp.status == 404:
                     # No results yet for this raceclass
-                    raise web.HTTPBadRequest(
-                        reason=f"Resultater er ikke klare for {raceclass_url}."
+                    raise BackendError(
+                        resp.status,
+                        reason=f"Resultater er ikke klare for {raceclass_url}.",
                     )
                 else:
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return raceclass_result
 
@@ -132,7 +141,7 @@ class RaceclassResultsAdapter:
                 (hdrs.CONTENT_TYPE, "application/json"),
             ]
         )
-        async with ClientSession() as session:
+        async with backend_session(EVENT_SERVICE) as session:
             async with session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/results", headers=headers
             ) as resp:
@@ -142,8 +151,8 @@ class RaceclassResultsAdapter:
                 else:
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return raceclass_results
 
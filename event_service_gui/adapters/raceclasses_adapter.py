@@ -5,9 +5,15 @@ import os
 import urllib.parse
 from http import HTTPStatus
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import EVENT_SERVICE, backend_session
+from .event_cache import event_cached, invalidates
+from .request_cache import request_cached
+
 EVENTS_HOST_SERVER = os.getenv("EVENTS_HOST_SERVER", "localhost")
 EVENTS_HOST_PORT = os.getenv("EVENTS_HOST_PORT", "8082")
 EVENT_SERVICE_URL = f"http://{EVENTS_HOST_SERVER}:{EVENTS_HOST_PORT}"
@@ -16,6 +22,7 @@ EVENT_SERVICE_URL = f"http://{EVENTS_HOST_SERVER}:{EVENTS_HOST_PORT}"
 class RaceclassesAdapter:
     """Class representing raceclasses."""
 
+    @invalidates("raceclasses")
     async def create_raceclass(
         self, token: str, event_id: str, request_body: dict
     ) -> str:
@@ -30,7 +37,7 @@ class RaceclassesAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.post(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/raceclasses",
                 headers=headers,
@@ -43,15 +50,16 @@ class RaceclassesAdapter:
                 result = location.split(os.path.sep)[-1]
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return result
 
+    @invalidates("raceclasses")
     async def delete_all_raceclasses(self, token: str, event_id: str) -> str:
         """Delete all raceclasses in one event function."""
         servicename = "delete_all_raceclasses"
@@ -60,7 +68,7 @@ class RaceclassesAdapter:
         }
 
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.delete(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/raceclasses",
                 headers=headers,
@@ -72,15 +80,16 @@ class RaceclassesAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(res)
 
+    @invalidates("raceclasses")
     async def delete_raceclass(
         self, token: str, event_id: str, raceclass_id: str
     ) -> str:
@@ -91,7 +100,7 @@ class RaceclassesAdapter:
         }
 
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.delete(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/raceclasses/{raceclass_id}",
                 headers=headers,
@@ -103,15 +112,16 @@ class RaceclassesAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(res)
 
+    @request_cached
     async def get_raceclass(self, token: str, event_id: str, raceclass_id: str) -> dict:
         """Get all raceclass function."""
         headers = MultiDict(
@@ -122,7 +132,7 @@ class RaceclassesAdapter:
         )
         raceclass = {}
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/raceclasses/{raceclass_id}",
                 headers=headers,
@@ -135,8 +145,8 @@ class RaceclassesAdapter:
                 servicename = "get_raceclass"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return raceclass
 
@@ -148,6 +158,7 @@ class RaceclassesAdapter:
                 return raceclass
         return {}
 
+    @request_cached
     async def get_raceclass_by_ageclass(
         self, token: str, event_id: str, ageclass: str
     ) -> dict:
@@ -161,7 +172,7 @@ class RaceclassesAdapter:
         raceclass = {}
         ageclass_url = urllib.parse.quote(ageclass, safe="")
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/raceclasses?ageclass-name={ageclass_url}",
                 headers=headers,
@@ -174,11 +185,13 @@ class RaceclassesAdapter:
                 servicename = "get_raceclass_by_ageclass"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return raceclass[0]
 
+    @request_cached
+    @event_cached("raceclasses")
     async def get_raceclasses(self, token: str, event_id: str) -> list:
         """Get all raceclasses function."""
         raceclasses = []
@@ -189,7 +202,7 @@ class RaceclassesAdapter:
             ]
         )
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.get(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/raceclasses", headers=headers
             ) as resp,
@@ -209,11 +222,12 @@ class RaceclassesAdapter:
                 servicename = "get_raceclasses"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return raceclasses
 
+    @invalidates("raceclasses")
     async def update_raceclass(
         self, token: str, event_id: str, my_id: str, new_data: dict
     ) -> int:
@@ -226,7 +240,7 @@ class RaceclassesAdapter:
             ]
         )
         async with (
-            ClientSession() as session,
+            backend_session(EVENT_SERVICE) as session,
             session.put(
                 f"{EVENT_SERVICE_URL}/events/{event_id}/raceclasses/{my_id}",
                 headers=headers,
@@ -238,11 +252,11 @@ class RaceclassesAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return resp.status
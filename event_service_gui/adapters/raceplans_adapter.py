@@ -5,9 +5,16 @@ import logging
 import os
 from http import HTTPStatus
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import ClientResponseError, hdrs, web
 from multidict import MultiDict
 
+from event_service_gui.concurrency import is_transient, run_bulk
+from event_service_gui.errors import BackendError
+
+from .client_session import RACE_SERVICE, backend_session
+from .event_cache import event_cached, invalidates
+from .request_cache import request_cached
+
 RACE_HOST_SERVER = os.getenv("RACE_HOST_SERVER", "localhost")
 RACE_HOST_PORT = os.getenv("RACE_HOST_PORT", "8088")
 RACE_SERVICE_URL = f"http://{RACE_HOST_SERVER}:{RACE_HOST_PORT}"
@@ -16,6 +23,7 @@ RACE_SERVICE_URL = f"http://{RACE_HOST_SERVER}:{RACE_HOST_PORT}"
 class RaceplansAdapter:
     """Class representing raceplans."""
 
+    @invalidates("races")
     async def delete_race(self, token: str, race_id: str) -> str:
         """Delete one race function."""
         servicename = "delete_race"
@@ -23,7 +31,7 @@ class RaceplansAdapter:
             hdrs.AUTHORIZATION: f"Bearer {token}",
         }
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.delete(
                 f"{RACE_SERVICE_URL}/races/{race_id}",
                 headers=headers,
@@ -35,15 +43,16 @@ class RaceplansAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(res)
 
+    @invalidates("races")
     async def delete_raceplans(self, token: str, event_id: str) -> str:
         """Delete all raceplans in one event function."""
         servicename = "delete_raceplan"
@@ -55,7 +64,7 @@ class RaceplansAdapter:
         }
         logging.info(f"delete raceplans, id: {raceplan['id']}")
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.delete(
                 f"{RACE_SERVICE_URL}/raceplans/{raceplan['id']}",
                 headers=headers,
@@ -67,15 +76,16 @@ class RaceplansAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(res)
 
+    @invalidates("races")
     async def generate_raceplan(self, token: str, event_id: str) -> int:
         """Generate classes based upon registered contestants."""
         servicename = "generate_raceplan"
@@ -87,7 +97,7 @@ class RaceplansAdapter:
         request_body = {"event_id": event_id}
         url = f"{RACE_SERVICE_URL}/raceplans/generate-raceplan-for-event"
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.post(url, headers=headers, json=request_body) as resp,
         ):
             res = resp.status
@@ -96,15 +106,16 @@ class RaceplansAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return res
 
+    @request_cached
     async def get_all_raceplans(self, token: str, event_id: str) -> list:
         """Get all raceplans for event function."""
         headers = MultiDict(
@@ -114,7 +125,7 @@ class RaceplansAdapter:
         )
         raceplans = []
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.get(
                 f"{RACE_SERVICE_URL}/raceplans?eventId={event_id}", headers=headers
             ) as resp,
@@ -124,17 +135,19 @@ class RaceplansAdapter:
                 raceplans = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
 
             else:
                 servicename = "get_all_raceplans"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return raceplans
 
+    @request_cached
+    @event_cached("races")
     async def get_all_races(self, token: str, event_id: str) -> list:
         """Get all races for event function."""
         headers = MultiDict(
@@ -144,7 +157,7 @@ class RaceplansAdapter:
         )
         races = []
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.get(
                 f"{RACE_SERVICE_URL}/races?eventId={event_id}", headers=headers
             ) as resp,
@@ -154,14 +167,14 @@ class RaceplansAdapter:
                 races = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
 
             else:
                 servicename = "get_all_races"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         # ensure that round always exists by setting F(inal) if missing
         for race in races:
@@ -171,6 +184,7 @@ class RaceplansAdapter:
             race["index"] = ""
         return races
 
+    @request_cached
     async def get_race_by_id(self, token: str, race_id: str) -> dict:
         """Get one race for event function."""
         headers = MultiDict(
@@ -180,7 +194,7 @@ class RaceplansAdapter:
         )
         race = {}
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.get(f"{RACE_SERVICE_URL}/races/{race_id}", headers=headers) as resp,
         ):
             logging.debug(f"get_race_by_id - got response {resp.status}")
@@ -188,14 +202,14 @@ class RaceplansAdapter:
                 race = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
 
             else:
                 servicename = "get_race_by_id"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         # ensure that round always exists by setting F(inal) if missing
         if "round" in race:
@@ -223,6 +237,7 @@ class RaceplansAdapter:
             race["index"] = ""
         return race
 
+    @request_cached
     async def get_races_by_racesclass(
         self, token: str, event_id: str, valgt_klasse: str
     ) -> list:
@@ -234,7 +249,7 @@ class RaceplansAdapter:
         )
         races = []
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.get(
                 f"{RACE_SERVICE_URL}/races?eventId={event_id}&raceclass={valgt_klasse}",
                 headers=headers,
@@ -245,14 +260,14 @@ class RaceplansAdapter:
                 races = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
 
             else:
                 servicename = "get_all_races_by_racesclass"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         # ensure that round always exists by setting F(inal) if missing
         for race in races:
@@ -262,6 +277,7 @@ class RaceplansAdapter:
             race["index"] = ""
         return races
 
+    @invalidates("races")
     async def update_order(self, token: str, race_id: str, new_order: int) -> str:
         """Update race order function."""
         race = await RaceplansAdapter().get_race_by_id(token, race_id)
@@ -270,6 +286,7 @@ class RaceplansAdapter:
         logging.debug(f"Raceplan update order, result: {res}. {race}")
         return f"Oppdatert heat {new_order}."
 
+    @invalidates("races")
     async def update_raceplan(self, token: str, my_id: str, new_data: dict) -> int:
         """Update klasser function."""
         servicename = "update_raceplan"
@@ -281,7 +298,7 @@ class RaceplansAdapter:
             ]
         )
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.put(
                 f"{RACE_SERVICE_URL}/raceplans/{my_id}",
                 headers=headers,
@@ -294,15 +311,16 @@ class RaceplansAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return returncode
 
+    @invalidates("races")
     async def update_race(self, token: str, my_id: str, new_data: dict) -> int:
         """Update one race function."""
         servicename = "update_race"
@@ -314,7 +332,7 @@ class RaceplansAdapter:
             ]
         )
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.put(
                 f"{RACE_SERVICE_URL}/races/{my_id}",
                 headers=headers,
@@ -327,15 +345,16 @@ class RaceplansAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return returncode
 
+    @invalidates("races")
     async def update_race_start_time(
         self, token: str, event_id: str, order: str, new_time: str
     ) -> str:
@@ -355,7 +374,7 @@ class RaceplansAdapter:
         logging.info(f"New data - update time: {new_data}")
 
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.put(
                 f"{RACE_SERVICE_URL}/raceplans/update-start-time/{event_id}",
                 headers=headers,
@@ -368,42 +387,46 @@ class RaceplansAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return f"Tidplan er oppdatert {returncode}"
 
+    @invalidates("races")
     async def update_start_time(
         self, token: str, event_id: str, order: int, new_time: str
     ) -> str:
-        """Update race start-time function."""
-        delta_seconds = float(0)
-        delta_time = datetime.timedelta(seconds=0)
+        """Update race start-time function, following races are shifted too."""
         races = await RaceplansAdapter().get_all_races(token, event_id)
-        for race in races:
-            old_time_obj = datetime.datetime.strptime(
-                race["start_time"], "%Y-%m-%dT%H:%M:%S"
-            ).replace(tzinfo=datetime.UTC)
-            if race["order"] >= order:
-                # calculate time difference, delta seconds
-                if race["order"] == order:
-                    new_time_obj = datetime.datetime.strptime(
-                        f"{race['start_time'][:11]}{new_time}", "%Y-%m-%dT%H:%M:%S"
-                    ).replace(tzinfo=datetime.UTC)
-                    delta_time = new_time_obj - old_time_obj
-                    delta_seconds = delta_time.total_seconds()
-
-                # calculate new time
-                x = old_time_obj + datetime.timedelta(seconds=delta_seconds)
-                new_time = x.strftime("%X")
-                race["start_time"] = f"{race['start_time'][:11]}{new_time}"
-                res = await RaceplansAdapter().update_race(token, race["id"], race)
-                logging.debug(f"Raceplan update time, result: {res}. {race}")
+        shifted_races, delta_time = shift_start_times(races, order, new_time)
+        if shifted_races:
+            try:
+                await RaceplansAdapter().update_race_start_time(
+                    token, event_id, str(order), new_time
+                )
+            except Exception as e:
+                # endpoint missing or race-service down - update races one by one
+                if not (is_endpoint_missing(e) or is_transient(e)):
+                    raise
+                logging.warning(f"update_race_start_time failed, update races - {e}")
+                summary = await run_bulk(
+                    shifted_races,
+                    lambda race: RaceplansAdapter().update_race(
+                        token, race["id"], race
+                    ),
+                    description="Oppdater starttid",
+                )
+                summary.raise_if_unauthorized()
+                if summary.failed:
+                    raise web.HTTPBadRequest(
+                        reason=f"Tidplan delvis oppdatert - {summary}"
+                    ) from e
 
+        delta_seconds = delta_time.total_seconds()
         if delta_seconds < 0:
             delta_seconds_abs = abs(delta_seconds)
             hours, remainder = divmod(delta_seconds_abs, 3600)
@@ -423,7 +446,7 @@ class RaceplansAdapter:
             ]
         )
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.post(
                 f"{RACE_SERVICE_URL}/raceplans/{raceplan_id}/validate",
                 headers=headers,
@@ -431,5 +454,54 @@ class RaceplansAdapter:
         ):
             if resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Login expired - vennligst logg inn på nytt. Service {servicename}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             return await resp.json()
+
+
+def shift_start_times(
+    races: list, order: int, new_time: str
+) -> tuple[list, datetime.timedelta]:
+    """Return copies of races from order on with new start times, and the shift.
+
+    Raises ValueError if a race would be moved to another day.
+    """
+    start_times = {
+        race["order"]: datetime.datetime.strptime(
+            race["start_time"], "%Y-%m-%dT%H:%M:%S"
+        )
+        for race in races
+    }
+    if order not in start_times:
+        return [], datetime.timedelta(seconds=0)
+    old_time_obj = start_times[order]
+    new_time_obj = datetime.datetime.strptime(
+        f"{old_time_obj.date().isoformat()}T{new_time}", "%Y-%m-%dT%H:%M:%S"
+    )
+    delta_time = new_time_obj - old_time_obj
+    if not delta_time:
+        return [], delta_time
+    shifted_races = []
+    for race in races:
+        if race["order"] >= order:
+            x = start_times[race["order"]] + delta_time
+            # only the time of day is sent to race-service, the date is kept
+            if x.date() != start_times[race["order"]].date():
+                raise ValueError(
+                    f"Heat {race['order']} kan ikke flyttes forbi midnatt."
+                )
+            shifted_races.append(
+                {**race, "start_time": f"{race['start_time'][:11]}{x.strftime('%X')}"}
+            )
+    return shifted_races, delta_time
+
+
+def is_endpoint_missing(e: Exception) -> bool:
+    """Return true if the error tells that race-service lacks the endpoint."""
+    if isinstance(e, ClientResponseError):
+        return e.status in (HTTPStatus.NOT_FOUND, HTTPStatus.METHOD_NOT_ALLOWED)
+    if isinstance(e, BackendError):
+        return e.backend_status in (
+            HTTPStatus.NOT_FOUND,
+            HTTPStatus.METHOD_NOT_ALLOWED,
+        )
+    return False
@@ -0,0 +1,91 @@
+"""Module for request scoped memoization of backend reads."""
+
+import asyncio
+import copy
+import functools
+import inspect
+import logging
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+
+class RequestCache:
+    """Class representing memoized backend reads for one incoming request."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self.results: dict[tuple, asyncio.Future] = {}
+        self.backend_calls = 0
+        self.saved_calls = 0
+
+    def clear(self) -> None:
+        """Forget all memoized reads, e.g. after a backend write."""
+        self.results.clear()
+
+
+_current_cache: ContextVar[RequestCache | None] = ContextVar(
+    "request_cache", default=None
+)
+
+
+@contextmanager
+def request_cache_scope() -> Iterator[RequestCache]:
+    """Memoize backend reads made within the scope, typically one request."""
+    cache = RequestCache()
+    reset_token = _current_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _current_cache.reset(reset_token)
+
+
+def invalidate_request_cache() -> None:
+    """Clear memoized reads for the current request, if any."""
+    cache = _current_cache.get()
+    if cache:
+        cache.clear()
+
+
+def request_cached(
+    func: Callable[..., Awaitable[Any]],
+) -> Callable[..., Awaitable[Any]]:
+    """Decorate an adapter read method to be memoized per request."""
+    # an event_cached method hands out its shared value, copied below
+    fetch = getattr(func, "shared", func)
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        cache = _current_cache.get()
+        try:
+            # same key whether arguments are given by position or by name
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = tuple(bound.arguments.items())[1:]
+            key = (type(self).__name__, func.__name__, arguments)
+            hash(key)
+        except TypeError:
+            cache = None
+        if cache is None:
+            return await func(self, *args, **kwargs)
+
+        future = cache.results.get(key)
+        if future is None:
+            cache.backend_calls += 1
+            future = asyncio.ensure_future(fetch(self, *args, **kwargs))
+            cache.results[key] = future
+        else:
+            cache.saved_calls += 1
+            logging.debug(f"request_cache hit - {key[0]}.{key[1]}")
+        try:
+            result = await asyncio.shield(future)
+        except Exception:
+            # do not memoize failures
+            if cache.results.get(key) is future:
+                del cache.results[key]
+            raise
+        return copy.deepcopy(result)
+
+    return wrapper
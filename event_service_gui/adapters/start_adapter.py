@@ -1,14 +1,21 @@
 """Module for start adapter."""
 
+import asyncio
 import logging
 import os
 from http import HTTPStatus
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from multidict import MultiDict
 
+from event_service_gui.concurrency import BulkSummary, run_bulk
+from event_service_gui.errors import BackendError
+
+from .client_session import RACE_SERVICE, backend_session
+from .event_cache import invalidates
 from .raceclasses_adapter import RaceclassesAdapter
 from .raceplans_adapter import RaceplansAdapter
+from .request_cache import request_cached
 
 RACE_HOST_SERVER = os.getenv("RACE_HOST_SERVER", "localhost")
 RACE_HOST_PORT = os.getenv("RACE_HOST_PORT", "8088")
@@ -18,6 +25,7 @@ RACE_SERVICE_URL = f"http://{RACE_HOST_SERVER}:{RACE_HOST_PORT}"
 class StartAdapter:
     """Class representing start."""
 
+    @invalidates("races")
     async def generate_startlist_for_event(self, token: str, event_id: str) -> str:
         """Generate new start_list function."""
         servicename = "generate_startlist_for_event"
@@ -29,7 +37,7 @@ class StartAdapter:
         )
         request_body = {"event_id": event_id}
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.post(
                 f"{RACE_SERVICE_URL}/startlists/generate-startlist-for-event",
                 headers=headers,
@@ -43,18 +51,19 @@ class StartAdapter:
                 informasjon = f"Suksess! Opprettet startlister. Id: {s_id}"
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed: {resp.status} - {body['detail']}")
-                raise web.HTTPBadRequest(
-                    reason=f"{servicename} failed - {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"{servicename} failed - {body['detail']}."
                 )
         # shuffle urangerte - this function is intended to be moved to race-service
         informasjon += await shuffle_round2(token, event_id)
 
         return informasjon
 
+    @invalidates("races")
     async def delete_start_entry(
         self, token: str, race_id: str, start_entry_id: str
     ) -> str:
@@ -65,7 +74,7 @@ class StartAdapter:
         }
 
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.delete(
                 f"{RACE_SERVICE_URL}/races/{race_id}/start-entries/{start_entry_id}",
                 headers=headers,
@@ -77,15 +86,16 @@ class StartAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return str(res)
 
+    @invalidates("races")
     async def delete_start_list(self, token: str, start_list_id: str) -> str:
         """Delete one start_list function."""
         servicename = "delete_start_list"
@@ -93,7 +103,7 @@ class StartAdapter:
             hdrs.AUTHORIZATION: f"Bearer {token}",
         }
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.delete(
                 f"{RACE_SERVICE_URL}/startlists/{start_list_id}",
                 headers=headers,
@@ -105,15 +115,16 @@ class StartAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed: {resp.status} - {body['detail']}")
-                raise web.HTTPBadRequest(
-                    reason=f"{servicename} failed - {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"{servicename} failed - {body['detail']}."
                 )
         return str(res)
 
+    @request_cached
     async def get_start_entries_by_race_id(self, token: str, race_id: str) -> list:
         """Get one start_entry - lap time or heat place function."""
         headers = MultiDict(
@@ -123,7 +134,7 @@ class StartAdapter:
         )
         start_entries = []
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.get(
                 f"{RACE_SERVICE_URL}/races/{race_id}/start-entries",
                 headers=headers,
@@ -134,17 +145,18 @@ class StartAdapter:
                 start_entries = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
 
             else:
                 servicename = "get_start_entries_by_race_id"
                 body = await resp.json()
                 logging.error(f"{servicename} failed: {resp.status} - {body['detail']}")
-                raise web.HTTPBadRequest(
-                    reason=f"{servicename} failed - {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"{servicename} failed - {body['detail']}."
                 )
         return start_entries
 
+    @request_cached
     async def get_start_entry_by_id(
         self, token: str, race_id: str, start_id: str
     ) -> dict:
@@ -156,7 +168,7 @@ class StartAdapter:
         )
         start_entry = {}
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.get(
                 f"{RACE_SERVICE_URL}/races/{race_id}/start-entries/{start_id}",
                 headers=headers,
@@ -167,17 +179,18 @@ class StartAdapter:
                 start_entry = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"Login expired: {resp}"
-                raise Exception(err_msg)
+                raise BackendError(resp.status, reason=err_msg)
 
             else:
                 servicename = "get_start_entry_by_id"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return start_entry
 
+    @request_cached
     async def get_start_entries_by_bib(
         self, token: str, event_id: str, bib: int
     ) -> list:
@@ -191,7 +204,7 @@ class StartAdapter:
         )
 
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.get(
                 f"{RACE_SERVICE_URL}/startlists?eventId={event_id}&bib={bib}",
                 headers=headers,
@@ -204,14 +217,15 @@ class StartAdapter:
                 servicename = "get_start_entries_by_bib"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
 
         if len(startlists) > 0:
             start_entries = startlists[0]["start_entries"]
         return start_entries
 
+    @request_cached
     async def get_all_starts_by_event(self, token: str, event_id: str) -> list:
         """Get all starts function."""
         headers = MultiDict(
@@ -221,7 +235,7 @@ class StartAdapter:
         )
         starts = []
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.get(
                 f"{RACE_SERVICE_URL}/startlists?eventId={event_id}", headers=headers
             ) as resp,
@@ -233,11 +247,12 @@ class StartAdapter:
                 servicename = "get_all_starts_by_event"
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
         return starts
 
+    @invalidates("races")
     async def create_start_entry(self, token: str, new_start: dict) -> int:
         """Add one start to the start_list."""
         servicename = "create_start_entry"
@@ -247,7 +262,7 @@ class StartAdapter:
         }
         logging.debug(f"New start: {new_start}")
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.post(
                 f"{RACE_SERVICE_URL}/races/{new_start['race_id']}/start-entries",
                 headers=headers,
@@ -259,15 +274,16 @@ class StartAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed: {resp.status} - {body['detail']}")
-                raise web.HTTPBadRequest(
-                    reason=f"{servicename} failed - {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"{servicename} failed - {body['detail']}."
                 )
         return resp.status
 
+    @invalidates("races")
     async def update_start_entry(self, token: str, s_id: str, new_start: dict) -> int:
         """Update one start in the start_list."""
         servicename = "update_start_entry"
@@ -277,7 +293,7 @@ class StartAdapter:
         }
         logging.debug(f"New start: {new_start}")
         async with (
-            ClientSession() as session,
+            backend_session(RACE_SERVICE) as session,
             session.put(
                 f"{RACE_SERVICE_URL}/races/{new_start['race_id']}/start-entries/{s_id}",
                 headers=headers,
@@ -289,12 +305,12 @@ class StartAdapter:
                 pass
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed: {resp.status} - {body['detail']}")
-                raise web.HTTPBadRequest(
-                    reason=f"{servicename} failed - {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"{servicename} failed - {body['detail']}."
                 )
         return resp.status
 
@@ -303,16 +319,28 @@ async def shuffle_round2(token: str, event_id: str) -> str:
     """Shuffle round 2 start-lists to avoid same heat twice."""
     informasjon = ""
     swap_count = 0
-    raceclasses = await RaceclassesAdapter().get_raceclasses(token, event_id)
+    raceclasses, races, startlists = await asyncio.gather(
+        RaceclassesAdapter().get_raceclasses(token, event_id),
+        RaceplansAdapter().get_all_races(token, event_id),
+        StartAdapter().get_all_starts_by_event(token, event_id),
+    )
+    if not startlists:
+        return informasjon
+    original_entries = startlists[0]["start_entries"]
+    # race_id -> start entries, in start order - copies are shuffled
+    entries_by_race: dict[str, list] = {}
+    for start_entry in sorted(
+        original_entries, key=lambda entry: entry["starting_position"]
+    ):
+        entries_by_race.setdefault(start_entry["race_id"], []).append(dict(start_entry))
     for raceclass in raceclasses:
         if not raceclass["ranking"]:
-            races = await RaceplansAdapter().get_races_by_racesclass(
-                token, event_id, raceclass["name"]
-            )
             previous_race_id = ""
             r2_race_info = []
             # find relevant races
             for race in races:
+                if race["raceclass"] != raceclass["name"]:
+                    continue
                 if race["round"] == "R2":
                     race_info = {
                         "heat": race["heat"],
@@ -327,63 +355,101 @@ async def shuffle_round2(token: str, event_id: str) -> str:
             for r2_race in r2_race_info:
                 if first:
                     first = False
-                elif r2_race["heat"] % 2 == 1:
-                    await swap_starts(
-                        token,
-                        r2_race["race_id"],
-                        r2_race["previous_race_id"],
-                        [1, 3],
-                    )
-                    swap_count += 2
-                else:
-                    await swap_starts(
-                        token,
-                        r2_race["race_id"],
-                        r2_race["previous_race_id"],
-                        [0, 2, 4],
-                    )
-                    swap_count += 3
+                    continue
+                swap_count += swap_starts(
+                    entries_by_race.get(r2_race["race_id"], []),
+                    entries_by_race.get(r2_race["previous_race_id"], []),
+                    [1, 3] if r2_race["heat"] % 2 == 1 else [0, 2, 4],
+                )
+    original_by_id = {entry["id"]: entry for entry in original_entries}
+    changes = [
+        (original_by_id[start_entry["id"]], start_entry)
+        for race_entries in entries_by_race.values()
+        for start_entry in race_entries
+        if start_entry["bib"] != original_by_id[start_entry["id"]]["bib"]
+    ]
+    if changes:
+        summary = await apply_start_entry_changes(token, event_id, changes)
+        if summary.failed:
+            return f" R2 for urangerte ble ikke stokket - {summary}"
     if swap_count > 0:
         informasjon = f" R2 for urangerte er stokket - {swap_count} flyttinger."
     return informasjon
 
 
-async def swap_starts(
-    token: str, from_race_id: str, to_race_id: str, start_indexes: list
-) -> str:
-    """Shuffle round 2 start-lists to avoid same heat twice."""
-    from_race = await RaceplansAdapter().get_race_by_id(token, from_race_id)
-    to_race = await RaceplansAdapter().get_race_by_id(token, to_race_id)
+def swap_starts(from_entries: list, to_entries: list, start_indexes: list) -> int:
+    """Swap bib, name and club at start indexes between two races, return swaps made."""
+    swaps = 0
     for start_index in start_indexes:
-        try:
-            start1 = from_race["start_entries"][start_index]
-            start2 = to_race["start_entries"][start_index]
-            new_start1 = {
-                "startlist_id": start1["startlist_id"],
-                "race_id": start1["race_id"],
-                "bib": start2["bib"],
-                "starting_position": start1["starting_position"],
-                "scheduled_start_time": start1["scheduled_start_time"],
-                "name": start2["name"],
-                "club": start2["club"],
-            }
-            new_start2 = {
-                "startlist_id": start2["startlist_id"],
-                "race_id": start2["race_id"],
-                "bib": start1["bib"],
-                "starting_position": start2["starting_position"],
-                "scheduled_start_time": start2["scheduled_start_time"],
-                "name": start1["name"],
-                "club": start1["club"],
-            }
-            await delete_start(token, start1)
-            await delete_start(token, start2)
-            await create_start(token, new_start1)
-            await create_start(token, new_start2)
-        except Exception:
-            # if error dont change anytning
+        if start_index >= min(len(from_entries), len(to_entries)):
+            # if missing dont change anytning
             logging.debug("Error: Skipping swap of urangert starts")
-    return "swapped_starts"
+            continue
+        start1 = from_entries[start_index]
+        start2 = to_entries[start_index]
+        for key in ["bib", "name", "club"]:
+            start1[key], start2[key] = start2[key], start1[key]
+        swaps += 1
+    return swaps
+
+
+async def apply_start_entry_changes(
+    token: str, event_id: str, changes: list[tuple[dict, dict]]
+) -> BulkSummary:
+    """Replace start entries, (old, new) pairs, roll back if any call fails."""
+    # delete all old entries first, so a bib is never in two heats
+    summary = await run_bulk(
+        [old for old, _new in changes],
+        lambda start_entry: delete_start(token, start_entry),
+        description="Slett starter",
+    )
+    if not summary.failed:
+        summary = await run_bulk(
+            [new for _old, new in changes],
+            lambda start_entry: create_start(token, start_entry),
+            description="Opprett starter",
+            retry=False,
+        )
+    if summary.failed:
+        summary.raise_if_unauthorized()
+        logging.error(f"Start entry changes failed, rolling back - {summary}")
+        await rollback_start_entry_changes(token, event_id, changes)
+    return summary
+
+
+async def rollback_start_entry_changes(
+    token: str, event_id: str, changes: list[tuple[dict, dict]]
+) -> None:
+    """Restore old start entries, from what is found in the start-list now."""
+
+    def slot(start_entry: dict) -> tuple:
+        return (
+            start_entry["race_id"],
+            int(start_entry["starting_position"]),
+            int(start_entry["bib"]),
+        )
+
+    startlists = await StartAdapter().get_all_starts_by_event(token, event_id)
+    current = {
+        slot(start_entry): start_entry
+        for startlist in startlists[:1]
+        for start_entry in startlist["start_entries"]
+    }
+    created = [current[slot(new)] for _old, new in changes if slot(new) in current]
+    deleted = [old for old, _new in changes if slot(old) not in current]
+    removed = await run_bulk(
+        created,
+        lambda start_entry: delete_start(token, start_entry),
+        description="Tilbakestill - slett starter",
+    )
+    restored = await run_bulk(
+        deleted,
+        lambda start_entry: create_start(token, start_entry),
+        description="Tilbakestill - opprett starter",
+        retry=False,
+    )
+    if removed.failed or restored.failed:
+        logging.error(f"Rollback of start entries incomplete - {removed} {restored}")
 
 
 async def delete_start(token: str, form: dict) -> str:
@@ -5,10 +5,13 @@ import logging
 import os
 from http import HTTPStatus
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from dotenv import load_dotenv
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import PHOTO_SERVICE, backend_session
 from .events_adapter import EventsAdapter
 
 # get base settings
@@ -33,7 +36,7 @@ class StatusAdapter:
         servicename = "get_status"
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(
                 f"{PHOTO_SERVICE_URL}/status?count={count}&eventId={event_id}",
                 headers=headers,
@@ -43,12 +46,12 @@ class StatusAdapter:
                 status = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise BackendError(resp.status, reason=informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
                 logging.error(informasjon)
-                raise Exception(informasjon)
+                raise BackendError(resp.status, reason=informasjon)
         return status
 
     async def get_status_by_type(
@@ -65,7 +68,7 @@ class StatusAdapter:
         servicename = "get_status"
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.get(
                 f"{PHOTO_SERVICE_URL}/status?count={count}&eventId={event['id']}&type={status_type}",
                 headers=headers,
@@ -75,12 +78,12 @@ class StatusAdapter:
                 status = await resp.json()
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 informasjon = f"Login expired: {resp}"
-                raise Exception(informasjon)
+                raise BackendError(resp.status, reason=informasjon)
             else:
                 body = await resp.json()
                 informasjon = f"{servicename} failed - {resp.status} - {body['detail']}"
                 logging.error(informasjon)
-                raise Exception(informasjon)
+                raise BackendError(resp.status, reason=informasjon)
         return status
 
     async def create_status(
@@ -106,7 +109,7 @@ class StatusAdapter:
         request_body = copy.deepcopy(status_dict)
 
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.post(
                 f"{PHOTO_SERVICE_URL}/status", headers=headers, json=request_body
             ) as resp,
@@ -117,12 +120,12 @@ class StatusAdapter:
                 result = location.split(os.path.sep)[-1]
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
-                    reason=f"Error - {resp.status}: {body['detail']}."
+                raise BackendError(
+                    resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                 )
 
         return result
@@ -138,7 +141,7 @@ class StatusAdapter:
         )
         url = f"{PHOTO_SERVICE_URL}/status?eventId={event['id']}"
         async with (
-            ClientSession() as session,
+            backend_session(PHOTO_SERVICE) as session,
             session.delete(
                 url,
                 headers=headers,
@@ -148,11 +151,12 @@ class StatusAdapter:
                 logging.debug(f"result - got response {resp}")
             elif resp.status == HTTPStatus.UNAUTHORIZED:
                 err_msg = f"401 Unathorized - {servicename}"
-                raise web.HTTPBadRequest(reason=err_msg)
+                raise BackendError(resp.status, reason=err_msg)
             else:
                 body = await resp.json()
                 logging.error(f"{servicename} failed - {resp.status} - {body}")
-                raise web.HTTPBadRequest(
+                raise BackendError(
+                    resp.status,
                     reason=f"Error - {resp.status}: {body['detail']}.",
                 )
         return resp.status
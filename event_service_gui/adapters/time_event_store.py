@@ -0,0 +1,99 @@
+"""Module for time events of an event kept in memory between fetches."""
+
+import itertools
+from collections import OrderedDict, deque
+
+from .event_cache import CACHE_MAX_ENTRIES
+
+TIME_EVENT_STORE_LOG = 100
+# versions are unique across stores, so a cursor into an evicted store is detected
+_versions = itertools.count(1)
+
+
+class TimeEventStore:
+    """Class representing the time events of one event, versioned by change."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self.time_events: dict[str, dict] = {}
+        self.version = next(_versions)
+        # validators of the last fetch, for conditional requests to race-service
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        # (version, previous version, added, changed, removed ids) per merge
+        self._log: deque[tuple[int, int, list, list, list]] = deque(
+            maxlen=TIME_EVENT_STORE_LOG
+        )
+
+    def merge(self, time_events: list) -> dict:
+        """Merge a full list of time events, return the changes as in changes_since."""
+        previous = self.time_events
+        merged: dict[str, dict] = {}
+        added = []
+        changed = []
+        for time_event in time_events:
+            old = previous.get(time_event["id"])
+            if old is None:
+                added.append(time_event["id"])
+            elif old != time_event:
+                changed.append(time_event["id"])
+            else:
+                time_event = old
+            merged[time_event["id"]] = time_event
+        removed = [te_id for te_id in previous if te_id not in merged]
+        self.time_events = merged
+        if added or changed or removed:
+            previous_version = self.version
+            self.version = next(_versions)
+            self._log.append((self.version, previous_version, added, changed, removed))
+        return self.changes(added, changed, removed)
+
+    def changes(self, added: list, changed: list, removed: list) -> dict:
+        """Return changes with the time events for added and changed ids."""
+        return {
+            "added": [self.time_events[te_id] for te_id in added],
+            "changed": [self.time_events[te_id] for te_id in changed],
+            "removed": removed,
+        }
+
+    def changes_since(self, version: int) -> dict | None:
+        """Return time events added, changed and removed since version, or None."""
+        if version == self.version:
+            return self.changes([], [], [])
+        if not self._log or not self._log[0][1] <= version < self.version:
+            # version is too old, or from an evicted store - reader must read all
+            return None
+        state: dict[str, str | None] = {}
+        for log_version, _previous, added, changed, removed in self._log:
+            if log_version <= version:
+                continue
+            for te_id in added:
+                state[te_id] = "changed" if state.get(te_id) == "removed" else "added"
+            for te_id in changed:
+                if state.get(te_id) != "added":
+                    state[te_id] = "changed"
+            for te_id in removed:
+                state[te_id] = None if state.get(te_id) == "added" else "removed"
+        return self.changes(
+            [te_id for te_id, change in state.items() if change == "added"],
+            [te_id for te_id, change in state.items() if change == "changed"],
+            [te_id for te_id, change in state.items() if change == "removed"],
+        )
+
+    def list(self) -> list:
+        """Return all time events, in the order of the last fetch."""
+        return list(self.time_events.values())
+
+
+# one store per event, in LRU order
+_stores: OrderedDict[str, TimeEventStore] = OrderedDict()
+
+
+def get_time_event_store(event_id: str) -> TimeEventStore:
+    """Return the store for event, create it if needed."""
+    if event_id not in _stores:
+        _stores[event_id] = TimeEventStore()
+        while len(_stores) > CACHE_MAX_ENTRIES:
+            _stores.popitem(last=False)
+    _stores.move_to_end(event_id)
+    return _stores[event_id]
@@ -4,9 +4,16 @@ import copy
 import logging
 import os
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import RACE_SERVICE, backend_session
+from .event_cache import invalidates
+from .request_cache import request_cached
+from .time_event_store import TimeEventStore, get_time_event_store
+
 RACE_HOST_SERVER = os.getenv("RACE_HOST_SERVER", "localhost")
 RACE_HOST_PORT = os.getenv("RACE_HOST_PORT", "8088")
 RACE_SERVICE_URL = f"http://{RACE_HOST_SERVER}:{RACE_HOST_PORT}"
@@ -15,6 +22,7 @@ RACE_SERVICE_URL = f"http://{RACE_HOST_SERVER}:{RACE_HOST_PORT}"
 class TimeEventsAdapter:
     """Class representing time_events."""
 
+    @invalidates("races", "time_events")
     async def create_time_event(self, token: str, time_event: dict) -> dict:
         """Create new time_event function, return new time event."""
         servicename = "create_time_event"
@@ -28,7 +36,7 @@ class TimeEventsAdapter:
 
         request_body = copy.deepcopy(time_event)
 
-        async with ClientSession() as session:
+        async with backend_session(RACE_SERVICE) as session:
             async with session.post(
                 f"{RACE_SERVICE_URL}/time-events", headers=headers, json=request_body
             ) as resp:
@@ -37,20 +45,24 @@ class TimeEventsAdapter:
                     logging.debug(f"time-event - got response {resp}, {new_time_event}")
                 elif resp.status == 400:
                     functional_error = await resp.json()
-                    raise web.HTTPBadRequest(
-                        reason=f"400 - {functional_error['detail']}"
+                    raise BackendError(
+                        resp.status, reason=f"400 - {functional_error['detail']}"
                     )
                 elif resp.status == 401:
-                    raise web.HTTPBadRequest(reason=f"401 Unathorized - {servicename}")
+                    raise BackendError(
+                        resp.status, reason=f"401 Unathorized - {servicename}"
+                    )
                 else:
                     logging.error(
                         f"create_time_event failed - {resp.status}, {resp} input data: {time_event}"
                     )
-                    raise web.HTTPBadRequest(
-                        reason=f"Create time_event failed Error: {resp}. Input data: {time_event}"
+                    raise BackendError(
+                        resp.status,
+                        reason=f"Create time_event failed Error: {resp}. Input data: {time_event}",
                     )
         return new_time_event
 
+    @invalidates("races", "time_events")
     async def delete_time_event(self, token: str, t_id: str) -> int:
         """Delete time_event function."""
         servicename = "delete_time_event"
@@ -61,21 +73,24 @@ class TimeEventsAdapter:
             ]
         )
         url = f"{RACE_SERVICE_URL}/time-events/{t_id}"
-        async with ClientSession() as session:
+        async with backend_session(RACE_SERVICE) as session:
             async with session.delete(url, headers=headers) as resp:
                 logging.debug(f"Delete time_event: {t_id} - res {resp.status}")
                 if resp.status == 204:
                     logging.debug(f"result - got response {resp}")
                 elif resp.status == 401:
-                    raise web.HTTPBadRequest(reason=f"401 Unathorized - {servicename}")
+                    raise BackendError(
+                        resp.status, reason=f"401 Unathorized - {servicename}"
+                    )
                 else:
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return resp.status
 
+    @invalidates("races", "time_events")
     async def update_time_event(self, token: str, t_id: str, time_event: dict) -> int:
         """Update time_event function."""
         servicename = "update_time_event"
@@ -86,7 +101,7 @@ class TimeEventsAdapter:
             ]
         )
 
-        async with ClientSession() as session:
+        async with backend_session(RACE_SERVICE) as session:
             async with session.put(
                 f"{RACE_SERVICE_URL}/time-events/{t_id}",
                 headers=headers,
@@ -95,17 +110,21 @@ class TimeEventsAdapter:
                 if resp.status == 204:
                     logging.debug(f"update time_event - got response {resp}")
                 elif resp.status == 401:
-                    raise web.HTTPBadRequest(reason=f"401 Unathorized - {servicename}")
+                    raise BackendError(
+                        resp.status, reason=f"401 Unathorized - {servicename}"
+                    )
                 else:
                     logging.error(
                         f"update_time_event failed - {resp.status} input data: {time_event}"
                     )
-                    raise web.HTTPBadRequest(
-                        reason=f"Update time_event failed - {resp.status} input data: {time_event}."
+                    raise BackendError(
+                        resp.status,
+                        reason=f"Update time_event failed - {resp.status} input data: {time_event}.",
                     )
             logging.debug(f"Updated time_event: {t_id} - res {resp.status}")
         return resp.status
 
+    @request_cached
     async def get_time_event_by_id(self, token: str, t_id: str) -> dict:
         """Get one time_event - lap time or heat place function."""
         headers = MultiDict(
@@ -114,7 +133,7 @@ class TimeEventsAdapter:
             ]
         )
         time_event = {}
-        async with ClientSession() as session:
+        async with backend_session(RACE_SERVICE) as session:
             async with session.get(
                 f"{RACE_SERVICE_URL}/time-events/{t_id}", headers=headers
             ) as resp:
@@ -122,16 +141,17 @@ class TimeEventsAdapter:
                 if resp.status == 200:
                     time_event = await resp.json()
                 elif resp.status == 401:
-                    raise Exception(f"Login expired: {resp}")
+                    raise BackendError(resp.status, reason=f"Login expired: {resp}")
                 else:
                     servicename = "get_time_event_by_id"
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return time_event
 
+    @request_cached
     async def get_time_events_by_event_id_and_bib(
         self, token: str, event_id: str, bib: int
     ) -> list:
@@ -142,7 +162,7 @@ class TimeEventsAdapter:
             ]
         )
         time_events = []
-        async with ClientSession() as session:
+        async with backend_session(RACE_SERVICE) as session:
             async with session.get(
                 f"{RACE_SERVICE_URL}/time-events?eventId={event_id}&bib={bib}",
                 headers=headers,
@@ -153,16 +173,17 @@ class TimeEventsAdapter:
                 if resp.status == 200:
                     time_events = await resp.json()
                 elif resp.status == 401:
-                    raise Exception(f"Login expired: {resp}")
+                    raise BackendError(resp.status, reason=f"Login expired: {resp}")
                 else:
                     servicename = "get_time_events_by_event_id_and_bib"
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return time_events
 
+    @request_cached
     async def get_time_events_by_event_id(self, token: str, event_id: str) -> list:
         """Get all time_events - lap time or heat place function."""
         headers = MultiDict(
@@ -171,7 +192,7 @@ class TimeEventsAdapter:
             ]
         )
         time_events = []
-        async with ClientSession() as session:
+        async with backend_session(RACE_SERVICE) as session:
             async with session.get(
                 f"{RACE_SERVICE_URL}/time-events?eventId={event_id}", headers=headers
             ) as resp:
@@ -181,16 +202,52 @@ class TimeEventsAdapter:
                 if resp.status == 200:
                     time_events = await resp.json()
                 elif resp.status == 401:
-                    raise Exception(f"Login expired: {resp}")
+                    raise BackendError(resp.status, reason=f"Login expired: {resp}")
                 else:
                     servicename = "get_time_events_by_event_id"
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return time_events
 
+    async def sync_time_events(self, token: str, event_id: str) -> TimeEventStore:
+        """Fetch time events if changed and merge them into the store for the event."""
+        store = get_time_event_store(event_id)
+        headers = MultiDict(
+            [
+                (hdrs.AUTHORIZATION, f"Bearer {token}"),
+            ]
+        )
+        # validators from the last fetch - the list is only sent again if changed
+        if store.etag:
+            headers[hdrs.IF_NONE_MATCH] = store.etag
+        if store.last_modified:
+            headers[hdrs.IF_MODIFIED_SINCE] = store.last_modified
+        async with backend_session(RACE_SERVICE) as session:
+            async with session.get(
+                f"{RACE_SERVICE_URL}/time-events?eventId={event_id}", headers=headers
+            ) as resp:
+                logging.debug(f"sync_time_events - got response {resp.status}")
+                if resp.status == 200:
+                    store.merge(await resp.json())
+                    store.etag = resp.headers.get(hdrs.ETAG)
+                    store.last_modified = resp.headers.get(hdrs.LAST_MODIFIED)
+                elif resp.status == 304:
+                    logging.debug(f"sync_time_events - not modified {event_id}")
+                elif resp.status == 401:
+                    raise BackendError(resp.status, reason=f"Login expired: {resp}")
+                else:
+                    servicename = "sync_time_events"
+                    body = await resp.json()
+                    logging.error(f"{servicename} failed - {resp.status} - {body}")
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
+                    )
+        return store
+
+    @request_cached
     async def get_time_events_by_event_id_and_timing_point(
         self, token: str, event_id: str, timing_point: str
     ) -> list:
@@ -201,7 +258,7 @@ class TimeEventsAdapter:
             ]
         )
         time_events = []
-        async with ClientSession() as session:
+        async with backend_session(RACE_SERVICE) as session:
             async with session.get(
                 f"{RACE_SERVICE_URL}/time-events?eventId={event_id}&timingPoint={timing_point}",
                 headers=headers,
@@ -212,16 +269,17 @@ class TimeEventsAdapter:
                 if resp.status == 200:
                     time_events = await resp.json()
                 elif resp.status == 401:
-                    raise Exception(f"Login expired: {resp}")
+                    raise BackendError(resp.status, reason=f"Login expired: {resp}")
                 else:
                     servicename = "get_all_time_events"
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return time_events
 
+    @request_cached
     async def get_time_events_by_race_id(self, token: str, race_id: str) -> list:
         """Get time_events - lap time or heat place function."""
         headers = MultiDict(
@@ -230,7 +288,7 @@ class TimeEventsAdapter:
             ]
         )
         time_events = []
-        async with ClientSession() as session:
+        async with backend_session(RACE_SERVICE) as session:
             async with session.get(
                 f"{RACE_SERVICE_URL}/time-events?raceId={race_id}", headers=headers
             ) as resp:
@@ -240,12 +298,12 @@ class TimeEventsAdapter:
                 if resp.status == 200:
                     time_events = await resp.json()
                 elif resp.status == 401:
-                    raise Exception(f"Login expired: {resp}")
+                    raise BackendError(resp.status, reason=f"Login expired: {resp}")
                 else:
                     servicename = "get_time_events_by_race_id"
                     body = await resp.json()
                     logging.error(f"{servicename} failed - {resp.status} - {body}")
-                    raise web.HTTPBadRequest(
-                        reason=f"Error - {resp.status}: {body['detail']}."
+                    raise BackendError(
+                        resp.status, reason=f"Error - {resp.status}: {body['detail']}."
                     )
         return time_events
@@ -3,10 +3,14 @@
 import logging
 import os
 
-from aiohttp import ClientSession, hdrs, web
+from aiohttp import hdrs
 from aiohttp_session import Session
 from multidict import MultiDict
 
+from event_service_gui.errors import BackendError
+
+from .client_session import USER_SERVICE, backend_session
+
 USERS_HOST_SERVER = os.getenv("USERS_HOST_SERVER")
 USERS_HOST_PORT = os.getenv("USERS_HOST_PORT")
 USER_SERVICE_URL = f"http://{USERS_HOST_SERVER}:{USERS_HOST_PORT}"
@@ -36,7 +40,7 @@ class UserAdapter:
                 (hdrs.AUTHORIZATION, f"Bearer {token}"),
             ]
         )
-        async with ClientSession() as session:
+        async with backend_session(USER_SERVICE) as session:
             async with session.post(
                 f"{USER_SERVICE_URL}/users", headers=headers, json=request_body
             ) as resp:
@@ -45,10 +49,12 @@ class UserAdapter:
                     location = resp.headers[hdrs.LOCATION]
                     w_id = location.split(os.path.sep)[-1]
                 elif resp.status == 401:
-                    raise web.HTTPBadRequest(reason=f"401 Unathorized - {servicename}")
+                    raise BackendError(
+                        resp.status, reason=f"401 Unathorized - {servicename}"
+                    )
                 else:
                     logging.error(f"create_user failed - {resp.status}")
-                    raise web.HTTPBadRequest(reason="Create user failed.")
+                    raise BackendError(resp.status, reason="Create user failed.")
 
         return w_id
 
@@ -62,17 +68,19 @@ class UserAdapter:
             ]
         )
         url = f"{USER_SERVICE_URL}/users/{w_id}"
-        async with ClientSession() as session:
+        async with backend_session(USER_SERVICE) as session:
             async with session.delete(url, headers=headers) as resp:
                 pass
             logging.info(f"Delete user: {w_id} - res {resp.status}")
             if resp.status == 204:
                 logging.debug(f"result - got response {resp}")
             elif resp.status == 401:
-                raise web.HTTPBadRequest(reason=f"401 Unathorized - {servicename}")
+                raise BackendError(
+                    resp.status, reason=f"401 Unathorized - {servicename}"
+                )
             else:
                 logging.error(f"delete_user failed - {resp.status}, {resp}")
-                raise web.HTTPBadRequest(reason="Delete user failed.")
+                raise BackendError(resp.status, reason="Delete user failed.")
         return resp.status
 
     async def get_all_users(self, token: str) -> list:
@@ -85,7 +93,7 @@ class UserAdapter:
             ]
         )
 
-        async with ClientSession() as session:
+        async with backend_session(USER_SERVICE) as session:
             async with session.get(
                 f"{USER_SERVICE_URL}/users", headers=headers
             ) as resp:
@@ -109,7 +117,7 @@ class UserAdapter:
                 (hdrs.CONTENT_TYPE, "application/json"),
             ]
         )
-        async with ClientSession() as session:
+        async with backend_session(USER_SERVICE) as session:
             async with session.post(
                 f"{USER_SERVICE_URL}/login", headers=headers, json=request_body
             ) as resp:
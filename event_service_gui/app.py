@@ -13,16 +13,30 @@ from aiohttp_session import get_session, setup
 from aiohttp_session.cookie_storage import EncryptedCookieStorage
 from dotenv import load_dotenv
 
+from .adapters.client_session import backend_sessions_ctx
+from .adapters.config_store import config_store
+from .jobs import jobs_ctx
+from .middlewares import (
+    REQUEST_CACHE_STATS,
+    ROUTE_PROFILES,
+    profiling_middleware,
+    request_cache_middleware,
+)
+from .profiling import profile_processor, profile_response_prepare
+from .services.event_poller import pollers_ctx
 from .views import (
     Contestants,
     Control,
     CsvList,
     Events,
+    Jobs,
+    Live,
     Login,
     Logout,
     Main,
     Ping,
     PrintContestants,
+    Profiling,
     Raceclasses,
     Raceplans,
     Seeding,
@@ -51,7 +65,10 @@ async def handler(request) -> web.Response:
 
 async def create_app() -> web.Application:
     """Create an web application."""
-    app = web.Application()
+    app = web.Application(middlewares=[profiling_middleware, request_cache_middleware])
+    app[REQUEST_CACHE_STATS] = {}
+    app[ROUTE_PROFILES] = {}
+    app.on_response_prepare.append(profile_response_prepare)
 
     # sesson handling - secret_key must be 32 url-safe base64-encoded bytes
     fernet_key = os.getenv("FERNET_KEY", "23EHUWpP_tpleR_RjuX5hxndWqyc0vO-cjNUMSzbjN4=")
@@ -59,6 +76,15 @@ async def create_app() -> web.Application:
     setup(app, EncryptedCookieStorage(secret_key))
     app.router.add_get("/secret", handler)
 
+    # shared, pooled http sessions towards the backend services
+    app.cleanup_ctx.append(backend_sessions_ctx)
+    # background jobs are cancelled on shutdown, before the sessions close
+    app.cleanup_ctx.append(jobs_ctx)
+    app.cleanup_ctx.append(pollers_ctx)
+
+    # config files are kept in memory, reloaded when changed on disk
+    config_store.load()
+
     # Set up logging - errors to separate file
     logging.basicConfig(level=LOGGING_LEVEL)
     logging.getLogger().setLevel(LOGGING_LEVEL)  # always applies, even if handlers pre-exist
@@ -74,6 +100,7 @@ async def create_app() -> web.Application:
         app,
         enable_async=True,
         loader=jinja2.FileSystemLoader(str(template_path)),
+        context_processors=[profile_processor],
     )
     logging.debug(f"template_path: {template_path}")
 
@@ -84,10 +111,13 @@ async def create_app() -> web.Application:
             web.view("/contestants", Contestants),
             web.view("/control", Control),
             web.view("/events", Events),
+            web.view("/jobs", Jobs),
+            web.view("/live", Live),
             web.view("/login", Login),
             web.view("/logout", Logout),
             web.view("/ping", Ping),
             web.view("/print_contestants", PrintContestants),
+            web.view("/profiling", Profiling),
             web.view("/raceclasses", Raceclasses),
             web.view("/raceplans", Raceplans),
             web.view("/seeding", Seeding),
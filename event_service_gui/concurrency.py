@@ -0,0 +1,147 @@
+"""Module for running many backend calls concurrently."""
+
+import asyncio
+import inspect
+import logging
+import os
+from collections.abc import Awaitable, Callable, Iterable
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import ClientConnectionError, ClientResponseError
+
+from event_service_gui.errors import BackendError
+
+BACKEND_CONCURRENCY = int(os.getenv("BACKEND_CONCURRENCY", "10"))
+BULK_RETRIES = int(os.getenv("BULK_RETRIES", "2"))
+BULK_RETRY_DELAY = float(os.getenv("BULK_RETRY_DELAY", "0.5"))
+
+# called with (description, done, total) as calls complete
+ProgressCallback = Callable[[str, int, int], None]
+
+
+async def gather_limited(
+    awaitables: Iterable[Awaitable[Any]], limit: int = BACKEND_CONCURRENCY
+) -> list:
+    """Await all, at most limit at a time, and return results in same order."""
+    semaphore = asyncio.Semaphore(max(limit, 1))
+
+    async def run(awaitable: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await awaitable
+
+    awaitables = list(awaitables)
+    tasks = [asyncio.ensure_future(run(awaitable)) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # close calls that never got a slot, to avoid "never awaited" warnings
+        for awaitable in awaitables:
+            if (
+                inspect.iscoroutine(awaitable)
+                and inspect.getcoroutinestate(awaitable) == inspect.CORO_CREATED
+            ):
+                awaitable.close()
+        raise
+
+
+class BulkSummary:
+    """Class representing the outcome of running one call per item."""
+
+    def __init__(self, total: int) -> None:
+        """Initialize an empty summary."""
+        self.total = total
+        self.results: list = []
+        self.failed: list[tuple[Any, Exception]] = []
+        self.retries = 0
+
+    @property
+    def succeeded(self) -> int:
+        """Return number of successful calls."""
+        return len(self.results)
+
+    def __str__(self) -> str:
+        """Return a short summary for the user, including the first failure."""
+        text = f"{self.succeeded} av {self.total} utført."
+        if self.failed:
+            text += f" {len(self.failed)} feilet, første feil: {self.failed[0][1]}."
+        return text
+
+    def raise_if_unauthorized(self) -> None:
+        """Raise the first failure caused by missing or expired login."""
+        for _item, e in self.failed:
+            if is_unauthorized(e):
+                raise e
+
+
+def is_unauthorized(e: Exception) -> bool:
+    """Return true if the error is caused by missing or expired login."""
+    if isinstance(e, BackendError):
+        return e.unauthorized
+    if isinstance(e, ClientResponseError):
+        return e.status == HTTPStatus.UNAUTHORIZED
+    return False
+
+
+def is_transient(e: Exception) -> bool:
+    """Return true if the call may succeed if tried again."""
+    if isinstance(e, ClientConnectionError | TimeoutError):
+        return True
+    if isinstance(e, ClientResponseError):
+        return e.status >= HTTPStatus.INTERNAL_SERVER_ERROR
+    if isinstance(e, BackendError):
+        return e.backend_status >= HTTPStatus.INTERNAL_SERVER_ERROR
+    return False
+
+
+async def run_bulk(  # noqa: PLR0913
+    items: Iterable[Any],
+    func: Callable[[Any], Awaitable[Any]],
+    *,
+    description: str = "",
+    limit: int = BACKEND_CONCURRENCY,
+    progress: ProgressCallback | None = None,
+    retry: bool = True,
+) -> BulkSummary:
+    """Call func for every item, at most limit at a time, and collect the failures.
+
+    Results and failures are returned in the same order as the items.
+    """
+    items = list(items)
+    summary = BulkSummary(len(items))
+    results: dict[int, Any] = {}
+    failed: dict[int, tuple[Any, Exception]] = {}
+    semaphore = asyncio.Semaphore(max(limit, 1))
+    done = 0
+    log_every = max(len(items) // 10, 1)
+    # transient failures are retried, unless the call is not idempotent
+    retries = BULK_RETRIES if retry else 0
+
+    async def run(index: int, item: Any) -> None:
+        nonlocal done
+        async with semaphore:
+            for attempt in range(retries + 1):
+                try:
+                    results[index] = await func(item)
+                    break
+                except Exception as e:
+                    if attempt < retries and is_transient(e):
+                        summary.retries += 1
+                        await asyncio.sleep(BULK_RETRY_DELAY * 2**attempt)
+                        continue
+                    logging.warning(f"{description} failed for {item} - {e}")
+                    failed[index] = (item, e)
+                    break
+        done += 1
+        if progress:
+            progress(description, done, summary.total)
+        if done % log_every == 0 or done == summary.total:
+            logging.info(f"{description}: {done}/{summary.total}")
+
+    await asyncio.gather(*(run(index, item) for index, item in enumerate(items)))
+    summary.results = [results[index] for index in sorted(results)]
+    summary.failed = [failed[index] for index in sorted(failed)]
+    return summary
@@ -0,0 +1,20 @@
+"""Module for errors raised when a backend service answers with an error."""
+
+from http import HTTPStatus
+
+from aiohttp import web
+
+
+class BackendError(web.HTTPBadRequest):
+    """Class representing an error response from a backend service, with its status."""
+
+    def __init__(self, backend_status: int, reason: str) -> None:
+        """Initialize error with status from the backend and text for the user."""
+        # a reason can not span lines, e.g. when it includes the response
+        super().__init__(reason=" ".join(str(reason).splitlines()))
+        self.backend_status = backend_status
+
+    @property
+    def unauthorized(self) -> bool:
+        """Return true if login is missing or expired."""
+        return self.backend_status == HTTPStatus.UNAUTHORIZED
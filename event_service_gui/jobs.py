@@ -0,0 +1,234 @@
+"""Module for running long admin tasks as background jobs."""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from pathlib import Path
+
+from aiohttp import web
+
+from .concurrency import is_unauthorized
+
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))
+# status files shared by all server processes on the host
+JOB_STATUS_DIR = os.getenv(
+    "JOB_STATUS_DIR", f"{tempfile.gettempdir()}/event-service-gui-jobs"
+)
+# min seconds between writing progress to the status file
+PROGRESS_SAVE_INTERVAL = 0.5
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# jobs run by this process, finished jobs are kept for JOB_RETENTION seconds
+_jobs: dict[str, "Job"] = {}
+# running tasks, referenced so they are not garbage collected
+_tasks: set[asyncio.Task] = set()
+# one semaphore per event loop, limits number of jobs running at once
+_semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+
+class Job:
+    """Class representing one background job and its progress."""
+
+    def __init__(self, description: str, event_id: str) -> None:
+        """Initialize a queued job."""
+        self.id = uuid.uuid4().hex
+        self.description = description
+        self.event_id = event_id
+        self.status = JOB_QUEUED
+        self.result = ""
+        self.unauthorized = False
+        self.step = ""
+        self.done = 0
+        self.total = 0
+        self.created = time.time()
+        self.finished: float | None = None
+        self.pid = os.getpid()
+        self._saved = 0.0
+
+    @property
+    def active(self) -> bool:
+        """Return true if the job is queued or running."""
+        return self.status in (JOB_QUEUED, JOB_RUNNING)
+
+    def update_progress(self, description: str, done: int, total: int) -> None:
+        """Record progress - can be passed as progress callback to run_bulk."""
+        self.step = description
+        self.done = done
+        self.total = total
+        if done == total or time.time() - self._saved >= PROGRESS_SAVE_INTERVAL:
+            self.save()
+
+    def save(self) -> None:
+        """Write status to the status file, read by the other processes."""
+        status = {
+            **self.to_dict(),
+            "created": self.created,
+            "finished": self.finished,
+            "pid": self.pid,
+        }
+        path = _status_path(self.id)
+        temp_path = path.with_suffix(f".{self.pid}")
+        try:
+            Path(JOB_STATUS_DIR).mkdir(parents=True, exist_ok=True)
+            with temp_path.open("w", encoding="utf-8") as f:
+                json.dump(status, f)
+            temp_path.replace(path)
+        except OSError:
+            logging.exception(f"Could not save status of job {self.id}")
+        self._saved = time.time()
+
+    @classmethod
+    def load(cls, job_id: str) -> "Job | None":
+        """Return job read from its status file, None if not found."""
+        try:
+            with _status_path(job_id).open(encoding="utf-8") as f:
+                status = json.load(f)
+        except (OSError, ValueError):
+            return None
+        job = cls(status["description"], status["event_id"])
+        for key, value in status.items():
+            setattr(job, key, value)
+        if job.active and not _is_alive(job.pid):
+            job.status = JOB_FAILED
+            job.result = "Jobben ble avbrutt, prøv igjen."
+        return job
+
+    def to_dict(self) -> dict:
+        """Return job status, e.g. for json response."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "event_id": self.event_id,
+            "status": self.status,
+            "result": self.result,
+            "unauthorized": self.unauthorized,
+            "step": self.step,
+            "done": self.done,
+            "total": self.total,
+        }
+
+
+def _status_path(job_id: str) -> Path:
+    """Return path of the status file of job."""
+    return Path(JOB_STATUS_DIR) / f"{job_id}.json"
+
+
+def _status_files() -> list[Path]:
+    """Return status files of jobs in all processes."""
+    try:
+        return list(Path(JOB_STATUS_DIR).glob("*.json"))
+    except OSError:
+        return []
+
+
+def _is_alive(pid: int) -> bool:
+    """Return true if a process with pid is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Return the job semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(max(JOB_CONCURRENCY, 1))
+    return _semaphores[loop]
+
+
+def _prune_jobs() -> None:
+    """Forget jobs finished more than JOB_RETENTION seconds ago."""
+    expired = time.time() - JOB_RETENTION
+    for job_id in [
+        job.id for job in _jobs.values() if job.finished and job.finished < expired
+    ]:
+        del _jobs[job_id]
+    # status files left by any process, not written for JOB_RETENTION seconds
+    for path in _status_files():
+        try:
+            if path.stat().st_mtime < expired:
+                path.unlink()
+        except OSError:
+            logging.debug(f"Job status file {path.name} already removed")
+
+
+async def _run_job(job: Job, func: Callable[[Job], Awaitable[str]]) -> None:
+    """Run job when there is a free slot and record the outcome."""
+    async with _get_semaphore():
+        job.status = JOB_RUNNING
+        job.save()
+        logging.info(f"Job {job.id} started - {job.description}")
+        try:
+            job.result = await func(job)
+            job.status = JOB_DONE
+        except asyncio.CancelledError:
+            job.status = JOB_CANCELLED
+            raise
+        except Exception as e:
+            logging.exception(f"Job {job.id} failed - {job.description}")
+            job.status = JOB_FAILED
+            job.result = f"Det har oppstått en feil - {e.args}."
+            job.unauthorized = is_unauthorized(e)
+        finally:
+            job.finished = time.time()
+            job.save()
+            logging.info(f"Job {job.id} {job.status} - {job.description}")
+
+
+def submit_job(
+    description: str, event_id: str, func: Callable[[Job], Awaitable[str]]
+) -> Job:
+    """Start func(job) in the background and return the job at once."""
+    _prune_jobs()
+    job = Job(description, event_id)
+    _jobs[job.id] = job
+    job.save()
+    # fresh context - the request cache of the submitter must not be used
+    task = asyncio.create_task(_run_job(job, func), context=contextvars.Context())
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+def get_job(job_id: str) -> Job | None:
+    """Return job by id, also when run by another process, None if not known."""
+    if job_id in _jobs:
+        return _jobs[job_id]
+    if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+        return None
+    return Job.load(job_id)
+
+
+def get_active_jobs(event_id: str) -> list[Job]:
+    """Return queued and running jobs for event in all processes, oldest first."""
+    found = [get_job(path.stem) for path in _status_files()]
+    return sorted(
+        (job for job in found if job and job.event_id == event_id and job.active),
+        key=lambda job: job.created,
+    )
+
+
+async def jobs_ctx(_app: web.Application) -> AsyncIterator[None]:
+    """Cancel jobs still running when the application shuts down."""
+    yield
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
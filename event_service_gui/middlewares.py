@@ -0,0 +1,69 @@
+"""Module for application middlewares."""
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from aiohttp import web
+
+from .adapters.request_cache import request_cache_scope
+from .profiling import RouteProfile, profile_scope
+
+REQUEST_CACHE_STATS = web.AppKey("request_cache_stats", dict)
+ROUTE_PROFILES = web.AppKey("route_profiles", dict)
+
+
+def get_route_name(request: web.Request) -> str:
+    """Return the route pattern for a request, e.g. /contestants."""
+    resource = request.match_info.route.resource
+    if resource is None:
+        return "unknown"
+    return resource.canonical
+
+
+@web.middleware
+async def profiling_middleware(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    """Time each request, its template rendering and backend calls per route."""
+    with profile_scope() as profile:
+        try:
+            return await handler(request)
+        finally:
+            finished = time.perf_counter()
+            # streamed responses, like /live, stay open long after the first
+            # byte - count the time until they started
+            if profile.first_byte is not None:
+                finished = profile.first_byte
+            route = f"{request.method} {get_route_name(request)}"
+            profiles = request.app[ROUTE_PROFILES]
+            profiles.setdefault(route, RouteProfile()).add(profile, finished)
+            calls = sum(len(durations) for durations in profile.backend_calls.values())
+            logging.debug(
+                f"{route} - {(finished - profile.started) * 1000:.0f} ms, "
+                f"{calls} backend calls"
+            )
+
+
+@web.middleware
+async def request_cache_middleware(
+    request: web.Request,
+    handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
+) -> web.StreamResponse:
+    """Memoize backend reads within each request and count saved calls per route."""
+    with request_cache_scope() as cache:
+        try:
+            return await handler(request)
+        finally:
+            route = get_route_name(request)
+            stats = request.app[REQUEST_CACHE_STATS].setdefault(
+                route, {"requests": 0, "backend_calls": 0, "saved_calls": 0}
+            )
+            stats["requests"] += 1
+            stats["backend_calls"] += cache.backend_calls
+            stats["saved_calls"] += cache.saved_calls
+            logging.debug(
+                f"{request.method} {route} - {cache.backend_calls} backend reads, "
+                f"{cache.saved_calls} saved by request cache"
+            )
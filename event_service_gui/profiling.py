@@ -0,0 +1,137 @@
+"""Module for profiling of requests - latency, template rendering and backend calls."""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# upper bounds in milliseconds, the last bucket takes the rest
+HISTOGRAM_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class Histogram:
+    """Class representing durations counted in fixed buckets."""
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+
+    def add(self, seconds: float) -> None:
+        """Count one duration."""
+        ms = seconds * 1000
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+        for i, upper in enumerate(HISTOGRAM_BUCKETS):
+            if ms <= upper:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self) -> dict:
+        """Return histogram as json compatible dict, durations in ms."""
+        labels = [f"<={upper}" for upper in HISTOGRAM_BUCKETS]
+        labels.append(f">{HISTOGRAM_BUCKETS[-1]}")
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 1) if self.count else 0,
+            "max_ms": round(self.max, 1),
+            "buckets": dict(zip(labels, self.buckets, strict=True)),
+        }
+
+
+class RequestProfile:
+    """Class representing timings collected during one incoming request."""
+
+    def __init__(self) -> None:
+        """Initialize an empty profile, started now."""
+        self.started = time.perf_counter()
+        self.render_started: float | None = None
+        # set when a streamed response is sent before the handler returns
+        self.first_byte: float | None = None
+        # backend service -> durations of outbound calls
+        self.backend_calls: dict[str, list[float]] = {}
+
+    def add_backend_call(self, service: str, seconds: float) -> None:
+        """Record one outbound call to a backend service."""
+        self.backend_calls.setdefault(service, []).append(seconds)
+
+
+class RouteProfile:
+    """Class representing timings aggregated for one route."""
+
+    def __init__(self) -> None:
+        """Initialize empty histograms."""
+        self.latency = Histogram()
+        self.template = Histogram()
+        self.backend_calls: dict[str, Histogram] = {}
+        self.max_calls_per_request: dict[str, int] = {}
+
+    def add(self, profile: RequestProfile, finished: float) -> None:
+        """Add the timings of one finished request."""
+        self.latency.add(finished - profile.started)
+        if profile.render_started is not None:
+            self.template.add(finished - profile.render_started)
+        for service, durations in profile.backend_calls.items():
+            calls = self.backend_calls.setdefault(service, Histogram())
+            for seconds in durations:
+                calls.add(seconds)
+            self.max_calls_per_request[service] = max(
+                self.max_calls_per_request.get(service, 0), len(durations)
+            )
+
+    def to_dict(self) -> dict:
+        """Return route timings as json compatible dict."""
+        return {
+            "requests": self.latency.count,
+            "latency": self.latency.to_dict(),
+            "template": self.template.to_dict(),
+            "backend_calls": {
+                service: {
+                    "calls": histogram.count,
+                    "calls_per_request": round(histogram.count / self.latency.count, 1),
+                    "max_calls_per_request": self.max_calls_per_request[service],
+                    "duration": histogram.to_dict(),
+                }
+                for service, histogram in sorted(self.backend_calls.items())
+            },
+        }
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "request_profile", default=None
+)
+
+
+@contextmanager
+def profile_scope() -> Iterator[RequestProfile]:
+    """Collect timings within the scope, typically one request."""
+    profile = RequestProfile()
+    reset_token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(reset_token)
+
+
+def get_current_profile() -> RequestProfile | None:
+    """Return the profile of the current request, if any."""
+    return _current_profile.get()
+
+
+async def profile_response_prepare(_request: object, _response: object) -> None:
+    """Signal handler marking when headers of a streamed response are sent."""
+    profile = _current_profile.get()
+    if profile and profile.first_byte is None:
+        profile.first_byte = time.perf_counter()
+
+
+async def profile_processor(_request: object) -> dict:
+    """Jinja context processor marking when template rendering starts."""
+    profile = _current_profile.get()
+    if profile:
+        profile.render_started = time.perf_counter()
+    return {}
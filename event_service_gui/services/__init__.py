@@ -1,7 +1,12 @@
 """Package for all services."""
 
+from .race_routing import RoutingTable, get_routing_table
+from .time_event_index import TimeEventIndex
 from .time_events_service import TimeEventsService
 
 __all__ = [
+    "RoutingTable",
+    "TimeEventIndex",
     "TimeEventsService",
+    "get_routing_table",
 ]
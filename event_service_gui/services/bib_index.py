@@ -0,0 +1,58 @@
+"""Module for start entries of an event indexed by bib."""
+
+import copy
+
+from event_service_gui.adapters import (
+    RaceplansAdapter,
+    StartAdapter,
+    TimeEventsAdapter,
+)
+from event_service_gui.concurrency import gather_limited
+
+
+class BibIndex:
+    """Class representing start entries per bib, with the races they start in."""
+
+    def __init__(self, races: list, start_entries: list) -> None:
+        """Index races by id and start entries by bib."""
+        self._races = {race["id"]: race for race in races}
+        self._start_entries: dict[int, list] = {}
+        for start_entry in start_entries:
+            self._start_entries.setdefault(start_entry["bib"], []).append(start_entry)
+
+    def race(self, race_id: str) -> dict:
+        """Return race by id, empty if not found."""
+        return copy.deepcopy(self._races.get(race_id, {}))
+
+    def rounds(self, bib: int) -> set[str]:
+        """Return rounds where bib has a start entry."""
+        return {
+            self._races.get(start_entry["race_id"], {}).get("round", "")
+            for start_entry in self._start_entries.get(bib, [])
+        }
+
+
+async def get_bib_index(token: str, event_id: str, bib: int, race_id: str) -> BibIndex:
+    """Return bib index of the start entries of bib, including race race_id."""
+    start_entries = await StartAdapter().get_start_entries_by_bib(token, event_id, bib)
+    race_ids = {race_id} | {start_entry["race_id"] for start_entry in start_entries}
+    races = await gather_limited(
+        RaceplansAdapter().get_race_by_id(token, _race_id) for _race_id in race_ids
+    )
+    return BibIndex(races, start_entries)
+
+
+async def get_latest_finish(token: str, event_id: str, bib: int) -> dict:
+    """Return the last registered finish time event for bib, empty if none."""
+    time_events = await TimeEventsAdapter().get_time_events_by_event_id_and_bib(
+        token, event_id, bib
+    )
+    latest: dict = {}
+    for time_event in time_events:
+        if time_event["timing_point"] == "Finish" and time_event["bib"] == bib:
+            if (
+                not latest
+                or time_event["registration_time"] > latest["registration_time"]
+            ):
+                latest = time_event
+    return latest
@@ -0,0 +1,249 @@
+"""Module for one shared backend poller per event, with fan-out to listeners."""
+
+import asyncio
+import contextvars
+import copy
+import datetime
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from zoneinfo import ZoneInfo
+
+from aiohttp import web
+
+from event_service_gui.adapters import (
+    EventsAdapter,
+    RaceplansAdapter,
+    StatusAdapter,
+    TimeEventsAdapter,
+)
+from event_service_gui.adapters.event_cache import event_cache
+from event_service_gui.adapters.time_event_store import (
+    TimeEventStore,
+    get_time_event_store,
+)
+from event_service_gui.concurrency import is_unauthorized
+
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "30"))
+POLL_INTERVAL_FAST = float(os.getenv("POLL_INTERVAL_FAST", "2"))
+POLL_ACTIVE_WINDOW = float(os.getenv("POLL_ACTIVE_WINDOW", "10"))
+LISTENER_QUEUE_SIZE = 100
+SCHEDULE_REFRESH = 60
+STATUS_COUNT = 25
+
+
+def poll_interval(races: list, now: datetime.datetime) -> float:
+    """Return seconds to next poll, given the race schedule and local time."""
+    window = datetime.timedelta(minutes=POLL_ACTIVE_WINDOW)
+    for race in races:
+        try:
+            start_time = datetime.datetime.strptime(
+                race["start_time"], "%Y-%m-%dT%H:%M:%S"
+            )
+        except (KeyError, TypeError, ValueError):
+            continue
+        if abs(start_time - now) <= window:
+            return POLL_INTERVAL_FAST
+    return POLL_INTERVAL
+
+
+class EventPoller:
+    """Class representing one backend poller for an event, shared by listeners."""
+
+    def __init__(self, event_id: str) -> None:
+        """Initialize a stopped poller."""
+        self.event_id = event_id
+        # listener queues, with the token of the user listening
+        self.listeners: dict[asyncio.Queue, str] = {}
+        self.task: asyncio.Task | None = None
+        self.interval = POLL_INTERVAL_FAST
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget snapshot and schedule, e.g. when polling stops."""
+        # version of the time event store last published, None before first poll
+        self.version: int | None = None
+        self.time_events: list = []
+        self.polled_at = 0.0
+        self.generation = 0
+        self.status_keys: set[str] | None = None
+        self.schedule_checked = 0.0
+
+    @property
+    def token(self) -> str:
+        """Return token of the newest listener, used for the next poll."""
+        return next(reversed(self.listeners.values()), "")
+
+    def listen(self, token: str) -> asyncio.Queue:
+        """Return a new listener queue, start polling if not running."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=LISTENER_QUEUE_SIZE)
+        self.listeners[queue] = token
+        if not self.task or self.task.done():
+            # fresh context - the request cache of the caller must not be used
+            self.task = asyncio.create_task(self.run(), context=contextvars.Context())
+        return queue
+
+    def stop_listening(self, queue: asyncio.Queue) -> None:
+        """Remove listener queue, stop polling and forget poller when none are left."""
+        self.listeners.pop(queue, None)
+        if self.listeners:
+            return
+        if self.task:
+            self.task.cancel()
+            self.task = None
+            self.reset()
+        if _pollers.get(self.event_id) is self:
+            del _pollers[self.event_id]
+
+    def is_fresh(self, token: str) -> bool:
+        """Return true if the snapshot can be used instead of a backend call."""
+        return (
+            # only users listening have had their token accepted by the backend
+            token in self.listeners.values()
+            and self.task is not None
+            and not self.task.done()
+            and self.version is not None
+            # also when polling slowly, pages must not get an old snapshot
+            and time.monotonic() - self.polled_at <= POLL_INTERVAL_FAST
+            and self.generation == event_cache.generation("time_events", self.event_id)
+        )
+
+    def publish(self, message: dict) -> None:
+        """Put message on the queue of every listener."""
+        for queue in self.listeners:
+            send(queue, message)
+
+    def reject(self, token: str) -> None:
+        """Tell listeners with a token the backend refused to log in again."""
+        for queue in [q for q, t in self.listeners.items() if t == token]:
+            del self.listeners[queue]
+            send(queue, {"type": "error", "unauthorized": True})
+
+    async def poll(self, token: str) -> None:
+        """Fetch time events once and publish changes since previous poll."""
+        generation = event_cache.generation("time_events", self.event_id)
+        store = await TimeEventsAdapter().sync_time_events(token, self.event_id)
+        if self.version is not None:
+            changes = store.changes_since(self.version)
+            if changes is None:
+                self.publish({"type": "reload"})
+            elif any(changes.values()):
+                self.publish({"type": "time_events", **changes})
+        self.version = store.version
+        self.time_events = store.list()
+        self.polled_at = time.monotonic()
+        self.generation = generation
+
+    async def poll_status(self, token: str) -> None:
+        """Fetch latest status messages and publish the new ones."""
+        status_list = await StatusAdapter().get_status(
+            token, self.event_id, STATUS_COUNT
+        )
+        keys = {
+            status.get("id") or f"{status.get('time')} {status.get('message')}": status
+            for status in status_list
+        }
+        if self.status_keys is not None:
+            for key, status in keys.items():
+                if key not in self.status_keys:
+                    self.publish(
+                        {
+                            "type": "status",
+                            "message": f"{status.get('time', '')} {status.get('message', '')}",
+                        }
+                    )
+        self.status_keys = set(keys)
+
+    async def update_interval(self, token: str) -> None:
+        """Set poll interval from the race schedule, checked every minute."""
+        if time.monotonic() - self.schedule_checked < SCHEDULE_REFRESH:
+            return
+        self.schedule_checked = time.monotonic()
+        try:
+            event = await EventsAdapter().get_event(token, self.event_id)
+            races = await RaceplansAdapter().get_all_races(token, self.event_id)
+        except Exception as e:
+            if is_unauthorized(e):
+                raise
+            logging.warning(f"Schedule for event {self.event_id} failed - {e}")
+            return
+        time_zone = event.get("timezone")
+        now = datetime.datetime.now(ZoneInfo(time_zone) if time_zone else datetime.UTC)
+        interval = poll_interval(races, now.replace(tzinfo=None))
+        if interval != self.interval:
+            logging.info(f"Poller for event {self.event_id} - interval {interval}s")
+        self.interval = interval
+
+    async def run(self) -> None:
+        """Poll until there are no listeners with a valid login."""
+        logging.info(f"Poller started for event {self.event_id}")
+        try:
+            while self.listeners:
+                token = self.token
+                try:
+                    await self.update_interval(token)
+                    await self.poll(token)
+                except Exception as e:
+                    if is_unauthorized(e):
+                        # try again at once, with the token of another listener
+                        self.reject(token)
+                        continue
+                    logging.warning(f"Poller for event {self.event_id} failed - {e}")
+                    self.publish(
+                        {"type": "status", "message": f"Feil ved henting: {e}"}
+                    )
+                try:
+                    await self.poll_status(token)
+                except Exception as e:
+                    # status messages are optional, photo-service may not run
+                    logging.debug(f"Status for event {self.event_id} failed - {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            logging.info(f"Poller stopped for event {self.event_id}")
+
+
+def send(queue: asyncio.Queue, message: dict) -> None:
+    """Put message on a listener queue, replace old messages with reload if full."""
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        queue.get_nowait()
+        queue.put_nowait({"type": "reload"})
+
+
+# one poller per event with listeners
+_pollers: dict[str, EventPoller] = {}
+
+
+def get_poller(event_id: str) -> EventPoller:
+    """Return the poller for event, create it if needed."""
+    if event_id not in _pollers:
+        _pollers[event_id] = EventPoller(event_id)
+    return _pollers[event_id]
+
+
+async def get_time_events(token: str, event_id: str) -> list:
+    """Return a copy of the time events for event, from the snapshot when fresh."""
+    poller = _pollers.get(event_id)
+    if poller and poller.is_fresh(token):
+        return copy.deepcopy(poller.time_events)
+    return await TimeEventsAdapter().get_time_events_by_event_id(token, event_id)
+
+
+async def sync_time_event_store(token: str, event_id: str) -> TimeEventStore:
+    """Return the shared time event store for event - readers must not modify it."""
+    poller = _pollers.get(event_id)
+    if poller and poller.is_fresh(token):
+        return get_time_event_store(event_id)
+    return await TimeEventsAdapter().sync_time_events(token, event_id)
+
+
+async def pollers_ctx(_app: web.Application) -> AsyncIterator[None]:
+    """Stop all pollers when the application shuts down."""
+    yield
+    tasks = [poller.task for poller in _pollers.values() if poller.task]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _pollers.clear()
@@ -0,0 +1,88 @@
+"""Module for open places for late registration (etteranmelding) in an event."""
+
+import asyncio
+import copy
+import logging
+
+from event_service_gui.adapters import RaceclassesAdapter, RaceplansAdapter
+from event_service_gui.adapters.event_cache import CACHE_TTLS, event_cache
+
+
+def open_places(race: dict) -> int:
+    """Return places not taken in race."""
+    return race["max_no_of_contestants"] - race["no_of_contestants"]
+
+
+def get_available_places(raceclass: dict, races: list) -> int:
+    """Return places available for late registration in raceclass."""
+    # unranked - open places in all round 1 races
+    if not raceclass["ranking"]:
+        return sum(open_places(race) for race in races if race["round"] == "R1")
+    # ranked - semi-final C is the bottleneck
+    semi_c = [race for race in races if f"{race['round']}{race['index']}" == "SC"]
+    if semi_c:
+        return sum(open_places(race) for race in semi_c)
+    # only the one (the first) final has open places
+    return next((open_places(race) for race in races if race["round"] == "F"), 0)
+
+
+def compute_available_etteranmelding(raceclasses: list, races: list) -> list:
+    """Return available places per raceclass, see get_available_etteranmelding."""
+    races_by_raceclass: dict[str, list] = {}
+    for race in races:
+        races_by_raceclass.setdefault(race["raceclass"], []).append(race)
+    return [
+        {
+            "ageclasses": raceclass["ageclasses"],
+            "available_places": get_available_places(
+                raceclass, races_by_raceclass.get(raceclass["name"], [])
+            ),
+        }
+        for raceclass in raceclasses
+    ]
+
+
+async def get_available_etteranmelding(token: str, event_id: str) -> list:
+    """Calculate available late registration (etteranmelding) slots per raceclass.
+
+    This function determines how many additional contestants can be registered
+    for each raceclass in an event, based on available capacity in races.
+    The result is cached per event, and cleared with the races and
+    raceclasses it is computed from.
+
+    Args:
+        token: Authentication token for API access
+        event_id: Unique identifier for the event
+
+    Returns:
+        List of dictionaries containing availability information for each raceclass.
+        Each dictionary has:
+        - ageclasses (list): List of age classes in this raceclass
+        - available_places (int): Number of available registration slots
+
+    Example:
+        >>> await get_available_etteranmelding(token, "event-123")
+        [
+            {"ageclasses": ["G11", "G12"], "available_places": 5},
+            {"ageclasses": ["J11"], "available_places": 0}
+        ]
+    """
+    found, event_availability = event_cache.get("late_registration", event_id, token)
+    if found:
+        logging.debug(f"event_cache hit - late_registration {event_id}")
+        return copy.deepcopy(event_availability)
+    generation = event_cache.generation("late_registration", event_id)
+    raceclasses, races = await asyncio.gather(
+        RaceclassesAdapter().get_raceclasses(token, event_id),
+        RaceplansAdapter().get_all_races(token, event_id),
+    )
+    event_availability = compute_available_etteranmelding(raceclasses, races)
+    event_cache.set(
+        "late_registration",
+        event_id,
+        token,
+        event_availability,
+        ttl=CACHE_TTLS["late_registration"],
+        generation=generation,
+    )
+    return copy.deepcopy(event_availability)
@@ -0,0 +1,112 @@
+"""Module for time events of an event bucketed for the control views."""
+
+import bisect
+import heapq
+from collections import OrderedDict
+
+from event_service_gui.adapters.event_cache import CACHE_MAX_ENTRIES
+from event_service_gui.adapters.time_event_store import TimeEventStore
+
+ERRORS = "errors"
+PASSERINGER = "passeringer"
+TEMPLATES = "templates"
+
+
+def get_buckets(time_event: dict) -> list[str]:
+    """Return the buckets a time event belongs to."""
+    if time_event.get("timing_point") == "Template":
+        return [TEMPLATES]
+    if time_event.get("status") == "Error":
+        return [PASSERINGER, ERRORS]
+    return [PASSERINGER]
+
+
+class PasseringIndex:
+    """Class representing time events bucketed by kind and race."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Remove all time events."""
+        self.version: int | None = None
+        self._time_events: dict[str, dict] = {}
+        # (bucket, race) -> (order first seen, time event id), kept sorted
+        self._buckets: dict[tuple[str, str], list[tuple[int, str]]] = {}
+        # time event id -> (order first seen, bucket keys)
+        self._placement: dict[str, tuple[int, list[tuple[str, str]]]] = {}
+        self._next_seq = 0
+
+    def update(self, store: TimeEventStore) -> None:
+        """Apply changes in the store since the last update."""
+        changes = None if self.version is None else store.changes_since(self.version)
+        if changes is None:
+            self.reset()
+            for time_event in store.list():
+                self._add(time_event)
+        else:
+            for te_id in changes["removed"]:
+                self._remove(te_id)
+            for time_event in changes["changed"]:
+                self._add(time_event, self._remove(time_event["id"]))
+            for time_event in changes["added"]:
+                self._add(time_event)
+        self.version = store.version
+
+    def _add(self, time_event: dict, seq: int | None = None) -> None:
+        """Put time event in its buckets, as seen first at seq if given."""
+        te_id = time_event["id"]
+        race = time_event.get("race") or ""
+        if seq is None:
+            seq = self._next_seq
+            self._next_seq += 1
+        keys = [(bucket, race) for bucket in get_buckets(time_event)]
+        for key in keys:
+            bisect.insort(self._buckets.setdefault(key, []), (seq, te_id))
+        self._time_events[te_id] = time_event
+        self._placement[te_id] = (seq, keys)
+
+    def _remove(self, te_id: str) -> int | None:
+        """Take time event out of its buckets, return when it was first seen."""
+        if te_id not in self._placement:
+            return None
+        seq, keys = self._placement.pop(te_id)
+        del self._time_events[te_id]
+        for key in keys:
+            bucket = self._buckets[key]
+            del bucket[bisect.bisect_left(bucket, (seq, te_id))]
+            if not bucket:
+                del self._buckets[key]
+        return seq
+
+    def select(self, bucket: str, valgt_klasse: str = "") -> list:
+        """Return time events in bucket for races containing valgt_klasse, in order."""
+        # as before the index, valgt_klasse may match any part of the race name
+        selected = [
+            entries
+            for (key_bucket, race), entries in self._buckets.items()
+            if key_bucket == bucket and valgt_klasse in race
+        ]
+        return [
+            self._time_events[te_id]
+            for _seq, te_id in (
+                selected[0] if len(selected) == 1 else heapq.merge(*selected)
+            )
+        ]
+
+
+# one index per event, in LRU order
+_indexes: OrderedDict[str, PasseringIndex] = OrderedDict()
+
+
+def get_passering_index(event_id: str, store: TimeEventStore) -> PasseringIndex:
+    """Return the index for event, updated with changes in store."""
+    if event_id not in _indexes:
+        _indexes[event_id] = PasseringIndex()
+        while len(_indexes) > CACHE_MAX_ENTRIES:
+            _indexes.popitem(last=False)
+    _indexes.move_to_end(event_id)
+    index = _indexes[event_id]
+    index.update(store)
+    return index
@@ -0,0 +1,325 @@
+"""Module for next race routing - where each rank in a race goes next."""
+
+import json
+import logging
+from collections import OrderedDict
+
+from event_service_gui.adapters import RaceplansAdapter
+from event_service_gui.adapters.event_cache import CACHE_MAX_ENTRIES
+
+# (event_id, raceclass) -> (fingerprint of races, compiled routes), in LRU order
+_compiled_routes: OrderedDict[tuple[str, str], tuple[str, dict]] = OrderedDict()
+
+
+# only used to generate next race templates - finish registration and control
+# views read the stored templates, which may have been adjusted since
+class RoutingTable:
+    """Class representing next race and position for each (race, rank) in an event."""
+
+    def __init__(self, event_id: str, races: list) -> None:
+        """Build routing table from the races of an event."""
+        self._routes: dict[tuple[str, int], dict] = {}
+        races_by_raceclass: dict[str, list] = {}
+        for race in races:
+            races_by_raceclass.setdefault(race.get("raceclass"), []).append(race)
+        for raceclass, raceclass_races in races_by_raceclass.items():
+            self._routes.update(
+                self.compile_raceclass(event_id, raceclass, raceclass_races)
+            )
+        # forget raceclasses removed from the raceplan
+        for key in [k for k in _compiled_routes if k[0] == event_id]:
+            if key[1] not in races_by_raceclass:
+                del _compiled_routes[key]
+
+    @staticmethod
+    def compile_raceclass(event_id: str, raceclass: str, races: list) -> dict:
+        """Return routes for one raceclass, compile if races have changed."""
+        fingerprint = json.dumps(
+            [
+                [
+                    race.get(key)
+                    for key in [
+                        "id",
+                        "round",
+                        "index",
+                        "heat",
+                        "rule",
+                        "max_no_of_contestants",
+                        "start_time",
+                    ]
+                ]
+                for race in races
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        compiled = _compiled_routes.get((event_id, raceclass))
+        if compiled and compiled[0] == fingerprint:
+            _compiled_routes.move_to_end((event_id, raceclass))
+            return compiled[1]
+
+        routes = {}
+        race_lookup = RaceLookup(races)
+        for race in races:
+            if race.get("round") in ["Q", "S"]:
+                for rank in range(1, race["max_no_of_contestants"] + 1):
+                    time_event = {"bib": 0, "race_id": race["id"], "rank": rank}
+                    start_entry = get_next_start_entry(time_event, races, race_lookup)
+                    if start_entry:
+                        routes[(race["id"], rank)] = start_entry
+        _compiled_routes[(event_id, raceclass)] = (fingerprint, routes)
+        _compiled_routes.move_to_end((event_id, raceclass))
+        while len(_compiled_routes) > CACHE_MAX_ENTRIES:
+            _compiled_routes.popitem(last=False)
+        logging.debug(f"Compiled routing for {raceclass} - {len(routes)} routes")
+        return routes
+
+    def next_start_entry(self, race_id: str, rank: int) -> dict:
+        """Return next race_id, race_round and starting_position, empty if out."""
+        return dict(self._routes.get((race_id, rank), {}))
+
+
+async def get_routing_table(
+    token: str, event_id: str, races: list | None = None
+) -> RoutingTable:
+    """Get routing table for an event, races are fetched unless given."""
+    if races is None:
+        races = await RaceplansAdapter().get_all_races(token, event_id)
+    return RoutingTable(event_id, races)
+
+
+class RaceLookup:
+    """Class representing races indexed for next race calculations."""
+
+    def __init__(self, races: list) -> None:
+        """Index races by id and by raceclass and round."""
+        self.by_id: dict[str, tuple[int, dict]] = {}
+        # (raceclass, round + index) -> [(position in race list, race)]
+        self.by_round: dict[tuple[str, str], list[tuple[int, dict]]] = {}
+        for position, race in enumerate(races):
+            self.by_id[race.get("id")] = (position, race)
+            key = (race.get("raceclass"), f"{race.get('round')}{race.get('index')}")
+            self.by_round.setdefault(key, []).append((position, race))
+
+    def get(self, race_id: str) -> dict:
+        """Return race by id, empty if not found."""
+        return self.by_id.get(race_id, (0, {}))[1]
+
+    def next_round_candidates(self, race_id: str, next_round: str) -> list:
+        """Return races in next round (e.g. SA) of the raceclass after the race."""
+        position, race = self.by_id[race_id]
+        return [
+            candidate
+            for candidate_position, candidate in self.by_round.get(
+                (race.get("raceclass"), next_round), []
+            )
+            if candidate_position > position
+        ]
+
+    def heat_count(self, race_id: str) -> int:
+        """Return heat of last race in same round after the race, or its own heat."""
+        position, race = self.by_id[race_id]
+        heat_count = race.get("heat")
+        for same_round_position, same_round_race in self.by_round[
+            (race.get("raceclass"), f"{race.get('round')}{race.get('index')}")
+        ]:
+            if same_round_position > position:
+                heat_count = same_round_race.get("heat")
+        return heat_count
+
+
+def get_next_start_entry(
+    time_event: dict, races: list, race_lookup: RaceLookup | None = None
+) -> dict:
+    """Generate start_entry - empty result if not qualified."""
+    start_entry = {}
+    if race_lookup is None:
+        race_lookup = RaceLookup(races)
+
+    # find relevant race and get next race rule
+    next_race = populate_next_race(time_event, race_lookup, next_race_template())
+
+    # interpret rule part 2 - find next round and get race id
+    ilimitplace = 0
+    ilimitcurrent = 0
+    for race_item in next_race:
+        try:
+            ilimitcurrent = race_item["qualified"]
+            limit_rank = ilimitcurrent + ilimitplace
+        except Exception:
+            # if error assume all remaining racers are qualified
+            limit_rank = 99
+        if time_event["rank"] <= limit_rank:
+            race_item["current_contestant_qualified"] = True
+            # now we have next round - get race id
+            time_event["rank_qualified"] = time_event["rank"] - ilimitplace
+            start_entry = calculate_next_start_entry(race_item, time_event, race_lookup)
+            break
+        ilimitplace = limit_rank
+    return start_entry
+
+
+def calculate_next_start_entry(
+    race_item: dict, time_event: dict, race_lookup: RaceLookup
+) -> dict:
+    """Identify next race_id and generate start entry data."""
+    start_entry = {
+        "bib": time_event["bib"],
+        "race_id": "",
+        "race_round": "",
+        "scheduled_start_time": "",
+        "starting_position": time_event["rank_qualified"],
+    }
+    # 1. Get previous race and all possible next race candidates
+    previous_race = race_lookup.get(time_event.get("race_id"))
+    if not previous_race:
+        return start_entry
+    previous_heat_count = race_lookup.heat_count(previous_race["id"])
+    next_race_candidates = race_lookup.next_round_candidates(
+        previous_race["id"], race_item["round"]
+    )
+
+    # 2. pick a next race
+    next_race_count = len(next_race_candidates)
+    if next_race_count > 0:
+        # estimated rank from previous round is:
+        previous_heat_rank = time_event["rank_qualified"]
+        previous_heat_number = int(previous_race["heat"])
+        previous_round_rank = (
+            previous_heat_count * (previous_heat_rank - 1) + previous_heat_number
+        )
+
+        # distribute contestants evenly in next round, winners in pos 1 osv.
+        next_race_tuple = divmod(
+            previous_round_rank + (next_race_count - 1), next_race_count
+        )
+        # quotient gives the position
+        next_race_position = next_race_tuple[0]
+        # remainder gives the heat, need to add one as heat number starts on 1
+        next_race_heat = next_race_tuple[1] + 1
+
+        for race in next_race_candidates:
+            if race.get("heat") == next_race_heat:
+                logging.debug(f"Found next race: {race}")
+                start_entry["race_id"] = race.get("id")
+                start_entry["scheduled_start_time"] = race.get("start_time")
+                if race.get("round") == "F":
+                    start_entry["race_round"] = (
+                        f"{race.get('round')}{race.get('index')}"
+                    )
+                else:
+                    start_entry["race_round"] = (
+                        f"{race.get('round')}{race.get('index')}{race.get('heat')}"
+                    )
+        start_entry["starting_position"] = next_race_position
+
+        logging.debug(
+            f"Next round:{next_race_count} current rank:{previous_round_rank}"
+        )
+        logging.debug(
+            f"Next:{next_race_heat} pos:{next_race_position}, id: {start_entry['race_id']}"
+        )
+    return start_entry
+
+
+def populate_next_race(
+    time_event: dict, race_lookup: RaceLookup, next_race: list
+) -> list:
+    """Return rules matrix for next race."""
+    race = race_lookup.get(time_event["race_id"])
+    for key, value in race.get("rule", {}).items():
+        if key == "S":
+            for x, y in value.items():
+                if x == "A":
+                    next_race[0]["qualified"] = y
+                elif x == "C":
+                    next_race[1]["qualified"] = y
+        elif key == "F":
+            for x, y in value.items():
+                if x == "A":
+                    next_race[2]["qualified"] = y
+                elif x == "B":
+                    next_race[3]["qualified"] = y
+                elif x == "B1":
+                    next_race[4]["qualified"] = y
+                elif x == "B2":
+                    next_race[5]["qualified"] = y
+                elif x == "B3":
+                    next_race[6]["qualified"] = y
+                elif x == "C":
+                    next_race[7]["qualified"] = y
+                elif x == "C1":
+                    next_race[8]["qualified"] = y
+                elif x == "C2":
+                    next_race[9]["qualified"] = y
+                elif x == "C3":
+                    next_race[10]["qualified"] = y
+                elif x == "C4":
+                    next_race[11]["qualified"] = y
+    return next_race
+
+
+def next_race_template() -> list:
+    """Return template settings for next race."""
+    return [
+        {
+            "round": "SA",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "SC",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FA",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FB",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FB1",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FB2",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FB3",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FC",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FC1",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FC2",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FC3",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+        {
+            "round": "FC4",
+            "qualified": 0,
+            "current_contestant_qualified": False,
+        },
+    ]
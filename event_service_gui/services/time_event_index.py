@@ -0,0 +1,52 @@
+"""Module for time events indexed for fast lookup."""
+
+
+class TimeEventIndex:
+    """Class representing time events indexed by timing point, bib, race and rank."""
+
+    def __init__(self, time_events: list) -> None:
+        """Index the time events."""
+        self.time_events = time_events
+        self._by_bib: dict[tuple[str, int], tuple[int, dict]] = {}
+        self._templates: dict[tuple[str, int], dict] = {}
+        self._by_timing_point: dict[str, list] = {}
+        self._by_race: dict[str, list] = {}
+        for position, time_event in enumerate(time_events):
+            timing_point = time_event.get("timing_point", "")
+            self._by_timing_point.setdefault(timing_point, []).append(time_event)
+            self._by_race.setdefault(time_event.get("race_id", ""), []).append(
+                time_event
+            )
+            if timing_point == "Template":
+                key = (time_event.get("race_id", ""), time_event.get("rank"))
+                self._templates[key] = time_event
+            else:
+                key = (timing_point, time_event.get("bib"))
+                self._by_bib[key] = (position, time_event)
+
+    def get(self, timing_point: str, bib: int) -> dict:
+        """Return time event for bib at timing point, empty if not registered."""
+        return self._by_bib.get((timing_point, bib), (0, {}))[1]
+
+    def latest(self, bib: int, timing_points: list[str]) -> dict:
+        """Return the last registered time event for bib among the timing points."""
+        found = [
+            self._by_bib[(timing_point, bib)]
+            for timing_point in timing_points
+            if (timing_point, bib) in self._by_bib
+        ]
+        if not found:
+            return {}
+        return max(found, key=lambda x: x[0])[1]
+
+    def template(self, race_id: str, rank: int) -> dict:
+        """Return next race template for rank in race, empty if not found."""
+        return self._templates.get((race_id, rank), {})
+
+    def of_timing_point(self, timing_point: str) -> list:
+        """Return all time events at timing point, in original order."""
+        return self._by_timing_point.get(timing_point, [])
+
+    def of_race(self, race_id: str) -> "TimeEventIndex":
+        """Return an index with time events for one race only."""
+        return TimeEventIndex(self._by_race.get(race_id, []))
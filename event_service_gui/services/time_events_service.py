@@ -1,5 +1,7 @@
 """Module for time event service."""
 
+import asyncio
+import copy
 import logging
 
 from aiohttp import web
@@ -12,15 +14,25 @@ from event_service_gui.adapters import (
     StartAdapter,
     TimeEventsAdapter,
 )
+from event_service_gui.concurrency import (
+    ProgressCallback,
+    gather_limited,
+    is_unauthorized,
+    run_bulk,
+)
+
+from .race_routing import get_routing_table
+from .time_event_index import TimeEventIndex
 
 
 class TimeEventsService:
     """Class representing service layer for time_events."""
 
-    async def generate_next_race_templates(self, token: str, event: dict) -> str:
+    async def generate_next_race_templates(
+        self, token: str, event: dict, progress: ProgressCallback | None = None
+    ) -> str:
         """Calculate next race for the entire team."""
         informasjon = ""
-        i = 0
         time_stamp_now = EventsAdapter().get_local_time(event, "log")
         time_event = {
             "bib": 0,
@@ -42,40 +54,56 @@ class TimeEventsService:
                 token, event["id"], "Template"
             )
         )
-        for template in current_templates:
-            w_id = await TimeEventsAdapter().delete_time_event(token, template["id"])
-            logging.debug(f"Deleted template time_event id {w_id}")
+        deleted = await run_bulk(
+            current_templates,
+            lambda template: TimeEventsAdapter().delete_time_event(
+                token, template["id"]
+            ),
+            description="Slett templates",
+            progress=progress,
+        )
+        if deleted.failed:
+            informasjon += f" Sletting av gamle templates: {deleted}"
 
         # 2. get list of all races and loop, except finals.
         races = await RaceplansAdapter().get_all_races(token, event["id"])
         if len(races) == 0:
-            informasjon = f"{informasjon} Ingen kjøreplaner funnet."
-        else:
-            for race in races:
-                if race["round"] in ["Q", "S"]:
-                    time_event["race"] = (
-                        f"{race['raceclass']}-{race['round']}{race['index']}{race['heat']}"
-                    )
-                    time_event["race_id"] = race["id"]
-
-                    # loop and simulate result for pos 1 to 10
-                    for x in range(1, race["max_no_of_contestants"] + 1):
-                        time_event["rank"] = x
-                        next_start_entry = get_next_start_entry(time_event, races)
-                        logging.debug(f"Time_event: {time_event}")
-                        logging.debug(f"Start_entry: {next_start_entry}")
-                        if len(next_start_entry) > 0:
-                            time_event["next_race"] = next_start_entry["race_round"]
-                            time_event["next_race_id"] = next_start_entry["race_id"]
-                            time_event["next_race_position"] = next_start_entry[
-                                "starting_position"
-                            ]
-                            new_t_e = await TimeEventsAdapter().create_time_event(
-                                token, time_event
-                            )
-                            logging.debug(f"Created template: {new_t_e['status']}")
-                            i += 1
-        return f"Suksess! Opprettet {i} templates. "
+            return f"{informasjon} Ingen kjøreplaner funnet."
+        routing_table = await get_routing_table(token, event["id"], races)
+        new_templates = []
+        for race in races:
+            if race["round"] in ["Q", "S"]:
+                time_event["race"] = (
+                    f"{race['raceclass']}-{race['round']}{race['index']}{race['heat']}"
+                )
+                time_event["race_id"] = race["id"]
+
+                # loop and simulate result for pos 1 to 10
+                for x in range(1, race["max_no_of_contestants"] + 1):
+                    time_event["rank"] = x
+                    next_start_entry = routing_table.next_start_entry(race["id"], x)
+                    logging.debug(f"Time_event: {time_event}")
+                    logging.debug(f"Start_entry: {next_start_entry}")
+                    if len(next_start_entry) > 0:
+                        time_event["next_race"] = next_start_entry["race_round"]
+                        time_event["next_race_id"] = next_start_entry["race_id"]
+                        time_event["next_race_position"] = next_start_entry[
+                            "starting_position"
+                        ]
+                        new_templates.append(copy.deepcopy(time_event))
+
+        created = await run_bulk(
+            new_templates,
+            lambda template: TimeEventsAdapter().create_time_event(token, template),
+            description="Opprett templates",
+            progress=progress,
+            retry=False,
+        )
+        if created.failed:
+            return f"{informasjon} Opprettet templates: {created}"
+        return (
+            f"{informasjon} Suksess! Opprettet {created.succeeded} templates. ".lstrip()
+        )
 
     async def shuffle_semi_final_templates(self, token: str, event_id: str) -> str:
         """Shift right in semi finals for all contestants with given qarter_final."""
@@ -203,86 +231,162 @@ class TimeEventsService:
 
     async def create_finish_time_events(self, token: str, time_events: list) -> str:
         """Validate, enrich and create finish time_event."""
-        # Get next race from template
-        w_id = 0
-        informasjon = ""
-        next_start_entries = []
-        start_list = []
-
-        if len(time_events) > 0:
-            next_start_entries = await TimeEventsAdapter().get_time_events_by_race_id(
-                token, time_events[0]["race_id"]
+        if len(time_events) == 0:
+            return ""
+        event_id = time_events[0]["event_id"]
+        race_id = time_events[0]["race_id"]
+        race_time_events, start_list = await asyncio.gather(
+            TimeEventsAdapter().get_time_events_by_race_id(token, race_id),
+            StartAdapter().get_all_starts_by_event(token, event_id),
+        )
+        templates = TimeEventIndex(race_time_events)
+
+        # prefetch contestants and next races not in the routing table
+        bibs = list(dict.fromkeys(time_event["bib"] for time_event in time_events))
+        contestants = dict(
+            zip(
+                bibs,
+                await gather_limited(
+                    self.get_contestant(token, event_id, bib) for bib in bibs
+                ),
+                strict=True,
             )
-            start_list = await StartAdapter().get_all_starts_by_event(
-                token, time_events[0]["event_id"]
+        )
+        # start times of next races are read fresh, not from the event cache
+        next_race_ids = list(
+            dict.fromkeys(
+                template["next_race_id"]
+                for template in (
+                    templates.template(race_id, time_event["rank"])
+                    for time_event in time_events
+                )
+                if template
             )
+        )
+
+        async def get_next_race(next_race_id: str) -> tuple[str, dict]:
+            race = await RaceplansAdapter().get_race_by_id(token, next_race_id)
+            return next_race_id, race
+
+        fetched = await run_bulk(
+            next_race_ids, get_next_race, description="Hent neste heat"
+        )
+        fetched.raise_if_unauthorized()
+        next_races = dict(fetched.results)
+        next_race_errors = dict(fetched.failed)
+
+        registrations = []
+        informasjon = ""
         for time_event in time_events:
-            contestant = await ContestantsAdapter().get_contestant_by_bib(
-                token, time_event["event_id"], time_event["bib"]
-            )
+            contestant = contestants[time_event["bib"]]
+            if isinstance(contestant, Exception):
+                informasjon += f"<br> - ERROR! Bib {time_event['bib']}: {contestant} "
+                continue
             if not contestant:
                 informasjon += (
                     f"<br> - ERROR! Bib {time_event['bib']}: Fant ingen deltaker. "
                 )
+                continue
+            next_start_entry = {}
+            next_start_template = templates.template(race_id, time_event["rank"])
+            if next_start_template.get("next_race_id") in next_race_errors:
+                e = next_race_errors[next_start_template["next_race_id"]]
+                informasjon += f"<br> - ERROR! Bib {time_event['bib']}: {e} "
+                continue
+            # Create or update time event
+            if len(next_start_template) > 0:
+                time_event["next_race"] = next_start_template["next_race"]
+                time_event["next_race_id"] = next_start_template["next_race_id"]
+                time_event["next_race_position"] = next_start_template[
+                    "next_race_position"
+                ]
+                next_race = next_races[time_event["next_race_id"]]
+                # create next start entry
+                next_start_entry = {
+                    "race_id": time_event["next_race_id"],
+                    "startlist_id": start_list[0]["id"],
+                    "bib": time_event["bib"],
+                    "name": f"{contestant['first_name']} {contestant['last_name']}",
+                    "club": contestant["club"],
+                    "scheduled_start_time": next_race["start_time"],
+                    "starting_position": time_event["next_race_position"],
+                    "status": "OK",
+                }
             else:
-                next_start_template = {}
-                next_start_entry = {}
-                for entry in next_start_entries:
-                    if (entry["timing_point"] == "Template") and (
-                        entry["rank"] == time_event["rank"]
-                    ):
-                        next_start_template = entry
-                # Create or update time event
-                if len(next_start_template) > 0:
-                    time_event["next_race"] = next_start_template["next_race"]
-                    time_event["next_race_id"] = next_start_template["next_race_id"]
-                    time_event["next_race_position"] = next_start_template[
-                        "next_race_position"
-                    ]
-
-                    next_race = await RaceplansAdapter().get_race_by_id(
-                        token, time_event["next_race_id"]
-                    )
-                    # create next start entry
-                    next_start_entry = {
-                        "race_id": time_event["next_race_id"],
-                        "startlist_id": start_list[0]["id"],
-                        "bib": time_event["bib"],
-                        "name": f"{contestant['first_name']} {contestant['last_name']}",
-                        "club": contestant["club"],
-                        "scheduled_start_time": next_race["start_time"],
-                        "starting_position": time_event["next_race_position"],
-                        "status": "OK",
-                    }
-                else:
-                    time_event["next_race"] = "Ute"
-                    time_event["next_race_id"] = ""
-                # add name and club to time_event
-                time_event["name"] = (
-                    f"{contestant['first_name']} {contestant['last_name']}"
+                time_event["next_race"] = "Ute"
+                time_event["next_race_id"] = ""
+            # add name and club to time_event
+            time_event["name"] = f"{contestant['first_name']} {contestant['last_name']}"
+            time_event["club"] = contestant["club"]
+            registrations.append((time_event, next_start_entry))
+
+        # start entries in the same next race update its bookkeeping in
+        # race-service, so these are registered one at a time, in rank order
+        groups: dict[str, list] = {}
+        for registration in registrations:
+            groups.setdefault(registration[0]["next_race_id"], []).append(registration)
+
+        async def register_group(group: list) -> list:
+            return [
+                await self.register_finish(token, time_event, next_start_entry)
+                for time_event, next_start_entry in group
+            ]
+
+        for results in await gather_limited(
+            register_group(group) for group in groups.values()
+        ):
+            for result in results:
+                if isinstance(result, Exception):
+                    if is_unauthorized(result):
+                        raise result
+                    informasjon += f"<br> - ERROR! {result} "
+                    continue
+                informasjon += result
+        return informasjon
+
+    async def get_contestant(
+        self, token: str, event_id: str, bib: int
+    ) -> dict | Exception:
+        """Return contestant with bib, or the exception if lookup failed."""
+        try:
+            return await ContestantsAdapter().get_contestant_by_bib(
+                token, event_id, bib
+            )
+        except Exception as e:
+            if is_unauthorized(e):
+                raise
+            logging.warning(f"Contestant with bib {bib} not found - {e}")
+            return e
+
+    async def register_finish(
+        self, token: str, time_event: dict, next_start_entry: dict
+    ) -> str | Exception:
+        """Create or update finish time event, then start entry in next race."""
+        try:
+            result_ok = False
+            informasjon = ""
+            if len(time_event["id"]) > 0:
+                # update existing time event
+                w_id = await TimeEventsAdapter().update_time_event(
+                    token, time_event["id"], time_event
                 )
-                time_event["club"] = contestant["club"]
-                result_ok = False
-                if len(time_event["id"]) > 0:
-                    # update existing time event
-                    w_id = await TimeEventsAdapter().update_time_event(
-                        token, time_event["id"], time_event
-                    )
+                result_ok = True
+                informasjon += f" Updated time event {w_id}. "
+            else:
+                new_t_e = await TimeEventsAdapter().create_time_event(token, time_event)
+                if new_t_e["status"] == "OK":
+                    informasjon += f"{new_t_e['bib']}: {new_t_e['rank']} pl. "
                     result_ok = True
-                    informasjon += f" Updated time event {w_id}. "
-                else:
-                    new_t_e = await TimeEventsAdapter().create_time_event(
-                        token, time_event
-                    )
-                    if new_t_e["status"] == "OK":
-                        informasjon += f"{new_t_e['bib']}: {new_t_e['rank']} pl. "
-                        result_ok = True
-                    # error, return info to user
-                    elif new_t_e["changelog"]:
-                        informasjon += f"{new_t_e['changelog'][-1]['comment']} <br>"
-                if time_event["next_race"] != "Ute" and result_ok:
-                    await StartAdapter().create_start_entry(token, next_start_entry)
-
+                # error, return info to user
+                elif new_t_e["changelog"]:
+                    informasjon += f"{new_t_e['changelog'][-1]['comment']} <br>"
+            if time_event["next_race"] != "Ute" and result_ok:
+                await StartAdapter().create_start_entry(token, next_start_entry)
+        except Exception as e:
+            if is_unauthorized(e):
+                return e
+            logging.warning(f"Finish for bib {time_event['bib']} failed - {e}")
+            return f"<br> - ERROR! Bib {time_event['bib']}: {e} "
         return informasjon
 
 
@@ -309,204 +413,3 @@ def shift_right_across_list_by(
             result[i][key] = data[(i - shift) % len(data)][key]
 
     return result
-
-
-def get_next_start_entry(time_event: dict, races: list) -> dict:
-    """Generate start_entry - empty result if not qualified."""
-    start_entry = {}
-
-    # find relevant race and get next race rule
-    next_race = populate_next_race(time_event, races, next_race_template())
-
-    # interpret rule part 2 - find next round and get race id
-    ilimitplace = 0
-    ilimitcurrent = 0
-    for race_item in next_race:
-        try:
-            ilimitcurrent = race_item["qualified"]
-            limit_rank = ilimitcurrent + ilimitplace
-        except Exception:
-            # if error assume all remaining racers are qualified
-            limit_rank = 99
-        if time_event["rank"] <= limit_rank:
-            race_item["current_contestant_qualified"] = True
-            # now we have next round - get race id
-            time_event["rank_qualified"] = time_event["rank"] - ilimitplace
-            start_entry = calculate_next_start_entry(race_item, time_event, races)
-            break
-        ilimitplace = limit_rank
-    return start_entry
-
-
-def calculate_next_start_entry(race_item: dict, time_event: dict, races: list) -> dict:
-    """Identify next race_id and generate start entry data."""
-    start_entry = {
-        "bib": time_event["bib"],
-        "race_id": "",
-        "race_round": "",
-        "scheduled_start_time": "",
-        "starting_position": time_event["rank_qualified"],
-    }
-    previous_race = {}
-    previous_heat_count = 0
-    next_race_candidates = []
-    next_race_count = 0
-    # 1. Get previous race and all possible next race candidates
-    for race in races:
-        if race.get("id") == time_event.get("race_id"):
-            previous_race = race
-            previous_heat_count = race.get("heat")
-        elif (
-            len(previous_race) > 0
-            and previous_race.get("round") == race.get("round")
-            and previous_race.get("index") == race.get("index")
-            and previous_race.get("raceclass") == race.get("raceclass")
-        ):
-            previous_heat_count = race.get("heat")
-        elif f"{race.get('round')}{race.get('index')}" == race_item["round"]:
-            if previous_race.get("raceclass") == race.get("raceclass"):
-                next_race_candidates.append(race)
-
-    # 2. pick a next race
-    next_race_count = len(next_race_candidates)
-    if next_race_count > 0:
-        # estimated rank from previous round is:
-        previous_heat_rank = time_event["rank_qualified"]
-        previous_heat_number = int(previous_race["heat"])
-        previous_round_rank = (
-            previous_heat_count * (previous_heat_rank - 1) + previous_heat_number
-        )
-
-        # distribute contestants evenly in next round, winners in pos 1 osv.
-        next_race_tuple = divmod(
-            previous_round_rank + (next_race_count - 1), next_race_count
-        )
-        # quotient gives the position
-        next_race_position = next_race_tuple[0]
-        # remainder gives the heat, need to add one as heat number starts on 1
-        next_race_heat = next_race_tuple[1] + 1
-
-        for race in next_race_candidates:
-            if race.get("heat") == next_race_heat:
-                logging.debug(f"Found next race: {race}")
-                start_entry["race_id"] = race.get("id")
-                start_entry["scheduled_start_time"] = race.get("start_time")
-                if race.get("round") == "F":
-                    start_entry["race_round"] = (
-                        f"{race.get('round')}{race.get('index')}"
-                    )
-                else:
-                    start_entry["race_round"] = (
-                        f"{race.get('round')}{race.get('index')}{race.get('heat')}"
-                    )
-        start_entry["starting_position"] = next_race_position
-
-        logging.debug(
-            f"Next round:{next_race_count} current rank:{previous_round_rank}"
-        )
-        logging.debug(
-            f"Next:{next_race_heat} pos:{next_race_position}, id: {start_entry['race_id']}"
-        )
-    return start_entry
-
-
-def populate_next_race(time_event: dict, races: list, next_race: list) -> list:
-    """Return rules matrix for next race."""
-    for race in races:
-        if race["id"] == time_event["race_id"]:
-            for key, value in race["rule"].items():
-                if key == "S":
-                    for x, y in value.items():
-                        if x == "A":
-                            next_race[0]["qualified"] = y
-                        elif x == "C":
-                            next_race[1]["qualified"] = y
-                elif key == "F":
-                    for x, y in value.items():
-                        if x == "A":
-                            next_race[2]["qualified"] = y
-                        elif x == "B":
-                            next_race[3]["qualified"] = y
-                        elif x == "B1":
-                            next_race[4]["qualified"] = y
-                        elif x == "B2":
-                            next_race[5]["qualified"] = y
-                        elif x == "B3":
-                            next_race[6]["qualified"] = y
-                        elif x == "C":
-                            next_race[7]["qualified"] = y
-                        elif x == "C1":
-                            next_race[8]["qualified"] = y
-                        elif x == "C2":
-                            next_race[9]["qualified"] = y
-                        elif x == "C3":
-                            next_race[10]["qualified"] = y
-                        elif x == "C4":
-                            next_race[11]["qualified"] = y
-    return next_race
-
-
-def next_race_template() -> list:
-    """Return template settings for next race."""
-    return [
-        {
-            "round": "SA",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "SC",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FA",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FB",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FB1",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FB2",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FB3",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FC",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FC1",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FC2",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FC3",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-        {
-            "round": "FC4",
-            "qualified": 0,
-            "current_contestant_qualified": False,
-        },
-    ]
@@ -4,11 +4,14 @@ from .contestants import Contestants
 from .control import Control
 from .csv_list import CsvList
 from .events import Events
+from .jobs import Jobs
+from .live import Live
 from .liveness import Ping, Ready
 from .login import Login
 from .logout import Logout
 from .main import Main
 from .print_contestants import PrintContestants
+from .profiling import Profiling
 from .raceclasses import Raceclasses
 from .raceplans import Raceplans
 from .seeding import Seeding
@@ -21,11 +24,14 @@ __all__ = [
     "Control",
     "CsvList",
     "Events",
+    "Jobs",
+    "Live",
     "Login",
     "Logout",
     "Main",
     "Ping",
     "PrintContestants",
+    "Profiling",
     "Raceclasses",
     "Raceplans",
     "Ready",
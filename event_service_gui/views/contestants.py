@@ -1,10 +1,12 @@
 """Resource module for main view."""
 
+import asyncio
 import logging
+from collections.abc import AsyncIterable, AsyncIterator
+from xml.etree import ElementTree
 
 import aiohttp_jinja2
-import xmltodict
-from aiohttp import web
+from aiohttp import BodyPartReader, hdrs, web
 
 from event_service_gui.adapters import (
     ContestantsAdapter,
@@ -12,6 +14,11 @@ from event_service_gui.adapters import (
     RaceclassesAdapter,
     RaceplansAdapter,
 )
+from event_service_gui.concurrency import run_bulk
+from event_service_gui.jobs import submit_job
+from event_service_gui.services.late_registration import (
+    get_available_etteranmelding,
+)
 
 from .utils import (
     check_login,
@@ -21,6 +28,12 @@ from .utils import (
     perform_seeding,
 )
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# valid rows are created in batches of this size while the file is received
+IMPORT_BATCH_SIZE = 50
+# more failed rows than this in a file stops the import
+MAX_IMPORT_ERRORS = 10
+
 
 class Contestants(web.View):
     """Class representing the main view."""
@@ -39,7 +52,6 @@ class Contestants(web.View):
 
         try:
             user = await check_login_open(self)
-            event = await get_event(user["token"], event_id)
 
             try:
                 informasjon = self.request.rel_url.query["informasjon"]
@@ -54,12 +66,7 @@ class Contestants(web.View):
             except Exception:
                 valgt_klasse = ""
 
-            raceclasses = await RaceclassesAdapter().get_raceclasses(
-                user["token"], event_id
-            )
-
             contestant = {}
-            contestants = []
             try:
                 action = self.request.rel_url.query["action"]
                 if action == "update_one":
@@ -70,19 +77,15 @@ class Contestants(web.View):
             except Exception:
                 action = ""
 
-            if valgt_klasse == "":
-                if action == "new_manual":
-                    available_bib = await get_available_bib(user["token"], event_id)
-                else:
-                    contestants = await ContestantsAdapter().get_all_contestants(
-                        user["token"], event_id
-                    )
-            else:
-                contestants = (
-                    await ContestantsAdapter().get_all_contestants_by_raceclass(
-                        user["token"], event_id, valgt_klasse
-                    )
-                )
+            # page data is independent - fetch concurrently
+            event, raceclasses, ledige_plasser, contestants = await asyncio.gather(
+                get_event(user["token"], event_id),
+                RaceclassesAdapter().get_raceclasses(user["token"], event_id),
+                get_available_etteranmelding(user["token"], event_id),
+                get_page_contestants(user["token"], event_id, valgt_klasse, action),
+            )
+            if valgt_klasse == "" and action == "new_manual":
+                available_bib = await get_available_bib(user["token"], event_id)
             for tmp_contestant in contestants:
                 tmp_contestant["club_logo"] = EventsAdapter().get_club_logo_url(
                     tmp_contestant["club"]
@@ -101,9 +104,7 @@ class Contestants(web.View):
                     "informasjon": informasjon,
                     "raceclasses": raceclasses,
                     "valgt_klasse": valgt_klasse,
-                    "ledige_plasser": await get_available_etteranmelding(
-                        user["token"], event_id
-                    ),
+                    "ledige_plasser": ledige_plasser,
                     "lopsinfo": f"Deltakere {valgt_klasse}",
                     "username": user["name"],
                 },
@@ -121,6 +122,29 @@ class Contestants(web.View):
         informasjon = ""
         valgt_klasse = ""
         try:
+            if self.request.content_type == "multipart/form-data":
+                # file upload - the file is processed while it is received
+                reader = await self.request.multipart()
+                fields: dict = {}
+                while part := await reader.next():
+                    if not isinstance(part, BodyPartReader):
+                        continue
+                    if part.name == "file":
+                        if not fields.get("event_id"):
+                            # the file is read as it arrives, event must be known
+                            return web.Response(
+                                status=400, text="Feltet event_id må sendes før filen."
+                            )
+                        event_id = fields["event_id"]
+                        event = await get_event(user["token"], event_id)
+                        informasjon = await create_contestants_from_upload(
+                            user["token"], event, part
+                        )
+                        break
+                    fields[part.name] = await part.text()
+                return web.HTTPSeeOther(
+                    location=f"/contestants?event_id={event_id}&informasjon={informasjon}"
+                )
             form = await self.request.post()
             try:
                 action = str(form["action"])
@@ -131,44 +155,18 @@ class Contestants(web.View):
 
             # Assign bibs and perform seeding
             if "assign_bibs" in form:
-                if "start_bib" in form:
-                    start_bib = int(str(form["start_bib"]))
-                    informasjon = await ContestantsAdapter().assign_bibs(
+                start_bib = int(str(form["start_bib"])) if "start_bib" in form else None
+                description = "Tildel startnummer og seeding"
+                job = submit_job(
+                    description,
+                    event_id,
+                    lambda _job: assign_bibs_and_seed(
                         user["token"], event_id, start_bib
-                    )
-                else:
-                    informasjon = await ContestantsAdapter().assign_bibs(
-                        user["token"], event_id
-                    )
-                informasjon += await perform_seeding(
-                    user["token"], event_id, valgt_klasse
-                )
-                return web.HTTPSeeOther(
-                    location=f"/tasks?event_id={event_id}&informasjon={informasjon}"
+                    ),
                 )
+                info = f"job_id={job.id}&informasjon={description} er startet."
+                return web.HTTPSeeOther(location=f"/tasks?event_id={event_id}&{info}")
 
-            if "create" in form:
-                file = form["file"]
-                text_file = file.file  # type: ignore[attr-defined]
-                # handle file - csv supported
-                allowed_filetypes = ["text/csv", "application/vnd.ms-excel"]
-                if "excel_manual" in file.filename:  # type: ignore[attr-defined]
-                    informasjon = await create_contestants_from_excel(
-                        user["token"], event, text_file
-                    )
-                elif "ET6" in file.filename:  # type: ignore[attr-defined]
-                    informasjon = await create_contestants_from_emit(
-                        user["token"], event, text_file
-                    )
-                elif file.content_type in allowed_filetypes:  # type: ignore[attr-defined]
-                    informasjon = await ContestantsAdapter().create_contestants(
-                        user["token"], event_id, text_file
-                    )
-                else:
-                    raise Exception(f"Ugyldig filtype {file.content_type}")  # type: ignore[attr-defined]
-                return web.HTTPSeeOther(
-                    location=f"/contestants?event_id={event_id}&informasjon={informasjon}"
-                )
             if "create_one" in form:
                 url = await create_one_contestant(user["token"], event, dict(form))
                 return web.HTTPSeeOther(location=url)
@@ -213,6 +211,13 @@ class Contestants(web.View):
         return web.HTTPSeeOther(location=f"/contestants?event_id={event_id}&{info}")
 
 
+async def assign_bibs_and_seed(token: str, event_id: str, start_bib: int | None) -> str:
+    """Assign bibs to all contestants, then perform seeding."""
+    informasjon = await ContestantsAdapter().assign_bibs(token, event_id, start_bib)
+    informasjon += await perform_seeding(token, event_id, "")
+    return informasjon
+
+
 async def add_to_startlist(token: str, event_id: str, klasse: str, bib: int) -> str:
     """Add contestant to startlist in quarter final with lowest number of participants."""
     informasjon = ""
@@ -316,25 +321,38 @@ def get_contestant_from_form(event: dict, form: dict) -> dict:
 
 
 def contestant_from_xml(xml_dict: dict, event_id: str, time_stamp_now: str) -> dict:
-    """Converts an XML representation of a contestant to a dictionary."""
+    """Converts the attributes of an XML start element to a contestant dictionary."""
     return {
-        "bib": int(xml_dict["@startno"]),
-        "first_name": xml_dict["@fornavn"],
-        "last_name": xml_dict["@etternavn"],
+        "bib": int(xml_dict["startno"]),
+        "first_name": xml_dict["fornavn"],
+        "last_name": xml_dict["etternavn"],
         "birth_date": "",
         "gender": "",
-        "ageclass": xml_dict["@klasse"],
+        "ageclass": xml_dict["klasse"],
         "region": "",
-        "club": xml_dict["@team"],
+        "club": xml_dict["team"],
         "event_id": event_id,
         "email": "",
-        "team": xml_dict["@teamabb"],
+        "team": xml_dict["teamabb"],
         "seeding_points": None,
-        "minidrett_id": xml_dict["@starttid"],
+        "minidrett_id": xml_dict["starttid"],
         "registration_date_time": time_stamp_now,
     }
 
 
+async def get_page_contestants(
+    token: str, event_id: str, valgt_klasse: str, action: str
+) -> list:
+    """Return contestants listed on the page, none when adding one manually."""
+    if valgt_klasse:
+        return await ContestantsAdapter().get_all_contestants_by_raceclass(
+            token, event_id, valgt_klasse
+        )
+    if action == "new_manual":
+        return []
+    return await ContestantsAdapter().get_all_contestants(token, event_id)
+
+
 async def get_available_bib(token: str, event_id: str) -> int:
     """Find available bib, one above higest assigned."""
     contestants = await ContestantsAdapter().get_all_contestants(token, event_id)
@@ -345,60 +363,82 @@ async def get_available_bib(token: str, event_id: str) -> int:
     return highest_bib + 1
 
 
-async def create_contestants_from_excel(token: str, event: dict, file) -> str:
+async def create_contestants_from_upload(
+    token: str, event: dict, part: BodyPartReader
+) -> str:
+    """Create contestants from uploaded file part, read a chunk at a time."""
+    content_type = part.headers.get(hdrs.CONTENT_TYPE, "")
+    # handle file - csv supported
+    allowed_filetypes = ["text/csv", "application/vnd.ms-excel"]
+    filename = part.filename or ""
+    if "excel_manual" in filename:
+        return await create_contestants_from_excel(token, event, read_chunks(part))
+    if "ET6" in filename:
+        return await create_contestants_from_emit(token, event, read_chunks(part))
+    if content_type in allowed_filetypes:
+        return await ContestantsAdapter().create_contestants(
+            token, event["id"], read_chunks(part)
+        )
+    raise Exception(f"Ugyldig filtype {content_type}")
+
+
+async def read_chunks(part: BodyPartReader) -> AsyncIterator[bytes]:
+    """Yield the content of an uploaded file part as it is received."""
+    while chunk := await part.read_chunk(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+
+async def read_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Yield lines, including line end, from chunks of bytes."""
+    rest = b""
+    async for chunk in chunks:
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+    if rest:
+        yield rest
+
+
+async def create_contestants_from_excel(
+    token: str, event: dict, chunks: AsyncIterable[bytes]
+) -> str:
     """Load contestants from excel-file."""
-    informasjon = ""
-    error_text = ""
-    index_row = 0
-    headers = {}
-    i_contestants = 0
-    i_errors = 0
-    for oneline in file.readlines():
-        try:
-            index_row += 1
-            str_oneline = oneline.decode("utf-8")
-            str_oneline = str_oneline.replace("b'", "")
-            str_oneline = str_oneline.replace("\r", "")
-            str_oneline = str_oneline.replace("\n", "")
-            str_oneline = str_oneline.replace("\ufeff", "")
-            # split by ; or ,
-            if str_oneline.find(";") == -1:
-                str_oneline = str_oneline.replace(",", ";")
-            elements = str_oneline.split(";")
-            # identify headers
-            if index_row == 1:
-                for index_column, element in enumerate(elements):
-                    # special case to handle random bytes first in file
-                    if index_column == 0 and element.endswith("Startnr"):
-                        headers["Startnr"] = 0
-                    headers[element] = index_column
-            else:
-                request_body = get_contestant_dict(event, elements, headers)
+    report = await import_contestants(
+        token, event["id"], parse_excel_rows(event, chunks)
+    )
+    return str(report)
 
-                ret = await ContestantsAdapter().create_contestant(
-                    token, event["id"], request_body
-                )
-                if ret == "201":
-                    logging.debug(f"Created contestant {id}")
-                    i_contestants += 1
-                else:
-                    error_text += f"<br>{ret}"
-                    i_errors += 1
-        except Exception as e:
-            if "401" in str(e):
-                error_text = f"Ingen tilgang, vennligst logg inn på nytt. {e}"
-                break
-            i_errors += 1
-            logging.exception("Error")
-            error_text += f"<br>{e}"
-        if i_errors > 10:
-            error_text = f"For mange feil i filen - avsluttet import. {error_text}"
-            break
-
-    informasjon = f"Fil import: {i_contestants} opprettet og {i_errors} feil."
-    if error_text:
-        informasjon += f"<br>Error: {error_text}"
-    return informasjon
+
+async def parse_excel_rows(
+    event: dict, chunks: AsyncIterable[bytes]
+) -> AsyncIterator[tuple[int, dict | Exception]]:
+    """Yield (row number, contestant or error) per line in excel-file."""
+    headers = {}
+    index_row = 0
+    async for oneline in read_lines(chunks):
+        index_row += 1
+        str_oneline = oneline.decode("utf-8")
+        str_oneline = str_oneline.replace("b'", "")
+        str_oneline = str_oneline.replace("\r", "")
+        str_oneline = str_oneline.replace("\n", "")
+        str_oneline = str_oneline.replace("\ufeff", "")
+        # split by ; or ,
+        if str_oneline.find(";") == -1:
+            str_oneline = str_oneline.replace(",", ";")
+        elements = str_oneline.split(";")
+        # identify headers
+        if index_row == 1:
+            for index_column, element in enumerate(elements):
+                # special case to handle random bytes first in file
+                if index_column == 0 and element.endswith("Startnr"):
+                    headers["Startnr"] = 0
+                headers[element] = index_column
+        elif str_oneline.strip(" ;"):
+            try:
+                yield index_row, get_contestant_dict(event, elements, headers)
+            except Exception as e:
+                yield index_row, e
 
 
 def get_contestant_dict(event: dict, elements: list, headers: dict) -> dict:
@@ -452,112 +492,156 @@ def get_contestant_dict(event: dict, elements: list, headers: dict) -> dict:
     return request_body
 
 
-async def create_contestants_from_emit(token: str, event: dict, file) -> str:
-    """Load contestants from excel-file."""
-    informasjon = ""
-    error_text = ""
-    i_contestants = 0
-    xml_data = file.read()
-    dict_data = xmltodict.parse(xml_data)
-
-    for oneline in dict_data["startliste"]["start"]:
-        time_stamp_now = EventsAdapter().get_local_time(event, "log")
+async def create_contestants_from_emit(
+    token: str, event: dict, chunks: AsyncIterable[bytes]
+) -> str:
+    """Load contestants from emit xml-file."""
+    report = await import_contestants(
+        token, event["id"], parse_emit_rows(event, chunks)
+    )
+    return str(report)
 
-        request_body = contestant_from_xml(oneline, event["id"], time_stamp_now)
 
-        ret = await ContestantsAdapter().create_contestant(
-            token, event["id"], request_body
-        )
-        if ret == "201":
-            logging.debug(f"Created contestant {id}")
-            i_contestants += 1
+async def parse_emit_rows(
+    event: dict, chunks: AsyncIterable[bytes]
+) -> AsyncIterator[tuple[int, dict | Exception]]:
+    """Yield (row number, contestant) per start element in emit xml-file."""
+    parser = ElementTree.XMLPullParser(events=["start", "end"])
+    root = None
+    index_row = 0
+    iterator = aiter(chunks)
+    receiving = True
+    while receiving:
+        chunk = await anext(iterator, None)
+        if chunk is None:
+            # last events are available when the parser is closed
+            parser.close()
+            receiving = False
         else:
-            error_text += f"<br>{ret}"
-        informasjon = f"Deltakere er opprettet - {i_contestants} totalt."
-        if error_text:
-            informasjon += f"<br>Error: {error_text}"
-    return informasjon
+            parser.feed(chunk)
+        for xml_event, element in parser.read_events():
+            if root is None:
+                root = element
+            if xml_event != "end" or element.tag != "start":
+                continue
+            index_row += 1
+            try:
+                time_stamp_now = EventsAdapter().get_local_time(event, "log")
+                yield (
+                    index_row,
+                    contestant_from_xml(element.attrib, event["id"], time_stamp_now),
+                )
+            except Exception as e:
+                yield index_row, e
+            root.clear()
 
 
-async def get_available_etteranmelding(token: str, event_id: str) -> list:
-    """Calculate available late registration (etteranmelding) slots per raceclass.
-
-    This function determines how many additional contestants can be registered
-    for each raceclass in an event, based on available capacity in races.
-    The calculation differs based on whether the raceclass is ranked or unranked:
-
-    - Ranked raceclasses: Checks semi-final C (SC) races first, then falls back
-      to the first final (F) if no semi-final C exists.
-    - Unranked raceclasses: Sums available places across all round 1 (R1) races.
-
-    Args:
-        token: Authentication token for API access
-        event_id: Unique identifier for the event
-
-    Returns:
-        List of dictionaries containing availability information for each raceclass.
-        Each dictionary has:
-        - ageclasses (list): List of age classes in this raceclass
-        - available_places (int): Number of available registration slots
-
-    Example:
-        >>> await get_available_etteranmelding(token, "event-123")
-        [
-            {"ageclasses": ["G11", "G12"], "available_places": 5},
-            {"ageclasses": ["J11"], "available_places": 0}
-        ]
-    """
-    event_availability = []
-
-    # Fetch all raceclasses and races for the event
-    raceclasses = await RaceclassesAdapter().get_raceclasses(token, event_id)
-    races = await RaceplansAdapter().get_all_races(token, event_id)
-
-    for raceclass in raceclasses:
-        # number of places in semi final C is limitation
-        available_places = 0
-
-        # Process ranked raceclasses (with seeding and advancement rules)
-        if raceclass["ranking"]:
-            # Semi-final C (SC) is the bottleneck for late registrations
-            found_semi_c = False
-            for race in races:
-                if raceclass["name"] == race["raceclass"]:
-                    # Check if this is a semi-final C race
-                    if f"{race['round']}{race['index']}" == "SC":
-                        available_places += (
-                            race["max_no_of_contestants"] - race["no_of_contestants"]
-                        )
-                        found_semi_c = True
-
-            # handle raceclasses without c semi-finals - first finale is limitation
-            if not found_semi_c:
-                for race in races:
-                    if raceclass["name"] == race["raceclass"]:
-                        if race["round"] == "F":
-                            available_places = (
-                                race["max_no_of_contestants"]
-                                - race["no_of_contestants"]
-                            )
-                            # only the one (the first) final has open places
-                            break
+class ImportReport:
+    """Class representing the result of a contestant import, row by row."""
+
+    def __init__(self) -> None:
+        """Initialize an empty report."""
+        self.created = 0
+        # row number -> error text, for failed rows only
+        self.failed: dict[int, str] = {}
+        self.aborted = False
 
-        # handle raceclasses - urangert
+    def add(self, row: int, error: str = "") -> None:
+        """Add result for one row."""
+        if error:
+            self.failed[row] = error
         else:
-            # Sum available places across all round 1 races
-            for race in races:
-                if raceclass["name"] == race["raceclass"]:
-                    if race["round"] == "R1":
-                        available_places += (
-                            race["max_no_of_contestants"] - race["no_of_contestants"]
-                        )
+            self.created += 1
 
-        # Build result object for this raceclass
-        raceclass_availability = {
-            "ageclasses": raceclass["ageclasses"],
-            "available_places": available_places,
-        }
+    @property
+    def errors(self) -> list[tuple[int, str]]:
+        """Return (row number, error text) for failed rows, in file order."""
+        return sorted(self.failed.items())
 
-        event_availability.append(raceclass_availability)
+    def __str__(self) -> str:
+        """Return report for the user, one line per failed row."""
+        informasjon = (
+            f"Fil import: {self.created} opprettet og {len(self.errors)} feil."
+        )
+        if self.aborted:
+            informasjon += (
+                " For mange feil i filen - resten av filen er ikke importert."
+            )
+        for row, error in self.errors:
+            informasjon += f"<br>Rad {row}: {error}"
+        return informasjon
+
+
+def validate_contestant(contestant: dict, bibs: set) -> str:
+    """Return error text if contestant can not be imported, empty if valid."""
+    if not contestant.get("first_name") and not contestant.get("last_name"):
+        return "Navn mangler"
+    if not contestant.get("ageclass"):
+        return "Klasse mangler"
+    bib = contestant.get("bib")
+    if bib:
+        if bib in bibs:
+            return f"Startnr {bib} finnes allerede i filen"
+        bibs.add(bib)
+    return ""
+
+
+async def import_contestants(
+    token: str, event_id: str, rows: AsyncIterable[tuple[int, dict | Exception]]
+) -> ImportReport:
+    """Validate rows as they are received, and create them in concurrent batches."""
+    report = ImportReport()
+    batch: list[tuple[int, dict]] = []
+    bibs: set[int] = set()
+    creating: asyncio.Task | None = None
+
+    async def create(item: tuple[int, dict]) -> int:
+        row, contestant = item
+        result = await ContestantsAdapter().create_contestant(
+            token, event_id, contestant
+        )
+        if result != "201":
+            raise Exception(result)
+        return row
 
-    return event_availability
+    async def create_batch(batch: list[tuple[int, dict]]) -> None:
+        summary = await run_bulk(
+            batch, create, description="Importer deltakere", retry=False
+        )
+        summary.raise_if_unauthorized()
+        for row in summary.results:
+            report.add(row)
+        for (row, _contestant), e in summary.failed:
+            report.add(row, str(e))
+
+    async def next_batch() -> None:
+        nonlocal batch, creating
+        # one batch is created while the next is received, so memory stays flat
+        if creating:
+            await creating
+        creating = asyncio.create_task(create_batch(batch))
+        batch = []
+
+    try:
+        async for row, contestant in rows:
+            if isinstance(contestant, Exception):
+                report.add(row, f"Ugyldig rad - {contestant}")
+            elif error := validate_contestant(contestant, bibs):
+                report.add(row, error)
+            else:
+                batch.append((row, contestant))
+            if len(report.failed) > MAX_IMPORT_ERRORS:
+                report.aborted = True
+                break
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await next_batch()
+        if batch and not report.aborted:
+            await next_batch()
+        if creating:
+            await creating
+    finally:
+        if creating and not creating.done():
+            creating.cancel()
+            await asyncio.gather(creating, return_exceptions=True)
+    logging.info(f"Contestant import {event_id}: {report.created} created")
+    return report
@@ -9,6 +9,8 @@ from event_service_gui.adapters import (
     RaceclassesAdapter,
     TimeEventsAdapter,
 )
+from event_service_gui.concurrency import run_bulk
+from event_service_gui.jobs import submit_job
 from event_service_gui.services import TimeEventsService
 
 from .utils import (
@@ -91,9 +93,16 @@ class Control(web.View):
             if "resolve_error" in form:
                 informasjon = await delete_timing_events(user, dict(form))
             if "shift_position" in form:
-                informasjon = await TimeEventsService().shuffle_semi_final_templates(
-                    user["token"], event_id
+                description = "Roter semi-final templates"
+                job = submit_job(
+                    description,
+                    event_id,
+                    lambda _job: TimeEventsService().shuffle_semi_final_templates(
+                        user["token"], event_id
+                    ),
                 )
+                info = f"job_id={job.id}&informasjon={description} er startet."
+                return web.HTTPSeeOther(location=f"/tasks?event_id={event_id}&{info}")
 
         except Exception as e:
             logging.exception("Error")
@@ -120,11 +129,13 @@ def get_heatliste(passeringer) -> list:
 
 async def delete_timing_events(user: dict, form: dict) -> str:
     """Extract form data and update time events."""
-    informasjon = "Delete result: "
-    for key in form:
-        if key.startswith("resolved_"):
-            response = await TimeEventsAdapter().delete_time_event(
-                user["token"], form[key]
-            )
-            informasjon = f"{informasjon} {response}"
-    return informasjon
+    time_event_ids = [form[key] for key in form if key.startswith("resolved_")]
+    summary = await run_bulk(
+        time_event_ids,
+        lambda time_event_id: TimeEventsAdapter().delete_time_event(
+            user["token"], time_event_id
+        ),
+        description="Slett passeringer",
+    )
+    summary.raise_if_unauthorized()
+    return f"Delete result: {summary}"
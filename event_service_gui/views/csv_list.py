@@ -1,153 +1,194 @@
-"""Resource module for csv export."""
-
-import csv
-import io
-
-from aiohttp import web
-
-from event_service_gui.adapters import (
-    ContestantsAdapter,
-    RaceclassResultsAdapter,
-    RaceplansAdapter,
-    StartAdapter,
-)
-
-
-class CsvList(web.View):
-    """Class representing csv file export resource."""
-
-    async def get(self) -> web.Response:
-        """Ready route function."""
-        informasjon = ""
-        fields = []
-        csvdata = []
-
-        try:
-            event_id = self.request.rel_url.query["event_id"]
-            action = self.request.rel_url.query["action"]
-        except Exception:
-            informasjon = "Ingen event eller action valgt. Kan ikke vise informasjon"
-            return web.HTTPSeeOther(location=f"/?informasjon={informasjon}")
-
-        if action == "raceplan":
-            csvdata = await RaceplansAdapter().get_all_races("", event_id)
-            fields = get_fields_raceplan()
-        elif action == "startlist":
-            try:
-                race_round = self.request.rel_url.query["round"]
-            except Exception:
-                race_round = ""
-            csvdata = await get_startlist_data(event_id, race_round)
-            fields = get_fields_startlist()
-        elif action == "contestants":
-            csvdata = await ContestantsAdapter().get_all_contestants("", event_id)
-            fields = get_fields_contestants()
-        elif action == "results":
-            try:
-                valgt_klasse = self.request.rel_url.query["klasse"]
-            except Exception:
-                valgt_klasse = ""
-            if valgt_klasse:
-                results = await RaceclassResultsAdapter().get_raceclass_result(
-                    event_id, valgt_klasse
-                )
-                if results:
-                    csvdata = results["ranking_sequence"]
-            else:
-                results = await RaceclassResultsAdapter().get_all_raceclass_results(
-                    event_id
-                )
-                if results:
-                    for raceclass in results:
-                        for entry in raceclass["ranking_sequence"]:
-                            entry["raceclass"] = raceclass["raceclass"]
-                            csvdata.append(entry)
-            fields = get_fields_results()
-
-        # convert to csv format
-        output = io.StringIO()
-        writer = csv.DictWriter(
-            output, fieldnames=fields, delimiter=";", extrasaction="ignore"
-        )
-        writer.writeheader()
-        writer.writerows(csvdata)
-        informasjon = output.getvalue()
-
-        return web.Response(text=informasjon)
-
-
-async def get_startlist_data(event_id: str, race_round: str) -> list:
-    """Return list of start-entries, filtered on round."""
-    filtered_startlist = []
-    startlist = await StartAdapter().get_all_starts_by_event("", event_id)
-    if race_round:
-        races = await RaceplansAdapter().get_all_races("", event_id)
-        for race in races:
-            if race["round"] == race_round:
-                filtered_startlist.extend(
-                    start
-                    for start in startlist[0]["start_entries"]
-                    if start["race_id"] == race["id"]
-                )
-    else:
-        filtered_startlist = startlist[0]["start_entries"]
-    return filtered_startlist
-
-
-def get_fields_raceplan() -> list:
-    """Return field for display."""
-    return [
-        "raceclass",
-        "order",
-        "start_time",
-        "no_of_contestants",
-        "round",
-        "index",
-        "heat",
-        "rule",
-    ]
-
-
-def get_fields_startlist() -> list:
-    """Return field for display."""
-    return [
-        "bib",
-        "starting_position",
-        "scheduled_start_time",
-        "name",
-        "club",
-    ]
-
-
-def get_fields_contestants() -> list:
-    """Return field for display."""
-    return [
-        "bib",
-        "first_name",
-        "last_name",
-        "birth_date",
-        "gender",
-        "ageclass",
-        "club",
-        "team",
-        "region",
-        "email",
-        "minidrett_id",
-        "id",
-        "seeding_points",
-        "registration_date_time",
-    ]
-
-
-def get_fields_results() -> list:
-    """Return field for result display."""
-    return [
-        "rank",
-        "bib",
-        "name",
-        "club",
-        "raceclass",
-        "ageclass",
-        "round",
-        "minidrett_id",
-    ]
+"""Resource module for csv export."""
+
+import csv
+import io
+from collections.abc import Iterable
+
+from aiohttp import hdrs, web
+
+from event_service_gui.adapters import (
+    ContestantsAdapter,
+    RaceclassResultsAdapter,
+    RaceplansAdapter,
+    StartAdapter,
+)
+
+CSV_CHUNK_ROWS = 500
+
+
+class CsvList(web.View):
+    """Class representing csv file export resource."""
+
+    async def get(self) -> web.StreamResponse:
+        """Ready route function."""
+        informasjon = ""
+
+        try:
+            event_id = self.request.rel_url.query["event_id"]
+            action = self.request.rel_url.query["action"]
+        except Exception:
+            informasjon = "Ingen event eller action valgt. Kan ikke vise informasjon"
+            return web.HTTPSeeOther(location=f"/?informasjon={informasjon}")
+
+        fields, csvdata = await get_csv_data(
+            event_id, action, dict(self.request.rel_url.query)
+        )
+        if self.request.rel_url.query.get("stream") in ["1", "true"]:
+            return await stream_csv(
+                self.request, f"{action}_{event_id}.csv", fields, csvdata
+            )
+
+        # convert to csv format
+        output = io.StringIO()
+        writer = csv.DictWriter(
+            output, fieldnames=fields, delimiter=";", extrasaction="ignore"
+        )
+        writer.writeheader()
+        writer.writerows(csvdata)
+        informasjon = output.getvalue()
+
+        return web.Response(text=informasjon)
+
+
+async def get_csv_data(
+    event_id: str, action: str, query: dict
+) -> tuple[list, Iterable[dict]]:
+    """Return csv fields and rows for action, fetched with one backend call."""
+    fields: list = []
+    csvdata: Iterable[dict] = []
+    if action == "raceplan":
+        csvdata = await RaceplansAdapter().get_all_races("", event_id)
+        fields = get_fields_raceplan()
+    elif action == "startlist":
+        csvdata = await get_startlist_data(event_id, query.get("round", ""))
+        fields = get_fields_startlist()
+    elif action == "contestants":
+        csvdata = await ContestantsAdapter().get_all_contestants("", event_id)
+        fields = get_fields_contestants()
+    elif action == "results":
+        valgt_klasse = query.get("klasse", "")
+        if valgt_klasse:
+            results = await RaceclassResultsAdapter().get_raceclass_result(
+                event_id, valgt_klasse
+            )
+            if results:
+                csvdata = results["ranking_sequence"]
+        else:
+            results = await RaceclassResultsAdapter().get_all_raceclass_results(
+                event_id
+            )
+            if results:
+                csvdata = (
+                    {**entry, "raceclass": raceclass["raceclass"]}
+                    for raceclass in results
+                    for entry in raceclass["ranking_sequence"]
+                )
+        fields = get_fields_results()
+    return fields, csvdata
+
+
+async def stream_csv(
+    request: web.Request, filename: str, fields: list, rows: Iterable[dict]
+) -> web.StreamResponse:
+    """Write csv rows to a streamed download, CSV_CHUNK_ROWS rows at a time."""
+    response = web.StreamResponse(
+        headers={
+            hdrs.CONTENT_TYPE: "text/csv; charset=utf-8",
+            hdrs.CONTENT_DISPOSITION: f'attachment; filename="{filename}"',
+        }
+    )
+    if "gzip" in request.headers.get(hdrs.ACCEPT_ENCODING, ""):
+        response.enable_compression(web.ContentCoding.gzip)
+    await response.prepare(request)
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, fieldnames=fields, delimiter=";", extrasaction="ignore"
+    )
+    writer.writeheader()
+    for i, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if i % CSV_CHUNK_ROWS == 0:
+            await response.write(buffer.getvalue().encode())
+            buffer.seek(0)
+            buffer.truncate()
+    await response.write(buffer.getvalue().encode())
+    await response.write_eof()
+    return response
+
+
+async def get_startlist_data(event_id: str, race_round: str) -> list:
+    """Return list of start-entries, filtered on round."""
+    filtered_startlist = []
+    startlist = await StartAdapter().get_all_starts_by_event("", event_id)
+    if race_round:
+        races = await RaceplansAdapter().get_all_races("", event_id)
+        for race in races:
+            if race["round"] == race_round:
+                filtered_startlist.extend(
+                    start
+                    for start in startlist[0]["start_entries"]
+                    if start["race_id"] == race["id"]
+                )
+    else:
+        filtered_startlist = startlist[0]["start_entries"]
+    return filtered_startlist
+
+
+def get_fields_raceplan() -> list:
+    """Return field for display."""
+    return [
+        "raceclass",
+        "order",
+        "start_time",
+        "no_of_contestants",
+        "round",
+        "index",
+        "heat",
+        "rule",
+    ]
+
+
+def get_fields_startlist() -> list:
+    """Return field for display."""
+    return [
+        "bib",
+        "starting_position",
+        "scheduled_start_time",
+        "name",
+        "club",
+    ]
+
+
+def get_fields_contestants() -> list:
+    """Return field for display."""
+    return [
+        "bib",
+        "first_name",
+        "last_name",
+        "birth_date",
+        "gender",
+        "ageclass",
+        "club",
+        "team",
+        "region",
+        "email",
+        "minidrett_id",
+        "id",
+        "seeding_points",
+        "registration_date_time",
+    ]
+
+
+def get_fields_results() -> list:
+    """Return field for result display."""
+    return [
+        "rank",
+        "bib",
+        "name",
+        "club",
+        "raceclass",
+        "ageclass",
+        "round",
+        "minidrett_id",
+    ]
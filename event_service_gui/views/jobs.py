@@ -0,0 +1,20 @@
+"""Resource module for background job status."""
+
+from aiohttp import web
+
+from event_service_gui.jobs import get_job
+
+from .utils import check_login
+
+
+class Jobs(web.View):
+    """Class representing status of a background job, polled by the pages."""
+
+    async def get(self) -> web.Response:
+        """Get route function that return job status as json."""
+        await check_login(self)
+        job_id = self.request.rel_url.query.get("job_id", "")
+        job = get_job(job_id)
+        if not job:
+            raise web.HTTPNotFound(reason=f"Ukjent jobb {job_id}")
+        return web.json_response(job.to_dict())
@@ -0,0 +1,54 @@
+"""Resource module for live updates as server-sent events."""
+
+import asyncio
+import json
+import logging
+import os
+
+from aiohttp import hdrs, web
+
+from event_service_gui.services.event_poller import get_poller
+
+from .utils import check_login
+
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "15"))
+
+
+class Live(web.View):
+    """Class representing a stream of changes in an event, as server-sent events."""
+
+    async def get(self) -> web.StreamResponse:
+        """Get route function that streams changes until the browser leaves."""
+        user = await check_login(self)
+        event_id = self.request.rel_url.query.get("event_id", "")
+        if not event_id:
+            raise web.HTTPBadRequest(reason="Ingen event valgt.")
+
+        response = web.StreamResponse(
+            headers={
+                hdrs.CONTENT_TYPE: "text/event-stream",
+                hdrs.CACHE_CONTROL: "no-cache",
+            }
+        )
+        await response.prepare(self.request)
+
+        poller = get_poller(event_id)
+        queue = poller.listen(user["token"])
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout(SSE_KEEPALIVE):
+                        message = await queue.get()
+                except TimeoutError:
+                    # comment line, keeps proxies from closing the connection
+                    await response.write(b": keepalive\n\n")
+                    continue
+                data = json.dumps(message, ensure_ascii=False)
+                await response.write(
+                    f"event: {message['type']}\ndata: {data}\n\n".encode()
+                )
+        except ConnectionResetError:
+            logging.debug(f"Live stream for event {event_id} closed by client")
+        finally:
+            poller.stop_listening(queue)
+        return response
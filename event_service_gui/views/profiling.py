@@ -0,0 +1,25 @@
+"""Resource module for request profiling statistics."""
+
+from aiohttp import web
+
+from event_service_gui.middlewares import REQUEST_CACHE_STATS, ROUTE_PROFILES
+
+from .utils import check_login
+
+
+class Profiling(web.View):
+    """Class representing timings per route, collected by this process."""
+
+    async def get(self) -> web.Response:
+        """Get route function that return route timings as json."""
+        await check_login(self)
+        profiles = self.request.app[ROUTE_PROFILES]
+        return web.json_response(
+            {
+                "routes": {
+                    route: profile.to_dict()
+                    for route, profile in sorted(profiles.items())
+                },
+                "request_cache": self.request.app[REQUEST_CACHE_STATS],
+            }
+        )
@@ -10,6 +10,7 @@ from event_service_gui.adapters import (
     RaceclassesAdapter,
     RaceplansAdapter,
 )
+from event_service_gui.adapters.raceplans_adapter import shift_start_times
 
 from .utils import (
     check_login,
@@ -64,6 +65,17 @@ class Raceplans(web.View):
                 valgt_klasse = race["raceclass"]
             else:
                 races = await RaceplansAdapter().get_all_races(user["token"], event_id)
+            # preview of new schedule, saved by user when confirmed
+            preview = {}
+            if "preview_time" in self.request.rel_url.query:
+                try:
+                    preview = get_start_time_preview(
+                        races,
+                        int(self.request.rel_url.query["order"]),
+                        self.request.rel_url.query["new_time"],
+                    )
+                except ValueError:
+                    informasjon = f"{informasjon} Ugyldig starttid."
             raceplan_summary = []
             if len(races) == 0:
                 informasjon = f"{informasjon} Ingen kjøreplaner funnet."
@@ -96,6 +108,7 @@ class Raceplans(web.View):
                     "raceclasses": raceclasses,
                     "raceplan_summary": raceplan_summary,
                     "raceplan_validation": raceplan_validation,
+                    "preview": preview,
                     "races": races,
                     "event": event,
                     "event_id": event_id,
@@ -180,6 +193,15 @@ class Raceplans(web.View):
         return web.HTTPSeeOther(location=f"/raceplans?event_id={event_id}&{info}")
 
 
+def get_start_time_preview(races: list, order: int, new_time: str) -> dict:
+    """Set new_start_time on races changed by moving race order to new_time."""
+    shifted_races, delta_time = shift_start_times(races, order, new_time)
+    new_start_times = {race["id"]: race["start_time"] for race in shifted_races}
+    for race in races:
+        race["new_start_time"] = new_start_times.get(race["id"], "")
+    return {"order": order, "new_time": new_time, "delta_time": str(delta_time)}
+
+
 async def update_heat_time_interval(token: str, event_id: str, form: dict) -> str:
     """Update raceplan - set heat time interval."""
     informasjon = ""
@@ -10,6 +10,7 @@ from event_service_gui.adapters import (
     EventsAdapter,
     RaceclassesAdapter,
 )
+from event_service_gui.jobs import submit_job
 
 from .utils import (
     add_seeding_points,
@@ -126,7 +127,19 @@ class Seeding(web.View):
                 informasjon = await add_seeding_from_form(
                     user["token"], event_id, dict(form)
                 )
+            elif action == "seeding_points" and "dry_run" not in form:
+                description = "Seeding etter poeng"
+                job = submit_job(
+                    description,
+                    event_id,
+                    lambda _job: add_points_and_seed(
+                        user["token"], event_id, dict(form), valgt_klasse
+                    ),
+                )
+                info = f"job_id={job.id}&informasjon={description} er startet."
+                return web.HTTPSeeOther(location=f"/tasks?event_id={event_id}&{info}")
             elif action == "seeding_points":
+                # dry run shows the result here, without assigning bibs
                 informasjon = await add_seeding_points(
                     user["token"], event_id, dict(form)
                 )
@@ -135,6 +148,7 @@ class Seeding(web.View):
                     user["token"],
                     event_id,
                     valgt_klasse,
+                    dry_run=True,
                 )
         except Exception as e:
             logging.exception("Error")
@@ -149,6 +163,16 @@ class Seeding(web.View):
         return web.HTTPSeeOther(location=f"/seeding?event_id={event_id}&{info}")
 
 
+async def add_points_and_seed(
+    token: str, event_id: str, form: dict, valgt_klasse: str
+) -> str:
+    """Add seeding points from form, then assign bibs according to them."""
+    informasjon = await add_seeding_points(token, event_id, form)
+    informasjon += "<br>"
+    informasjon += await perform_seeding(token, event_id, valgt_klasse)
+    return informasjon
+
+
 async def add_seeding_from_form(token: str, event_id: str, form: dict) -> str:
     """Load seeding info from form and swap BIB."""
     informasjon = "Flyttet på løpere: "
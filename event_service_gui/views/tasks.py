@@ -1,6 +1,9 @@
 """Resource module for main view."""
 
+import asyncio
 import logging
+import os
+import time
 
 import aiohttp_jinja2
 from aiohttp import web
@@ -12,10 +15,25 @@ from event_service_gui.adapters import (
     StartAdapter,
     TimeEventsAdapter,
 )
-from event_service_gui.services import TimeEventsService
+from event_service_gui.concurrency import ProgressCallback, is_unauthorized, run_bulk
+from event_service_gui.jobs import Job, get_active_jobs, submit_job
+from event_service_gui.services import TimeEventIndex, TimeEventsService
 
 from .utils import check_login, get_event
 
+TASK_STATUS_TIMEOUT = float(os.getenv("TASK_STATUS_TIMEOUT", "5"))
+
+# tasks run as background jobs - form field name and description
+TASKS = {
+    "generate_startlist": "Generer startliste",
+    "generate_next_race": "Generer videre til oppsett",
+    "delete_all_cont": "Slett alle deltakere",
+    "delete_all_raceplans": "Slett alle kjøreplaner",
+    "delete_all_raceclasses": "Slett alle klasser",
+    "delete_time_events": "Slett alle passeringer",
+    "delete_start_lists": "Slett alle startlister",
+}
+
 
 class Tasks(web.View):
     """Class representing the main view."""
@@ -36,6 +54,12 @@ class Tasks(web.View):
 
             task_status = await get_task_status(user["token"], event_id)
 
+            # jobs to follow - the one just started and others still running
+            job_ids = [job.id for job in get_active_jobs(event_id)]
+            job_id = self.request.rel_url.query.get("job_id", "")
+            if job_id and job_id not in job_ids:
+                job_ids.append(job_id)
+
             return await aiohttp_jinja2.render_template_async(
                 "tasks.html",
                 self.request,
@@ -44,6 +68,7 @@ class Tasks(web.View):
                     "event": event,
                     "event_id": event_id,
                     "informasjon": informasjon,
+                    "job_ids": job_ids,
                     "task_status": task_status,
                     "username": user["name"],
                 },
@@ -55,88 +80,128 @@ class Tasks(web.View):
             return web.HTTPSeeOther(location=f"/?informasjon={e}")
 
     async def post(self) -> web.Response:
-        """Post route function that updates a collection of klasses."""
+        """Post route function that starts a task as a background job."""
         user = await check_login(self)
 
-        informasjon = ""
-        action = ""
         form = await self.request.post()
         event_id = str(form["event_id"])
         event = await get_event(user["token"], event_id)
 
-        try:
-            if "generate_startlist" in form:
-                informasjon = await StartAdapter().generate_startlist_for_event(
-                    user["token"], event_id
-                )
-            elif "generate_next_race" in form:
-                informasjon = await TimeEventsService().generate_next_race_templates(
-                    user["token"], event
-                )
-                informasjon += await TimeEventsService().shuffle_semi_final_templates(
-                    user["token"], event_id
-                )
-
-            elif "delete_all_cont" in form:
-                res = await ContestantsAdapter().delete_all_contestants(
-                    user["token"], event_id
-                )
-                informasjon = f"Deltakerne er slettet - {res}"
-            elif "delete_all_raceplans" in form:
-                res = await RaceplansAdapter().delete_raceplans(user["token"], event_id)
-                informasjon = f"Kjøreplaner er slettet - {res}"
-            elif "delete_all_raceclasses" in form:
-                res = await RaceclassesAdapter().delete_all_raceclasses(
-                    user["token"], event_id
-                )
-                informasjon = f"Klasser er slettet - {res}"
-            elif "delete_time_events" in form:
-                informasjon = await delete_time_events(user["token"], event_id)
-            elif "delete_start_lists" in form:
-                informasjon = await delete_start_lists(user["token"], event_id)
-        except Exception as e:
-            informasjon = f"Det har oppstått en feil - {e.args}."
-            error_reason = str(e)
-            if error_reason.startswith("401"):
-                return web.HTTPSeeOther(
-                    location=f"/login?informasjon=Ingen tilgang, vennligst logg inn på nytt. {e}"
-                )
-            logging.exception("Error")
-
-        info = f"action={action}&informasjon={informasjon}"
+        task = next((task for task in TASKS if task in form), "")
+        if not task:
+            return web.HTTPSeeOther(location=f"/tasks?event_id={event_id}")
+        job = submit_job(
+            TASKS[task],
+            event_id,
+            lambda job: run_task(job, user["token"], event, task),
+        )
+        info = f"job_id={job.id}&informasjon={TASKS[task]} er startet."
         return web.HTTPSeeOther(location=f"/tasks?event_id={event_id}&{info}")
 
 
-async def delete_start_lists(token: str, event_id: str) -> str:
+async def run_task(job: Job, token: str, event: dict, task: str) -> str:
+    """Perform a task from the tasks page, progress is reported on job."""
+    event_id = event["id"]
+    informasjon = ""
+    if task == "generate_startlist":
+        informasjon = await StartAdapter().generate_startlist_for_event(token, event_id)
+    elif task == "generate_next_race":
+        informasjon = await TimeEventsService().generate_next_race_templates(
+            token, event, progress=job.update_progress
+        )
+        informasjon += await TimeEventsService().shuffle_semi_final_templates(
+            token, event_id
+        )
+    elif task == "delete_all_cont":
+        res = await ContestantsAdapter().delete_all_contestants(token, event_id)
+        informasjon = f"Deltakerne er slettet - {res}"
+    elif task == "delete_all_raceplans":
+        res = await RaceplansAdapter().delete_raceplans(token, event_id)
+        informasjon = f"Kjøreplaner er slettet - {res}"
+    elif task == "delete_all_raceclasses":
+        res = await RaceclassesAdapter().delete_all_raceclasses(token, event_id)
+        informasjon = f"Klasser er slettet - {res}"
+    elif task == "delete_time_events":
+        informasjon = await delete_time_events(token, event_id, job.update_progress)
+    elif task == "delete_start_lists":
+        informasjon = await delete_start_lists(token, event_id, job.update_progress)
+    return informasjon
+
+
+async def delete_start_lists(
+    token: str, event_id: str, progress: ProgressCallback | None = None
+) -> str:
     """Delete all start lists on event."""
     startlists = await StartAdapter().get_all_starts_by_event(token, event_id)
-    i = 0
-    for startlist in startlists:
-        w_id = await StartAdapter().delete_start_list(token, startlist["id"])
-        logging.debug(f"Slettet startliste {startlist['id']} - resultat {w_id}")
-        i += 1
-    return f"Slettet {i} start lister."
+    summary = await run_bulk(
+        startlists,
+        lambda startlist: StartAdapter().delete_start_list(token, startlist["id"]),
+        description="Slett startlister",
+        progress=progress,
+    )
+    summary.raise_if_unauthorized()
+    if summary.failed:
+        return f"Slettet start lister: {summary}"
+    return f"Slettet {summary.succeeded} start lister."
 
 
-async def delete_time_events(token: str, event_id: str) -> str:
+async def delete_time_events(
+    token: str, event_id: str, progress: ProgressCallback | None = None
+) -> str:
     """Delete all time_events on event."""
-    # delete all existing Template time events
     all_time_events = await TimeEventsAdapter().get_time_events_by_event_id(
         token,
         event_id,
     )
-    i = 0
-    for time_event in all_time_events:
-        w_id = await TimeEventsAdapter().delete_time_event(token, time_event["id"])
-        logging.debug(f"Deleted time_event id {w_id}")
-        i += 1
-    return f"Slettet {i} time_events."
+    summary = await run_bulk(
+        all_time_events,
+        lambda time_event: TimeEventsAdapter().delete_time_event(
+            token, time_event["id"]
+        ),
+        description="Slett passeringer",
+        progress=progress,
+    )
+    summary.raise_if_unauthorized()
+    if summary.failed:
+        return f"Slettet time_events: {summary}"
+    return f"Slettet {summary.succeeded} time_events."
 
 
 async def get_task_status(token: str, event_id: str) -> dict:
     """Generate a status of event preparation."""
+    task_status: dict = {"timings": {}, "unavailable": []}
+    sections = {
+        "contestants": get_contestants_status,
+        "raceclasses": get_raceclasses_status,
+        "raceplan": get_raceplan_status,
+        "startlist": get_startlist_status,
+        "next_race": get_next_race_status,
+    }
+
+    async def run_section(name: str) -> None:
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(TASK_STATUS_TIMEOUT):
+                task_status.update(await sections[name](token, event_id))
+        except TimeoutError:
+            logging.warning(f"Task status {name} timed out")
+            task_status["unavailable"].append(name)
+        except Exception as e:
+            if is_unauthorized(e):
+                raise
+            logging.exception(f"Task status {name} failed")
+            task_status["unavailable"].append(name)
+        finally:
+            task_status["timings"][name] = round((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(run_section(name) for name in sections))
+    logging.info(f"Task status {event_id} timings (ms): {task_status['timings']}")
+    return task_status
+
+
+async def get_contestants_status(token: str, event_id: str) -> dict:
+    """Return status of contestants and bibs."""
     task_status = {}
-    # contestants informasjon
     contestants = await ContestantsAdapter().get_all_contestants(token, event_id)
     i_missing_bib = 0
     for contestant in contestants:
@@ -153,8 +218,12 @@ async def get_task_status(token: str, event_id: str) -> dict:
         task_status["done_5"] = True
     else:
         task_status["done_5"] = False
+    return task_status
 
-    # raceclasses informasjon
+
+async def get_raceclasses_status(token: str, event_id: str) -> dict:
+    """Return status of raceclasses and start order."""
+    task_status = {}
     raceclasses = await RaceclassesAdapter().get_raceclasses(token, event_id)
     i_missing_startorder = 0
     for klasse in raceclasses:
@@ -170,40 +239,49 @@ async def get_task_status(token: str, event_id: str) -> dict:
         task_status["done_4"] = True
     else:
         task_status["done_4"] = False
+    return task_status
+
 
-    # raceplan informasjon
-    races = await RaceplansAdapter().get_all_races(token, event_id)
+async def get_raceplan_status(token: str, event_id: str) -> dict:
+    """Return status of raceplan, including validation."""
+    task_status = {}
+    races, raceplans = await asyncio.gather(
+        RaceplansAdapter().get_all_races(token, event_id),
+        RaceplansAdapter().get_all_raceplans(token, event_id),
+    )
     task_status["no_of_races"] = len(races)
     if len(races) > 0:
         task_status["done_6"] = True
-        raceplans = await RaceplansAdapter().get_all_raceplans(token, event_id)
         if len(raceplans) == 1:
             task_status[
                 "raceplan_validation"
             ] = await RaceplansAdapter().validate_raceplan(token, raceplans[0]["id"])
     else:
         task_status["done_6"] = False
+    return task_status
+
 
-    # start list
+async def get_startlist_status(token: str, event_id: str) -> dict:
+    """Return status of start list."""
+    task_status = {}
     startlist = await StartAdapter().get_all_starts_by_event(token, event_id)
     if len(startlist) > 0:
         task_status["no_of_starts"] = len(startlist[0]["start_entries"])
         task_status["done_8"] = True
     else:
         task_status["done_8"] = False
+    return task_status
 
-    # qualification - next race
-    next_race_templates = []
+
+async def get_next_race_status(token: str, event_id: str) -> dict:
+    """Return status of qualification - next race templates."""
+    task_status = {}
     passeringer = await TimeEventsAdapter().get_time_events_by_event_id(token, event_id)
-    for passering in passeringer:
-        if passering["timing_point"] == "Template":
-            next_race_templates.append(passering)
-            logging.debug(passering)
+    next_race_templates = TimeEventIndex(passeringer).of_timing_point("Template")
 
     if len(next_race_templates) > 0:
         task_status["no_of_next_race"] = len(next_race_templates)
         task_status["done_9"] = True
     else:
         task_status["done_9"] = False
-
     return task_status
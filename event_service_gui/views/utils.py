@@ -16,6 +16,19 @@ from event_service_gui.adapters import (
     TimeEventsAdapter,
     UserAdapter,
 )
+from event_service_gui.concurrency import gather_limited, run_bulk
+from event_service_gui.services import TimeEventIndex
+from event_service_gui.services.bib_index import get_bib_index, get_latest_finish
+from event_service_gui.services.event_poller import (
+    get_time_events,
+    sync_time_event_store,
+)
+from event_service_gui.services.passering_index import (
+    ERRORS,
+    PASSERINGER,
+    TEMPLATES,
+    get_passering_index,
+)
 
 
 async def check_login(self) -> dict:
@@ -79,45 +92,40 @@ def get_display_style(start_time: str, event: dict) -> str:
     return display_style
 
 
-async def get_enrichced_startlist(user: dict, race: dict) -> list:
+async def get_enrichced_startlist(
+    user: dict, race: dict, time_event_index: TimeEventIndex | None = None
+) -> list:
     """Enrich startlist information - including info if race result is registered."""
     startlist = []
-    i = 0
     # get time-events registered
-    next_race_time_events = await TimeEventsAdapter().get_time_events_by_race_id(
-        user["token"], race["id"]
-    )
-    new_start_entries = race["start_entries"]
-    if len(new_start_entries) > 0:
-        for start_entry in new_start_entries:
-            start_entry["club_logo"] = EventsAdapter().get_club_logo_url(
-                start_entry["club"]
+    if time_event_index is None:
+        time_event_index = TimeEventIndex(
+            await TimeEventsAdapter().get_time_events_by_race_id(
+                user["token"], race["id"]
             )
-            i += 1
-            for time_event in next_race_time_events:
-                # get next race info
-                if time_event["timing_point"] == "Template":
-                    logging.debug(f"Time_event with error - {time_event}")
-                elif time_event["timing_point"] == "Template":
-                    if i == time_event["rank"]:
-                        if time_event["next_race"].startswith("Ute"):
-                            start_entry["next_race"] = "Ute"
-                        else:
-                            start_entry["next_race"] = time_event["next_race"]
-                # check if start or DNS is registered
-                elif time_event["timing_point"] == "Start":
-                    if time_event["bib"] == start_entry["bib"]:
-                        start_entry["start_status"] = "Started"
-                        start_entry["info"] = (
-                            f"Started registered at {time_event['registration_time']}"
-                        )
-                elif time_event["timing_point"] == "DNS":
-                    if time_event["bib"] == start_entry["bib"]:
-                        start_entry["start_status"] = "DNS"
-                        start_entry["info"] = (
-                            f"DNS registered at {time_event['registration_time']}"
-                        )
-            startlist.append(start_entry)
+        )
+    for i, start_entry in enumerate(race["start_entries"], start=1):
+        start_entry["club_logo"] = EventsAdapter().get_club_logo_url(
+            start_entry["club"]
+        )
+        # get next race info
+        template = time_event_index.template(race["id"], i)
+        if template:
+            if template["next_race"].startswith("Ute"):
+                start_entry["next_race"] = "Ute"
+            else:
+                start_entry["next_race"] = template["next_race"]
+        # check if start or DNS is registered
+        time_event = time_event_index.latest(start_entry["bib"], ["Start", "DNS"])
+        if time_event:
+            start_entry["start_status"] = (
+                "Started" if time_event["timing_point"] == "Start" else "DNS"
+            )
+            start_entry["info"] = (
+                f"{start_entry['start_status']} registered at "
+                f"{time_event['registration_time']}"
+            )
+        startlist.append(start_entry)
 
     return startlist
 
@@ -140,20 +148,17 @@ async def get_event(token: str, event_id: str) -> dict:
 def get_next_race_info(next_race_time_events: list, race_id: str) -> list:
     """Enrich start list with next race info."""
     startlist = []
-    # get videre til information - loop and simulate result for pos 1 to 8
+    templates = TimeEventIndex(next_race_time_events)
+    # get videre til information - for pos 1 to 8
     for x in range(1, 9):
-        for template in next_race_time_events:
-            start_entry = {}
-            _rank = template["rank"]
-            if template["timing_point"] == "Template":
-                if _rank == x:
-                    start_entry["race_id"] = race_id
-                    start_entry["starting_position"] = x
-                    if template["next_race"].startswith("Ute"):
-                        start_entry["next_race"] = "Ute"
-                    else:
-                        start_entry["next_race"] = template["next_race"]
-                    startlist.append(start_entry)
+        template = templates.template(race_id, x)
+        if template:
+            start_entry = {"race_id": race_id, "starting_position": x}
+            if template["next_race"].startswith("Ute"):
+                start_entry["next_race"] = "Ute"
+            else:
+                start_entry["next_race"] = template["next_race"]
+            startlist.append(start_entry)
     return startlist
 
 
@@ -161,31 +166,16 @@ async def get_passeringer(
     token: str, event_id: str, action: str, valgt_klasse: str
 ) -> list:
     """Return list of passeringer for selected action."""
-    passeringer = []
-    tmp_passeringer = await TimeEventsAdapter().get_time_events_by_event_id(
-        token, event_id
-    )
+    store = await sync_time_event_store(token, event_id)
+    index = get_passering_index(event_id, store)
     if action == "control":
-        for passering in reversed(tmp_passeringer):
-            if not valgt_klasse or valgt_klasse in passering["race"]:
-                if (
-                    passering["status"] == "Error"
-                    and passering["timing_point"] != "Template"
-                ):
-                    passeringer.append(passering)
+        selected = reversed(index.select(ERRORS, valgt_klasse))
     elif action == "Template":
-        passeringer.extend(
-            passering
-            for passering in tmp_passeringer
-            if (valgt_klasse in passering["race"])
-            and (passering["timing_point"] == "Template")
-        )
+        selected = index.select(TEMPLATES, valgt_klasse)
     else:
-        passeringer.extend(
-            passering
-            for passering in tmp_passeringer
-            if passering["timing_point"] != "Template"
-        )
+        selected = index.select(PASSERINGER)
+    # copies - the index shares time events with the store
+    passeringer = [dict(passering) for passering in selected]
 
     # indentify last passering in race
     last_race = ""
@@ -271,30 +261,41 @@ async def get_races_for_print(
     user: dict, _tmp_races: list, raceclasses: list, valgt_klasse: str, action: str
 ) -> list:
     """Get races with lists - formatted for print."""
+    selected_races = [
+        race
+        for raceclass in raceclasses
+        for race in _tmp_races
+        if (race["raceclass"] == raceclass["name"])
+        and ((race["raceclass"] == valgt_klasse) or (valgt_klasse == ""))
+    ]
+    if not selected_races:
+        return []
+    detailed_races = await gather_limited(
+        RaceplansAdapter().get_race_by_id(user["token"], race["id"])
+        for race in selected_races
+    )
+    time_event_index = TimeEventIndex([])
+    if action != "result":
+        time_event_index = TimeEventIndex(
+            await get_time_events(user["token"], selected_races[0]["event_id"])
+        )
+
     races = []
-    for raceclass in raceclasses:
-        first_in_class = True
-        for race in _tmp_races:
-            if (race["raceclass"] == raceclass["name"]) and (
-                (race["raceclass"] == valgt_klasse) or (valgt_klasse == "")
-            ):
-                race = await RaceplansAdapter().get_race_by_id(
-                    user["token"], race["id"]
-                )
-                race["first_in_class"] = first_in_class
-                race["next_race"] = get_qualification_text(race)
-                race["start_time"] = race["start_time"][-8:]
-                # get start list details
-                if (
-                    action == "start" or len(race["results"]) == 0
-                ) and action != "result":
-                    race["list_type"] = "start"
-                    race["startliste"] = await get_enrichced_startlist(user, race)
-                else:
-                    race["list_type"] = action
-                if first_in_class:
-                    first_in_class = False
-                races.append(race)
+    last_raceclass = ""
+    for race in detailed_races:
+        race["first_in_class"] = race["raceclass"] != last_raceclass
+        last_raceclass = race["raceclass"]
+        race["next_race"] = get_qualification_text(race)
+        race["start_time"] = race["start_time"][-8:]
+        # get start list details
+        if (action == "start" or len(race["results"]) == 0) and action != "result":
+            race["list_type"] = "start"
+            race["startliste"] = await get_enrichced_startlist(
+                user, race, time_event_index.of_race(race["id"])
+            )
+        else:
+            race["list_type"] = action
+        races.append(race)
     return races
 
 
@@ -315,43 +316,21 @@ async def create_start(user: dict, form: dict) -> str:
             "club": contestant["club"],
         }
         # validation - check that bib not already is in start entry for round
-        new_race = await RaceplansAdapter().get_race_by_id(
-            user["token"], new_start["race_id"]
-        )
-        start_entries = await StartAdapter().get_start_entries_by_bib(
-            user["token"], form["event_id"], bib
+        bib_index = await get_bib_index(
+            user["token"], form["event_id"], bib, new_start["race_id"]
         )
-        for start_entry in start_entries:
-            race = await RaceplansAdapter().get_race_by_id(
-                user["token"], start_entry["race_id"]
+        new_race = bib_index.race(new_start["race_id"])
+        if new_race["round"] in bib_index.rounds(bib):
+            raise web.HTTPBadRequest(
+                reason=f"405 Bib already exists in round - {new_race['round']}"
             )
-            if new_race["round"] == race["round"]:
-                raise web.HTTPBadRequest(
-                    reason=f"405 Bib already exists in round - {race['round']}"
-                )
 
         w_id = await StartAdapter().create_start_entry(user["token"], new_start)
         logging.debug(f"create_start {w_id} - {new_start}")
         informasjon = f" Start kl {form['start_time'][-8:]}"
 
         # update previous result with correct "videre til"
-        time_events = await TimeEventsAdapter().get_time_events_by_event_id_and_bib(
-            user["token"], form["event_id"], bib
-        )
-        latest_result: dict = {}
-        for time_event in time_events:
-            if (
-                (time_event["timing_point"] == "Finish")
-                and (time_event["bib"] == bib)
-                and (
-                    (not latest_result)
-                    or (
-                        time_event["registration_time"]
-                        > latest_result["registration_time"]
-                    )
-                )
-            ):
-                latest_result = time_event
+        latest_result = await get_latest_finish(user["token"], form["event_id"], bib)
         if latest_result:
             latest_result["next_race_id"] = new_race["id"]
             if new_race["round"] == "F":
@@ -371,45 +350,6 @@ async def create_start(user: dict, form: dict) -> str:
     return informasjon
 
 
-async def swap_bibs(token: str, event_id: str, bib1: int, bib2: int) -> str:
-    """Swap bibs."""
-    informasjon = ""
-    if bib1 != bib2:
-        contestant1 = await ContestantsAdapter().get_contestant_by_bib(
-            token, event_id, bib1
-        )
-        if contestant1:
-            contestant1["bib"] = None
-            result = await ContestantsAdapter().update_contestant(
-                token, event_id, contestant1
-            )
-
-            # give bib1 to contestant2
-            contestant2 = await ContestantsAdapter().get_contestant_by_bib(
-                token, event_id, bib2
-            )
-            if contestant2:
-                contestant2["bib"] = int(bib1)
-                result = await ContestantsAdapter().update_contestant(
-                    token, event_id, contestant2
-                )
-                logging.debug(result)
-
-                # give bib2 to contestant1
-                contestant1["bib"] = int(bib2)
-                result = await ContestantsAdapter().update_contestant(
-                    token, event_id, contestant1
-                )
-                logging.debug(result)
-                informasjon += f"Bibs swapped: {bib1} <> {bib2}. "
-            else:
-                informasjon += f"Bib {bib1} not found. "
-        else:
-            informasjon += f"Bib {bib1} not found. "
-
-    return informasjon
-
-
 async def add_seeding_points(token: str, event_id: str, form: dict) -> str:
     """Load seeding points from form and update changes."""
     informasjon = "Seeding poeng oppdatert: "
@@ -438,7 +378,9 @@ async def add_seeding_points(token: str, event_id: str, form: dict) -> str:
     return informasjon
 
 
-async def perform_seeding(token: str, event_id: str, valgt_klasse: str) -> str:
+async def perform_seeding(
+    token: str, event_id: str, valgt_klasse: str, dry_run: bool = False
+) -> str:
     """Assign bibs according to seeding points, low point is best."""
     informasjon = ""
     # if raceclass is missing, do seeding for all raceclasses
@@ -449,39 +391,134 @@ async def perform_seeding(token: str, event_id: str, valgt_klasse: str) -> str:
     else:
         raceclass_list.append(valgt_klasse)
 
-    for seeding_raceclass in raceclass_list:
-        contestants = await ContestantsAdapter().get_contestants_by_raceclass(
-            token, event_id, seeding_raceclass
-        )
-        # sort seeded contestants by seeding points, lowest seeding is best - ignore contestants with no seeding points
-        seeded_contestants = [x for x in contestants if x["seeding_points"]]
-        seeded_contestants.sort(key=lambda x: x["seeding_points"])
-
-        # get count of participants in each heat and number of heats
-        heat_separators = await get_heat_separators(token, event_id, seeding_raceclass)
-        no_of_heats = len(heat_separators)
-
-        # calculate who to swap and do the bib swap
-        for seeding_index, seeded_contestant in enumerate(seeded_contestants):
-            # heat is modulo of seeding_index and no_of_heats and position is rest of division
-            heat = seeding_index % no_of_heats
-            position = seeding_index // no_of_heats
-            if heat == 0:
-                new_bib_index = position
-            else:
-                new_bib_index = heat_separators[heat - 1] + position
-            new_bib = contestants[new_bib_index]["bib"]
-            # get latest bib from db - contestant by id
-            latest_seeded_contestant = await ContestantsAdapter().get_contestant(
-                token, event_id, seeded_contestant["id"]
+    contestants_by_raceclass = await gather_limited(
+        ContestantsAdapter().get_contestants_by_raceclass(token, event_id, raceclass)
+        for raceclass in raceclass_list
+    )
+    heat_separators_by_raceclass = await gather_limited(
+        get_heat_separators(token, event_id, raceclass) for raceclass in raceclass_list
+    )
+    new_bibs: list[tuple[dict, int]] = []
+    for seeding_raceclass, contestants, heat_separators in zip(
+        raceclass_list,
+        contestants_by_raceclass,
+        heat_separators_by_raceclass,
+        strict=True,
+    ):
+        if not heat_separators:
+            informasjon += f"{seeding_raceclass}: ingen heat å seede. "
+            continue
+        swaps, raceclass_new_bibs = plan_seeding(contestants, heat_separators)
+        new_bibs.extend(raceclass_new_bibs)
+        if dry_run:
+            informasjon += (
+                f"{seeding_raceclass}: {len(swaps)} bytter, "
+                f"{len(raceclass_new_bibs)} startnummer endres. "
+            )
+            informasjon += "".join(f"{bib1} <> {bib2}. " for bib1, bib2 in swaps)
+
+    if not dry_run and new_bibs:
+        # contestants in the start-list can not change bib - check before any update
+        startlists = await StartAdapter().get_all_starts_by_event(token, event_id)
+        started_bibs = {
+            start_entry["bib"]
+            for startlist in startlists
+            for start_entry in startlist["start_entries"]
+        }
+        blocked = [c["bib"] for c, _new_bib in new_bibs if c["bib"] in started_bibs]
+        if blocked:
+            return (
+                f"{informasjon}Seeding avbrutt, startnummer finnes i startliste: "
+                f"{', '.join(str(bib) for bib in blocked)}. "
             )
-            old_bib = latest_seeded_contestant["bib"]
-            informasjon += await swap_bibs(token, event_id, new_bib, old_bib)
-    if len(raceclass_list) > 1:
+        result = await update_seeded_bibs(token, event_id, new_bibs)
+        if result:
+            return f"{informasjon}{result}"
+        informasjon += f"Seeding utført, {len(new_bibs)} startnummer endret. "
+    if len(raceclass_list) > 1 and not dry_run:
         informasjon = " Alle klasser er seedet basert på innleste seeding poeng."
     return informasjon
 
 
+async def update_seeded_bibs(
+    token: str, event_id: str, new_bibs: list[tuple[dict, int]]
+) -> str:
+    """Write planned bibs, put old bibs back if an update fails."""
+
+    async def set_bib(contestant: dict, bib: int | None) -> dict:
+        await ContestantsAdapter().update_contestant(
+            token, event_id, {**contestant, "bib": bib}
+        )
+        return contestant
+
+    # free the bibs first, so that no bib is used twice during the update
+    summary = await run_bulk(
+        [contestant for contestant, _new_bib in new_bibs],
+        lambda contestant: set_bib(contestant, None),
+        description="Frigjør startnummer",
+    )
+    if not summary.failed:
+        summary = await run_bulk(
+            new_bibs,
+            lambda item: set_bib(*item),
+            description="Sett nye startnummer",
+        )
+        if not summary.failed:
+            return ""
+        # contestants given a new bib must free it before the old bibs are back
+        written = await run_bulk(
+            summary.results,
+            lambda contestant: set_bib(contestant, None),
+            description="Frigjør nye startnummer",
+        )
+        summary.failed.extend(written.failed)
+    restored = await run_bulk(
+        [contestant for contestant, _new_bib in new_bibs],
+        lambda contestant: set_bib(contestant, contestant["bib"]),
+        description="Tilbakestill startnummer",
+    )
+    summary.raise_if_unauthorized()
+    informasjon = f"Seeding feilet og er tilbakestilt - {summary} "
+    if restored.failed:
+        informasjon += f"Tilbakestilling av startnummer feilet - {restored} "
+    return informasjon
+
+
+def plan_seeding(
+    contestants: list, heat_separators: list
+) -> tuple[list[tuple[int, int]], list[tuple[dict, int]]]:
+    """Return swaps and new bibs for seeding of contestants in one raceclass."""
+    # sort seeded contestants by seeding points, lowest seeding is best - ignore contestants with no seeding points
+    seeded_contestants = [x for x in contestants if x["seeding_points"]]
+    seeded_contestants.sort(key=lambda x: x["seeding_points"])
+    no_of_heats = len(heat_separators)
+    bibs = {contestant["id"]: contestant["bib"] for contestant in contestants}
+    holders = {contestant["bib"]: contestant["id"] for contestant in contestants}
+
+    swaps = []
+    for seeding_index, seeded_contestant in enumerate(seeded_contestants):
+        # heat is modulo of seeding_index and no_of_heats and position is rest of division
+        heat = seeding_index % no_of_heats
+        position = seeding_index // no_of_heats
+        new_bib_index = position if heat == 0 else heat_separators[heat - 1] + position
+        new_bib = contestants[new_bib_index]["bib"]
+        old_bib = bibs[seeded_contestant["id"]]
+        if new_bib is None or old_bib is None or new_bib == old_bib:
+            continue
+        # swap bibs with the contestant currently holding new_bib
+        holder_id = holders[new_bib]
+        bibs[holder_id], bibs[seeded_contestant["id"]] = old_bib, new_bib
+        holders[old_bib], holders[new_bib] = holder_id, seeded_contestant["id"]
+        swaps.append((new_bib, old_bib))
+
+    new_bibs = [
+        (contestant, bibs[contestant["id"]])
+        for contestant in contestants
+        if bibs[contestant["id"]] != contestant["bib"]
+    ]
+    return swaps, new_bibs
+
+
 async def get_heat_separators(token: str, event_id: str, raceclass: str) -> list:
     """Indicate how many racers that will be placed in same heat."""
     heat_separators = []
@@ -3,6 +3,7 @@
 from http import HTTPStatus
 import os
 import time
+from collections.abc import AsyncIterator
 from typing import Any
 
 import pytest
@@ -11,12 +12,33 @@ from aiohttp.test_utils import TestClient as _TestClient
 from dotenv import load_dotenv
 from requests.exceptions import ConnectionError as _ConnectionError
 
-from event_service_gui import create_app
+from event_service_gui import create_app, jobs
+from event_service_gui.adapters.client_session import close_backend_sessions
+from event_service_gui.adapters.event_cache import event_cache
 
 load_dotenv()
 HOST_PORT = int(os.getenv("HOST_PORT", "8080"))
 
 
+@pytest.fixture(autouse=True)
+def clear_event_cache() -> None:
+    """Start every test with an empty process wide cache."""
+    event_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def job_status_dir(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keep status files of background jobs in a directory per test."""
+    monkeypatch.setattr(jobs, "JOB_STATUS_DIR", str(tmp_path / "jobs"))
+
+
+@pytest.fixture(autouse=True)
+async def backend_sessions() -> AsyncIterator[None]:
+    """Close the backend sessions opened by the test, in its own event loop."""
+    yield
+    await close_backend_sessions()
+
+
 @pytest.fixture
 async def client(aiohttp_client: Any) -> _TestClient:
     """Instantiate server and start it."""
@@ -0,0 +1,110 @@
+"""Integration test cases for validating manual starts with the bib index."""
+
+import pytest
+from aiohttp import web
+
+from event_service_gui.adapters import (
+    ContestantsAdapter,
+    RaceplansAdapter,
+    StartAdapter,
+    TimeEventsAdapter,
+)
+from event_service_gui.services.bib_index import BibIndex
+from event_service_gui.views.utils import create_start
+
+RACES = [
+    {"id": "q1", "round": "Q", "index": "", "heat": 1},
+    {"id": "s1", "round": "S", "index": "A", "heat": 1},
+    {"id": "s2", "round": "S", "index": "A", "heat": 2},
+]
+START_ENTRIES = [{"race_id": "q1", "bib": 7}]
+TIME_EVENTS = [
+    {"id": "t1", "bib": 7, "timing_point": "Finish", "registration_time": "10:01"},
+    {"id": "t2", "bib": 7, "timing_point": "Finish", "registration_time": "10:05"},
+    {"id": "t3", "bib": 7, "timing_point": "Start", "registration_time": "10:09"},
+]
+
+
+@pytest.mark.integration
+def test_bib_index() -> None:
+    """Should find races and rounds of a bib."""
+    index = BibIndex(RACES, START_ENTRIES)
+    assert index.rounds(7) == {"Q"}
+    assert index.rounds(8) == set()
+    assert index.race("s2")["heat"] == 2
+    assert index.race("x") == {}
+
+
+@pytest.fixture
+def backend(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Replace backend services, record writes."""
+    calls: dict = {"start_entries": [], "time_events": [], "reads": []}
+
+    async def get_contestant_by_bib(self, token, event_id, bib) -> dict:
+        return {"first_name": "Kari", "last_name": "Nordmann", "club": "Lyn"}
+
+    async def get_race_by_id(self, token, race_id) -> dict:
+        return next(race for race in RACES if race["id"] == race_id)
+
+    async def get_start_entries_by_bib(self, token, event_id, bib) -> list:
+        return [entry for entry in START_ENTRIES if entry["bib"] == bib]
+
+    async def get_time_events_by_event_id_and_bib(self, token, event_id, bib) -> list:
+        # read just before the write, after the start entry is created
+        calls["reads"].append(len(calls["start_entries"]))
+        return [event for event in TIME_EVENTS if event["bib"] == bib]
+
+    async def create_start_entry(self, token, new_start) -> int:
+        calls["start_entries"].append(new_start)
+        return 201
+
+    async def update_time_event(self, token, time_event_id, time_event) -> str:
+        calls["time_events"].append(time_event)
+        return time_event_id
+
+    monkeypatch.setattr(
+        ContestantsAdapter, "get_contestant_by_bib", get_contestant_by_bib
+    )
+    monkeypatch.setattr(RaceplansAdapter, "get_race_by_id", get_race_by_id)
+    monkeypatch.setattr(
+        StartAdapter, "get_start_entries_by_bib", get_start_entries_by_bib
+    )
+    monkeypatch.setattr(StartAdapter, "create_start_entry", create_start_entry)
+    monkeypatch.setattr(
+        TimeEventsAdapter,
+        "get_time_events_by_event_id_and_bib",
+        get_time_events_by_event_id_and_bib,
+    )
+    monkeypatch.setattr(TimeEventsAdapter, "update_time_event", update_time_event)
+    return calls
+
+
+def form(race_id: str) -> dict:
+    """Return form adding bib 7 to race."""
+    return {
+        "event_id": "e1",
+        "bib": "7",
+        "startlist_id": "sl1",
+        "race_id": race_id,
+        "starting_position": "3",
+        "start_time": "2026-02-01T11:00:00",
+    }
+
+
+@pytest.mark.integration
+async def test_create_start(backend: dict) -> None:
+    """Should add start and update next race of the latest finish."""
+    informasjon = await create_start({"token": "token"}, form("s2"))
+    assert "Oppdatert videre til" in informasjon
+    assert backend["start_entries"][0]["race_id"] == "s2"
+    assert backend["time_events"][0]["id"] == "t2"
+    assert backend["time_events"][0]["next_race"] == "SA2"
+    assert backend["reads"] == [1]
+
+
+@pytest.mark.integration
+async def test_create_start_same_round_rejected(backend: dict) -> None:
+    """Should not add a bib twice in the same round."""
+    with pytest.raises(web.HTTPBadRequest):
+        await create_start({"token": "token"}, form("q1"))
+    assert backend["start_entries"] == []
@@ -0,0 +1,65 @@
+"""Integration test cases for the shared backend sessions."""
+
+import asyncio
+
+from aiohttp import ClientSession, web
+from aioresponses import aioresponses
+import pytest
+
+from event_service_gui.adapters import RaceplansAdapter, client_session
+from event_service_gui.adapters.client_session import (
+    EVENT_SERVICE,
+    RACE_SERVICE,
+    backend_sessions_ctx,
+    get_backend_session,
+    get_pool_limit,
+)
+
+
+@pytest.mark.integration
+async def test_session_is_shared_per_service() -> None:
+    """Should reuse one session per backend service."""
+    race_session = get_backend_session(RACE_SERVICE)
+    assert get_backend_session(RACE_SERVICE) is race_session
+    assert get_backend_session(EVENT_SERVICE) is not race_session
+
+    with aioresponses() as m:
+        m.get("http://localhost:8088/races?eventId=1", payload=[], repeat=True)
+        await RaceplansAdapter().get_all_races("token", "1")
+        await RaceplansAdapter().get_all_races("token", "1")
+    assert get_backend_session(RACE_SERVICE) is race_session
+    assert not race_session.closed
+
+
+@pytest.mark.integration
+async def test_sessions_closed_on_cleanup() -> None:
+    """Should close the shared sessions when the app shuts down."""
+    ctx = backend_sessions_ctx(web.Application())
+    await anext(ctx)
+    session = get_backend_session(RACE_SERVICE)
+    with pytest.raises(StopAsyncIteration):
+        await anext(ctx)
+    assert session.closed
+    assert get_backend_session(RACE_SERVICE) is not session
+
+
+@pytest.mark.integration
+def test_pool_limit_per_service(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should allow the pool limit to be overridden per service."""
+    monkeypatch.setenv("HTTP_POOL_LIMIT_RACE", "7")
+    assert get_pool_limit(RACE_SERVICE) == 7
+    assert get_pool_limit(EVENT_SERVICE) == 100
+
+
+@pytest.mark.integration
+async def test_session_of_closed_loop_closed() -> None:
+    """Should close a session left by a closed event loop before replacing it."""
+    old_loop = asyncio.new_event_loop()
+    old_session = ClientSession(loop=old_loop)
+    old_loop.close()
+    client_session._sessions[RACE_SERVICE] = (old_session, old_loop)
+
+    session = get_backend_session(RACE_SERVICE)
+    await asyncio.gather(*client_session._closing)
+    assert session is not old_session
+    assert old_session.closed
@@ -0,0 +1,153 @@
+"""Integration test cases for concurrent backend calls."""
+
+import asyncio
+
+from aiohttp import web
+import pytest
+
+from event_service_gui import concurrency
+from event_service_gui.adapters import TimeEventsAdapter
+from event_service_gui.concurrency import gather_limited, run_bulk
+from event_service_gui.errors import BackendError
+from event_service_gui.views import tasks
+
+
+@pytest.mark.integration
+async def test_gather_limited_keeps_order_and_limit() -> None:
+    """Should return results in order, never running more than limit at once."""
+    running = 0
+    max_running = 0
+
+    async def call(i: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.001 * (5 - i % 5))
+        running -= 1
+        return i
+
+    assert await gather_limited((call(i) for i in range(20)), limit=3) == list(
+        range(20)
+    )
+    assert max_running == 3
+
+
+@pytest.mark.integration
+async def test_run_bulk_summarizes_partial_failure() -> None:
+    """Should run all items even if some fail, and report progress."""
+    progress = []
+
+    async def call(i: int) -> int:
+        if i % 4 == 0:
+            raise ValueError(f"bad {i}")
+        return i
+
+    summary = await run_bulk(
+        range(8),
+        call,
+        description="Test",
+        limit=2,
+        progress=lambda description, done, total: progress.append(done),
+    )
+    assert summary.succeeded == 6
+    assert [item for item, _e in summary.failed] == [0, 4]
+    assert progress == list(range(1, 9))
+    assert str(summary) == "6 av 8 utført. 2 feilet, første feil: bad 0."
+
+
+@pytest.mark.integration
+async def test_run_bulk_retries_transient_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Should retry server errors, but not client errors."""
+    monkeypatch.setattr(concurrency, "BULK_RETRY_DELAY", 0)
+    calls = {"flaky": 0, "bad": 0}
+
+    async def call(item: str) -> str:
+        calls[item] += 1
+        if item == "flaky" and calls[item] < 3:
+            raise BackendError(503, reason="Error - 503: unavailable.")
+        if item == "bad":
+            raise BackendError(404, reason="Error - 404: not found.")
+        return item
+
+    summary = await run_bulk(["flaky", "bad"], call)
+    assert calls == {"flaky": 3, "bad": 1}
+    assert summary.results == ["flaky"]
+    assert summary.retries == 2
+
+
+@pytest.mark.integration
+async def test_run_bulk_without_retry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should not retry calls that are not idempotent."""
+    monkeypatch.setattr(concurrency, "BULK_RETRY_DELAY", 0)
+    calls = []
+
+    async def create(item: str) -> str:
+        calls.append(item)
+        raise BackendError(503, reason="Error - 503: unavailable.")
+
+    summary = await run_bulk(["a", "b"], create, retry=False)
+    assert sorted(calls) == ["a", "b"]
+    assert len(summary.failed) == 2
+    assert summary.retries == 0
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    ("status", "reason", "transient"),
+    [
+        (503, "Error - 503: unavailable.", True),
+        (404, "Error - 404: Race 500 not found.", False),
+        (422, "Error - 422: Bib 512 in use.", False),
+        (401, "401 Unathorized - delete_time_event", False),
+    ],
+)
+def test_is_transient_reads_status(status: int, reason: str, transient: bool) -> None:
+    """Should recognize server errors from the status, not numbers in the reason."""
+    assert concurrency.is_transient(BackendError(status, reason=reason)) is transient
+    assert concurrency.is_unauthorized(BackendError(status, reason=reason)) is (
+        status == 401
+    )
+    assert not concurrency.is_transient(web.HTTPBadRequest(reason=reason))
+
+
+@pytest.mark.integration
+async def test_run_bulk_keeps_input_order() -> None:
+    """Should return results and failures in the order of the items."""
+
+    async def call(i: int) -> int:
+        await asyncio.sleep(0.01 * (5 - i))
+        if i % 2:
+            raise ValueError(f"bad {i}")
+        return i
+
+    summary = await run_bulk(range(5), call, limit=5)
+    assert summary.results == [0, 2, 4]
+    assert [item for item, _e in summary.failed] == [1, 3]
+
+
+@pytest.mark.integration
+async def test_delete_time_events_raises_login_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Should delete all time events, and raise if login has expired."""
+    deleted = []
+
+    async def get_time_events_by_event_id(*args) -> list:
+        return [{"id": f"t{i}"} for i in range(25)]
+
+    async def delete_time_event(self, token: str, t_id: str) -> int:
+        if token == "expired":
+            raise BackendError(401, reason="401 Unathorized - delete_time_event")
+        deleted.append(t_id)
+        return 204
+
+    monkeypatch.setattr(
+        TimeEventsAdapter, "get_time_events_by_event_id", get_time_events_by_event_id
+    )
+    monkeypatch.setattr(TimeEventsAdapter, "delete_time_event", delete_time_event)
+    assert await tasks.delete_time_events("token", "1") == "Slettet 25 time_events."
+    assert len(deleted) == 25
+    with pytest.raises(web.HTTPBadRequest):
+        await tasks.delete_time_events("expired", "1")
@@ -0,0 +1,63 @@
+"""Integration test cases for the in-memory config store."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from event_service_gui.adapters import EventsAdapter
+from event_service_gui.adapters.config_store import ConfigStore
+
+
+@pytest.mark.integration
+def test_club_logo_and_global_setting() -> None:
+    """Should look up values from the config files."""
+    assert (
+        EventsAdapter().get_club_logo_url("Asker Skiklubb").endswith("asker_logo.png")
+    )
+    assert EventsAdapter().get_club_logo_url("") == ""
+    assert EventsAdapter().get_global_setting("CONFIDENCE_LIMIT") == "0.7"
+
+
+@pytest.mark.integration
+def test_reload_when_file_changes(tmp_path: Path) -> None:
+    """Should reload a file when modified, but not check disk every lookup."""
+    config_file = tmp_path / "settings.json"
+    config_file.write_text(json.dumps({"KEY": "old"}))
+    store = ConfigStore(str(tmp_path), reload_interval=0)
+    assert store.get("settings.json", "KEY") == "old"
+
+    config_file.write_text(json.dumps({"KEY": "new"}))
+    os.utime(config_file, (0, 1))
+    assert store.get("settings.json", "KEY") == "new"
+
+    store.reload_interval = 60
+    store.get("settings.json", "KEY")
+    config_file.write_text(json.dumps({"KEY": "newer"}))
+    os.utime(config_file, (0, 2))
+    assert store.get("settings.json", "KEY") == "new"
+
+
+@pytest.mark.integration
+def test_reload_keeps_last_good_content(tmp_path: Path) -> None:
+    """Should keep content if a changed file can not be read, and return copies."""
+    config_file = tmp_path / "settings.json"
+    config_file.write_text(json.dumps({"KEY": "old", "LIST": [1]}))
+    store = ConfigStore(str(tmp_path), reload_interval=0)
+    store.get_file("settings.json")["KEY"] = "changed by caller"
+    store.get("settings.json", "LIST").append(2)
+    assert store.get_file("settings.json") == {"KEY": "old", "LIST": [1]}
+
+    config_file.write_text('{"KEY": "ne')
+    os.utime(config_file, (0, 1))
+    assert store.get("settings.json", "KEY") == "old"
+
+    config_file.write_text(json.dumps({"KEY": "new"}))
+    os.utime(config_file, (0, 1))
+    assert store.get("settings.json", "KEY") == "new"
+
+    config_file.unlink()
+    assert store.get("settings.json", "KEY") == "new"
+    with pytest.raises(FileNotFoundError):
+        ConfigStore(str(tmp_path)).get_file("settings.json")
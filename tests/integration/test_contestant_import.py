@@ -0,0 +1,193 @@
+"""Integration test cases for contestant file import."""
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from aiohttp import FormData, web
+from aiohttp.test_utils import TestClient as _TestClient
+
+from event_service_gui.adapters import ContestantsAdapter
+from event_service_gui.errors import BackendError
+from event_service_gui.views import contestants
+from event_service_gui.views.contestants import (
+    create_contestants_from_emit,
+    create_contestants_from_excel,
+    create_contestants_from_upload,
+)
+
+EVENT = {"id": "1", "timezone": "Europe/Oslo"}
+HEADER = "Startnr;Fornavn;Etternavn;Klasse;Klubb;Krets\r\n"
+EMIT_XML = (
+    "<startliste>"
+    '<start startno="7" fornavn="Ola" etternavn="Nordmann" klasse="G 12 år"'
+    ' team="Lyn" teamabb="LYN" starttid="10:00"/>'
+    '<start startno="8" fornavn="Kari" etternavn="Nordmann" klasse="J 12 år"'
+    ' team="Lyn" teamabb="LYN" starttid="10:01"/>'
+    "</startliste>"
+)
+
+
+async def chunked(content: bytes, size: int = 7) -> AsyncIterator[bytes]:
+    """Yield content in small chunks, as received from an upload."""
+    for i in range(0, len(content), size):
+        yield content[i : i + size]
+
+
+def excel_file(rows: list[str]) -> AsyncIterator[bytes]:
+    """Return excel export file with header and rows."""
+    return chunked((HEADER + "".join(f"{row}\r\n" for row in rows)).encode())
+
+
+@pytest.fixture
+def created(monkeypatch: pytest.MonkeyPatch) -> list:
+    """Record created contestants, bib 13 is rejected by the backend."""
+    contestants: list = []
+
+    async def create_contestant(self, token, event_id, request_body) -> str:
+        if request_body.get("bib") == 13:
+            return "Startnr 13 er i bruk"
+        contestants.append(request_body)
+        return "201"
+
+    monkeypatch.setattr(ContestantsAdapter, "create_contestant", create_contestant)
+    return contestants
+
+
+@pytest.mark.integration
+async def test_excel_import_report(created: list) -> None:
+    """Should create valid rows and report failed rows by row number."""
+    rows = [
+        "1;Ola;Nordmann;G 12 år;Lyn;Oslo",
+        "2;Kari;Nordmann;;Lyn;Oslo",
+        "",
+        "13;Per;Hansen;G 12 år;Lyn;Oslo",
+        "1;Pål;Hansen;G 12 år;Lyn;Oslo",
+        "5;Espen",
+        *[f"{bib};Navn{bib};Etter;J 11 år;Lyn;Oslo" for bib in range(20, 50)],
+    ]
+    informasjon = await create_contestants_from_excel("token", EVENT, excel_file(rows))
+
+    assert len(created) == 31
+    assert informasjon.startswith("Fil import: 31 opprettet og 4 feil.")
+    assert "<br>Rad 3: Klasse mangler" in informasjon
+    assert "<br>Rad 5: Startnr 13 er i bruk" in informasjon
+    assert "<br>Rad 6: Startnr 1 finnes allerede i filen" in informasjon
+    assert "<br>Rad 7: Ugyldig rad" in informasjon
+
+
+@pytest.mark.integration
+async def test_excel_import_stops_on_many_errors(
+    created: list, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should stop reading the file when too many rows are invalid."""
+    monkeypatch.setattr(contestants, "IMPORT_BATCH_SIZE", 1)
+    rows = [
+        "1;Ola;Nordmann;G 12 år;Lyn;Oslo",
+        *[f"{bib};A;B;;;" for bib in range(11)],
+        "2;Kari;Nordmann;J 12 år;Lyn;Oslo",
+    ]
+    informasjon = await create_contestants_from_excel("token", EVENT, excel_file(rows))
+
+    assert [c["bib"] for c in created] == [1]
+    assert informasjon.startswith("Fil import: 1 opprettet og 11 feil.")
+    assert "resten av filen er ikke importert" in informasjon
+
+
+@pytest.mark.integration
+async def test_excel_import_creates_while_receiving(
+    created: list, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should create the first batches before the whole file is received."""
+    monkeypatch.setattr(contestants, "IMPORT_BATCH_SIZE", 5)
+    rows = [f"{bib};Navn{bib};Etter;J 11 år;Lyn;Oslo" for bib in range(20, 50)]
+    created_when_received = []
+
+    async def upload() -> AsyncIterator[bytes]:
+        async for chunk in excel_file(rows):
+            yield chunk
+            # let batches started so far run
+            await asyncio.sleep(0)
+        created_when_received.append(len(created))
+
+    informasjon = await create_contestants_from_excel("token", EVENT, upload())
+
+    assert informasjon == "Fil import: 30 opprettet og 0 feil."
+    assert 0 < created_when_received[0] < 30
+
+
+@pytest.mark.integration
+async def test_excel_import_unauthorized(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should raise when login has expired, so the user is sent to login."""
+
+    async def create_contestant(self, token, event_id, request_body) -> str:
+        raise BackendError(401, reason="401 Unathorized - create_contestant")
+
+    monkeypatch.setattr(ContestantsAdapter, "create_contestant", create_contestant)
+    with pytest.raises(web.HTTPBadRequest, match="401"):
+        await create_contestants_from_excel(
+            "token", EVENT, excel_file(["1;Ola;Nordmann;G 12 år;Lyn;Oslo"])
+        )
+
+
+@pytest.mark.integration
+async def test_emit_import(created: list) -> None:
+    """Should create one contestant per start element."""
+    informasjon = await create_contestants_from_emit(
+        "token", EVENT, chunked(EMIT_XML.encode())
+    )
+
+    assert informasjon == "Fil import: 2 opprettet og 0 feil."
+    assert [c["bib"] for c in created] == [7, 8]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("filename", ["excel_manual.csv", "ET6.xml"])
+async def test_upload(aiohttp_client: Any, created: list, filename: str) -> None:
+    """Should create contestants from a multipart upload."""
+
+    async def upload(request: web.Request) -> web.Response:
+        reader = await request.multipart()
+        part = await reader.next()
+        return web.Response(
+            text=await create_contestants_from_upload("token", EVENT, part)
+        )
+
+    app = web.Application()
+    app.router.add_post("/upload", upload)
+    client = await aiohttp_client(app)
+
+    content = (
+        EMIT_XML
+        if filename.startswith("ET6")
+        else (
+            HEADER
+            + "7;Ola;Nordmann;G 12 år;Lyn;Oslo\r\n8;Kari;Nordmann;J 12 år;Lyn;Oslo"
+        )
+    )
+    data = FormData()
+    data.add_field("file", content.encode(), filename=filename)
+    resp = await client.post("/upload", data=data)
+
+    assert await resp.text() == "Fil import: 2 opprettet og 0 feil."
+    assert [c["bib"] for c in created] == [7, 8]
+
+
+@pytest.mark.integration
+async def test_upload_without_event_id_first(
+    client: _TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should answer bad request when the file comes before event_id."""
+
+    async def check_login(_view: web.View) -> dict:
+        return {"name": "test", "token": "token"}
+
+    monkeypatch.setattr(contestants, "check_login", check_login)
+    data = FormData()
+    data.add_field("file", HEADER.encode(), filename="excel_manual.csv")
+    data.add_field("event_id", "1")
+    resp = await client.post("/contestants", data=data, allow_redirects=False)
+
+    assert resp.status == 400
+    assert await resp.text() == "Feltet event_id må sendes før filen."
@@ -0,0 +1,71 @@
+"""Integration test cases for the csv export route."""
+
+from aiohttp.test_utils import TestClient as _TestClient
+import pytest
+
+from event_service_gui.adapters import ContestantsAdapter, RaceclassResultsAdapter
+from event_service_gui.views import csv_list
+
+
+@pytest.fixture
+def contestants(monkeypatch: pytest.MonkeyPatch) -> list:
+    """Replace contestants in event-service with 1201 generated ones."""
+    contestants = [
+        {"bib": bib, "first_name": "Ola", "last_name": f"Nordmann{bib}"}
+        for bib in range(1, 1202)
+    ]
+
+    async def get_all_contestants(*args) -> list:
+        return contestants
+
+    monkeypatch.setattr(ContestantsAdapter, "get_all_contestants", get_all_contestants)
+    return contestants
+
+
+@pytest.mark.integration
+async def test_stream_csv(client: _TestClient, contestants: list) -> None:
+    """Should stream csv as gzip compressed download."""
+    resp = await client.get(
+        "/csv?event_id=1&action=contestants&stream=1",
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert resp.status == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.headers["Content-Disposition"] == (
+        'attachment; filename="contestants_1.csv"'
+    )
+    lines = (await resp.text()).splitlines()
+    assert lines[0].startswith("bib;first_name;last_name")
+    assert len(lines) == 1 + len(contestants)
+    assert lines[-1].startswith("1201;Ola;Nordmann1201")
+
+
+@pytest.mark.integration
+async def test_csv_same_content_streamed_or_not(
+    client: _TestClient, contestants: list
+) -> None:
+    """Should return same csv content in both modes."""
+    plain = await (await client.get("/csv?event_id=1&action=contestants")).text()
+    streamed = await (
+        await client.get("/csv?event_id=1&action=contestants&stream=1")
+    ).text()
+    assert plain == streamed
+
+
+@pytest.mark.integration
+async def test_results_for_all_raceclasses(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should add raceclass to each result without changing the results."""
+    results = [
+        {"raceclass": "G11", "ranking_sequence": [{"rank": 1, "bib": 1}]},
+        {"raceclass": "J11", "ranking_sequence": [{"rank": 1, "bib": 2}]},
+    ]
+
+    async def get_all_raceclass_results(*args) -> list:
+        return results
+
+    monkeypatch.setattr(
+        RaceclassResultsAdapter, "get_all_raceclass_results", get_all_raceclass_results
+    )
+    _fields, rows = await csv_list.get_csv_data("1", "results", {})
+    assert [row["raceclass"] for row in rows] == ["G11", "J11"]
+    assert "raceclass" not in results[0]["ranking_sequence"][0]
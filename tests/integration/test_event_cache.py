@@ -0,0 +1,171 @@
+"""Integration test cases for the process wide event cache."""
+
+import copy
+import time
+from typing import Any
+
+from aiohttp import web
+import pytest
+
+from event_service_gui.adapters import (
+    RaceclassesAdapter,
+    TimeEventsAdapter,
+    raceclasses_adapter,
+    time_events_adapter,
+)
+from event_service_gui.adapters.event_cache import CACHE_TTLS, EventCache, event_cache
+from event_service_gui.adapters.request_cache import request_cache_scope
+
+RACECLASSES = [{"id": "k1", "event_id": "1", "name": "G11", "order": 1}]
+
+
+@pytest.fixture
+async def backend(aiohttp_server: Any, monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Start a fake event- and race-service counting incoming requests."""
+    hits = {"raceclasses": 0}
+
+    async def get_raceclasses(request: web.Request) -> web.Response:
+        hits["raceclasses"] += 1
+        return web.json_response(RACECLASSES)
+
+    async def update_raceclass(request: web.Request) -> web.Response:
+        return web.Response(status=204)
+
+    async def delete_time_event(request: web.Request) -> web.Response:
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_get("/events/{event_id}/raceclasses", get_raceclasses)
+    app.router.add_put("/events/{event_id}/raceclasses/{id}", update_raceclass)
+    app.router.add_delete("/time-events/{id}", delete_time_event)
+    server = await aiohttp_server(app)
+    url = str(server.make_url("")).rstrip("/")
+    monkeypatch.setattr(raceclasses_adapter, "EVENT_SERVICE_URL", url)
+    monkeypatch.setattr(time_events_adapter, "RACE_SERVICE_URL", url)
+    return hits
+
+
+@pytest.mark.integration
+async def test_reads_not_cached_by_default(backend: dict) -> None:
+    """Should call backend for every read when no time to live is set."""
+    await RaceclassesAdapter().get_raceclasses("token", "1")
+    await RaceclassesAdapter().get_raceclasses("token", "1")
+    assert backend["raceclasses"] == 2
+
+
+@pytest.mark.integration
+async def test_reads_are_cached_per_event(
+    backend: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should only call backend once per event while the entry is fresh."""
+    monkeypatch.setitem(CACHE_TTLS, "raceclasses", 60)
+    raceclasses = await RaceclassesAdapter().get_raceclasses("token", "1")
+    raceclasses[0]["name"] = "modified"
+    raceclasses = await RaceclassesAdapter().get_raceclasses("token", "1")
+    assert raceclasses[0]["name"] == "G11"
+    assert backend["raceclasses"] == 1
+
+
+@pytest.mark.integration
+async def test_cached_reads_not_shared_between_users(
+    backend: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should not serve data read with one token to a caller with another."""
+    monkeypatch.setitem(CACHE_TTLS, "raceclasses", 60)
+    await RaceclassesAdapter().get_raceclasses("token", "1")
+    await RaceclassesAdapter().get_raceclasses("", "1")
+    await RaceclassesAdapter().get_raceclasses("other", "1")
+    assert backend["raceclasses"] == 3
+
+
+@pytest.mark.integration
+async def test_cached_read_copied_once_per_call(
+    backend: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should copy a hit once, also when memoized for the request as well."""
+    monkeypatch.setitem(CACHE_TTLS, "raceclasses", 60)
+    await RaceclassesAdapter().get_raceclasses("token", "1")
+    copies = []
+    deepcopy = copy.deepcopy
+    monkeypatch.setattr(
+        copy, "deepcopy", lambda value: copies.append(1) or deepcopy(value)
+    )
+    with request_cache_scope():
+        raceclasses = await RaceclassesAdapter().get_raceclasses("token", "1")
+    assert raceclasses == RACECLASSES
+    assert len(copies) == 1
+
+
+@pytest.mark.integration
+async def test_write_invalidates_cached_event(
+    backend: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should read again after a write from this GUI."""
+    monkeypatch.setitem(CACHE_TTLS, "raceclasses", 60)
+    await RaceclassesAdapter().get_raceclasses("token", "1")
+    await RaceclassesAdapter().update_raceclass("token", "1", "k1", RACECLASSES[0])
+    await RaceclassesAdapter().get_raceclasses("token", "1")
+    assert backend["raceclasses"] == 2
+
+
+@pytest.mark.integration
+async def test_write_without_event_id_invalidates_all(backend: dict) -> None:
+    """Should invalidate all events when the write does not tell which event."""
+    for event_id in ["1", "2"]:
+        generation = event_cache.generation("races", event_id)
+        event_cache.set(
+            "races", event_id, "token", ["race"], ttl=60, generation=generation
+        )
+    await TimeEventsAdapter().delete_time_event("token", "t1")
+    assert event_cache.get("races", "1", "token") == (False, None)
+    assert event_cache.get("races", "2", "token") == (False, None)
+
+
+@pytest.mark.integration
+def test_ttl_and_lru_eviction(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should expire entries after ttl and evict least recently used."""
+    cache = EventCache(2)
+    for event_id in ["1", "2"]:
+        cache.set(
+            "races",
+            event_id,
+            "t",
+            event_id,
+            ttl=60,
+            generation=cache.generation("races", event_id),
+        )
+    cache.get("races", "1", "t")
+    cache.set("races", "3", "t", "3", ttl=60, generation=cache.generation("races", "3"))
+    assert cache.get("races", "2", "t") == (False, None)
+    assert cache.get("races", "1", "t") == (True, "1")
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.get("races", "1", "t") == (False, None)
+
+
+@pytest.mark.integration
+def test_stale_result_not_stored_after_invalidation() -> None:
+    """Should not store a read that started before an invalidation."""
+    cache = EventCache(10)
+    generation = cache.generation("races", "1")
+    cache.invalidate("races", "1")
+    cache.set("races", "1", "t", ["stale"], ttl=60, generation=generation)
+    assert cache.get("races", "1", "t") == (False, None)
+
+
+@pytest.mark.integration
+def test_dependent_entry_invalidated_with_sources() -> None:
+    """Should drop a computed entry when data it depends on is invalidated."""
+    cache = EventCache(10)
+    generation = cache.generation("late_registration", "1")
+    cache.set(
+        "late_registration", "1", "t", ["computed"], ttl=60, generation=generation
+    )
+    cache.invalidate("races", "1")
+    assert cache.get("late_registration", "1", "t") == (False, None)
+
+    generation = cache.generation("late_registration", "1")
+    cache.invalidate("raceclasses")
+    cache.set("late_registration", "1", "t", ["stale"], ttl=60, generation=generation)
+    assert cache.get("late_registration", "1", "t") == (False, None)
@@ -0,0 +1,144 @@
+"""Integration test cases for registering finish time events of a heat."""
+
+import asyncio
+
+import pytest
+
+from event_service_gui.adapters import (
+    ContestantsAdapter,
+    RaceplansAdapter,
+    StartAdapter,
+    TimeEventsAdapter,
+)
+from event_service_gui.errors import BackendError
+from event_service_gui.services import TimeEventsService
+
+# start times as stored in race-service, the race list is an older copy
+START_TIMES = {"r2": "2026-02-01T12:00:00", "r3": "2026-02-01T13:00:00"}
+RACES = [
+    {
+        "id": "r2",
+        "raceclass": "G11",
+        "round": "F",
+        "index": "A",
+        "heat": 1,
+        "max_no_of_contestants": 8,
+        "rule": {},
+        "start_time": "2026-02-01T11:00:00",
+    }
+]
+
+
+def template(rank: int, next_race_id: str) -> dict:
+    """Return template sending rank in r1 to next race."""
+    return {
+        "timing_point": "Template",
+        "race_id": "r1",
+        "rank": rank,
+        "next_race": f"FA {next_race_id}",
+        "next_race_id": next_race_id,
+        "next_race_position": rank,
+    }
+
+
+@pytest.fixture
+def backend(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Replace backend services, record writes."""
+    calls: dict = {"start_entries": [], "race_by_id": [], "time_events": []}
+    # start entries being written per next race, and the most seen at once
+    in_flight: dict = {}
+    calls["max_in_flight"] = 0
+
+    async def get_all_races(self, token, event_id) -> list:
+        return RACES
+
+    async def get_race_by_id(self, token, race_id) -> dict:
+        calls["race_by_id"].append(race_id)
+        if race_id not in START_TIMES:
+            raise BackendError(404, reason="Error - 404: Race not found.")
+        return {"id": race_id, "start_time": START_TIMES[race_id]}
+
+    async def get_time_events_by_race_id(self, token, race_id) -> list:
+        return [
+            template(1, "r2"),
+            template(2, "r2"),
+            template(3, "r3"),
+            template(5, "r4"),
+        ]
+
+    async def get_all_starts_by_event(self, token, event_id) -> list:
+        return [{"id": "startlist-1"}]
+
+    async def get_contestant_by_bib(self, token, event_id, bib) -> dict:
+        if bib == 13:
+            return {}
+        return {"first_name": "Ola", "last_name": f"{bib}", "club": "Lyn"}
+
+    async def create_time_event(self, token, time_event) -> dict:
+        if time_event["bib"] == 2:
+            raise BackendError(500, reason="Error - 500: Internal error.")
+        calls["time_events"].append(time_event)
+        return {**time_event, "status": "OK"}
+
+    async def create_start_entry(self, token, start_entry) -> str:
+        race_id = start_entry["race_id"]
+        in_flight[race_id] = in_flight.get(race_id, 0) + 1
+        calls["max_in_flight"] = max(calls["max_in_flight"], in_flight[race_id])
+        await asyncio.sleep(0.01)
+        in_flight[race_id] -= 1
+        calls["start_entries"].append(start_entry)
+        return "id"
+
+    monkeypatch.setattr(RaceplansAdapter, "get_all_races", get_all_races)
+    monkeypatch.setattr(RaceplansAdapter, "get_race_by_id", get_race_by_id)
+    monkeypatch.setattr(
+        TimeEventsAdapter, "get_time_events_by_race_id", get_time_events_by_race_id
+    )
+    monkeypatch.setattr(TimeEventsAdapter, "create_time_event", create_time_event)
+    monkeypatch.setattr(
+        StartAdapter, "get_all_starts_by_event", get_all_starts_by_event
+    )
+    monkeypatch.setattr(StartAdapter, "create_start_entry", create_start_entry)
+    monkeypatch.setattr(
+        ContestantsAdapter, "get_contestant_by_bib", get_contestant_by_bib
+    )
+    return calls
+
+
+@pytest.mark.integration
+async def test_finish_errors_per_bib(backend: dict) -> None:
+    """Should register finishers with fresh next race times, report failing bibs."""
+    time_events = [
+        {"id": "", "event_id": "e1", "race_id": "r1", "bib": bib, "rank": rank}
+        for rank, bib in enumerate([1, 2, 3, 13, 5], start=1)
+    ]
+    informasjon = await TimeEventsService().create_finish_time_events(
+        "token", time_events
+    )
+
+    assert "1: 1 pl." in informasjon
+    assert "3: 3 pl." in informasjon
+    assert "ERROR! Bib 2: Error - 500: Internal error." in informasjon
+    assert "ERROR! Bib 13: Fant ingen deltaker." in informasjon
+    assert "ERROR! Bib 5: Error - 404: Race not found." in informasjon
+    assert sorted(backend["race_by_id"]) == ["r2", "r3", "r4"]
+    assert sorted(
+        (entry["bib"], entry["scheduled_start_time"])
+        for entry in backend["start_entries"]
+    ) == [(1, "2026-02-01T12:00:00"), (3, "2026-02-01T13:00:00")]
+    assert backend["time_events"][0]["name"] == "Ola 1"
+
+
+@pytest.mark.integration
+async def test_finish_writes_one_at_a_time_per_next_race(backend: dict) -> None:
+    """Should not write start entries to the same next race concurrently."""
+    time_events = [
+        {"id": "", "event_id": "e1", "race_id": "r1", "bib": bib, "rank": rank}
+        for rank, bib in enumerate([1, 4, 3], start=1)
+    ]
+    await TimeEventsService().create_finish_time_events("token", time_events)
+
+    assert backend["max_in_flight"] == 1
+    assert [
+        entry["bib"] for entry in backend["start_entries"] if entry["race_id"] == "r2"
+    ] == [1, 4]
@@ -0,0 +1,210 @@
+"""Integration test cases for background jobs."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient as _TestClient
+
+from event_service_gui import jobs
+from event_service_gui.adapters.request_cache import (
+    _current_cache,
+    request_cache_scope,
+)
+from event_service_gui.errors import BackendError
+from event_service_gui.jobs import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_RUNNING,
+    Job,
+    get_active_jobs,
+    get_job,
+    submit_job,
+)
+from event_service_gui.services import TimeEventsService
+from event_service_gui.views import control, seeding
+from event_service_gui.views import jobs as jobs_view
+
+
+async def wait_for(job: Job) -> None:
+    """Wait until job is finished."""
+    while job.active:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.integration
+async def test_job_runs_in_background() -> None:
+    """Should return job at once and record result and progress when done."""
+    started = asyncio.Event()
+
+    async def task(job: Job) -> str:
+        started.set()
+        job.update_progress("Slett", 1, 2)
+        await asyncio.sleep(0.01)
+        job.update_progress("Slett", 2, 2)
+        return "Slettet 2."
+
+    job = submit_job("Slett alt", "1", task)
+    assert job.active
+    assert get_job(job.id) is job
+    await wait_for(job)
+
+    assert started.is_set()
+    assert job.to_dict()["status"] == JOB_DONE
+    assert (job.result, job.done, job.total) == ("Slettet 2.", 2, 2)
+
+
+@pytest.mark.integration
+async def test_job_concurrency_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should run at most JOB_CONCURRENCY jobs at the same time."""
+    monkeypatch.setattr(jobs, "_semaphores", {})
+    monkeypatch.setattr(jobs, "JOB_CONCURRENCY", 2)
+    running = 0
+    max_running = 0
+
+    async def task(_job: Job) -> str:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return ""
+
+    submitted = [submit_job("Test", "1", task) for _ in range(6)]
+    for job in submitted:
+        await wait_for(job)
+    assert max_running == 2
+
+
+@pytest.mark.integration
+async def test_job_does_not_share_request_cache() -> None:
+    """Should run with a fresh context, without the request cache of the submitter."""
+    with request_cache_scope():
+
+        async def task(_job: Job) -> str:
+            return str(_current_cache.get())
+
+        job = submit_job("Test", "1", task)
+    await wait_for(job)
+    assert job.result == "None"
+
+
+@pytest.mark.integration
+async def test_job_failure_unauthorized() -> None:
+    """Should record failure and flag expired login."""
+
+    async def task(_job: Job) -> str:
+        raise BackendError(401, reason="401 Unathorized - delete")
+
+    job = submit_job("Test", "1", task)
+    await wait_for(job)
+    assert job.status == JOB_FAILED
+    assert job.unauthorized
+    assert "401" in job.result
+
+
+@pytest.mark.integration
+async def test_job_status_route(
+    client: _TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should return job status as json, 404 for unknown job."""
+
+    async def check_login(_view: web.View) -> dict:
+        return {"name": "test", "token": "token"}
+
+    async def task(_job: Job) -> str:
+        return "OK"
+
+    monkeypatch.setattr(jobs_view, "check_login", check_login)
+    job = submit_job("Test", "1", task)
+    await wait_for(job)
+
+    resp = await client.get(f"/jobs?job_id={job.id}")
+    assert resp.status == 200
+    assert (await resp.json())["result"] == "OK"
+    resp = await client.get("/jobs?job_id=unknown")
+    assert resp.status == 404
+
+
+@pytest.mark.integration
+async def test_job_status_shared_with_other_processes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Should find status and active jobs from the status files."""
+    monkeypatch.setattr(jobs, "PROGRESS_SAVE_INTERVAL", 0)
+    release = asyncio.Event()
+
+    async def task(job: Job) -> str:
+        job.update_progress("Slett", 1, 2)
+        await release.wait()
+        return "OK"
+
+    job = submit_job("Test", "1", task)
+    await asyncio.sleep(0.01)
+    # as seen from a process that does not run the job
+    monkeypatch.setattr(jobs, "_jobs", {})
+    shared = get_job(job.id)
+    assert shared is not job
+    assert (shared.status, shared.done, shared.total) == (JOB_RUNNING, 1, 2)
+    assert [active.id for active in get_active_jobs("1")] == [job.id]
+    assert get_active_jobs("2") == []
+
+    release.set()
+    await wait_for(job)
+    assert get_job(job.id).to_dict() == job.to_dict()
+    assert get_active_jobs("1") == []
+    assert get_job("../jobs") is None
+
+
+@pytest.mark.integration
+async def test_job_of_stopped_process_failed() -> None:
+    """Should show an active job as failed when its process has stopped."""
+    job = Job("Test", "1")
+    job.status = JOB_RUNNING
+    job.pid = 2**22 + 1
+    job.save()
+    assert get_job(job.id).status == JOB_FAILED
+    assert get_active_jobs("1") == []
+
+
+@pytest.mark.integration
+@pytest.mark.filterwarnings("ignore:returning HTTPException:DeprecationWarning")
+async def test_control_and_seeding_run_as_jobs(
+    client: _TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should start semi-final shuffle and seeding as jobs, and go to tasks page."""
+    calls = []
+
+    async def check_login(_view: web.View) -> dict:
+        return {"name": "test", "token": "token"}
+
+    async def shuffle(_self, token: str, event_id: str) -> str:
+        calls.append(("shuffle", event_id))
+        return "Rotert."
+
+    async def add_points_and_seed(token, event_id, form, valgt_klasse) -> str:
+        calls.append(("seeding", valgt_klasse))
+        return "Seedet."
+
+    monkeypatch.setattr(control, "check_login", check_login)
+    monkeypatch.setattr(seeding, "check_login", check_login)
+    monkeypatch.setattr(TimeEventsService, "shuffle_semi_final_templates", shuffle)
+    monkeypatch.setattr(seeding, "add_points_and_seed", add_points_and_seed)
+    forms = [
+        (
+            "/control",
+            {"event_id": "1", "valgt_klasse": "", "action": "", "shift_position": "1"},
+        ),
+        ("/seeding", {"event_id": "1", "klasse": "G16", "action": "seeding_points"}),
+    ]
+    results = []
+    for path, form in forms:
+        resp = await client.post(path, data=form, allow_redirects=False)
+        assert resp.status == 303
+        location = resp.headers["Location"]
+        assert location.startswith("/tasks?event_id=1&job_id=")
+        job = get_job(location.split("job_id=")[1].split("&")[0])
+        await wait_for(job)
+        results.append(job.result)
+    assert calls == [("shuffle", "1"), ("seeding", "G16")]
+    assert results == ["Rotert.", "Seedet."]
@@ -0,0 +1,74 @@
+"""Integration test cases for available late registration places."""
+
+import pytest
+
+from event_service_gui.adapters import RaceclassesAdapter, RaceplansAdapter
+from event_service_gui.adapters.event_cache import CACHE_TTLS, event_cache
+from event_service_gui.services.late_registration import (
+    compute_available_etteranmelding,
+    get_available_etteranmelding,
+)
+
+RACECLASSES = [
+    {"name": "G11", "ageclasses": ["G 11 år"], "ranking": True},
+    {"name": "G12", "ageclasses": ["G 12 år"], "ranking": True},
+    {"name": "J11", "ageclasses": ["J 11 år"], "ranking": False},
+]
+
+
+def race(raceclass: str, round_index: tuple, places: int, taken: int) -> dict:
+    """Return a race in round and index, e.g. ("S", "C")."""
+    return {
+        "raceclass": raceclass,
+        "round": round_index[0],
+        "index": round_index[1],
+        "max_no_of_contestants": places,
+        "no_of_contestants": taken,
+    }
+
+
+RACES = [
+    race("G11", ("S", "C"), 10, 7),
+    race("G11", ("S", "C"), 10, 9),
+    race("G11", ("F", "A"), 8, 0),
+    race("G12", ("F", "A"), 8, 5),
+    race("G12", ("F", "B"), 8, 0),
+    race("J11", ("R1", ""), 10, 8),
+    race("J11", ("R1", ""), 10, 10),
+    race("J11", ("R2", ""), 10, 0),
+]
+
+
+@pytest.mark.integration
+def test_compute_available_places() -> None:
+    """Should find the limiting races per raceclass."""
+    availability = compute_available_etteranmelding(RACECLASSES, RACES)
+    assert [a["available_places"] for a in availability] == [4, 3, 2]
+    assert availability[0]["ageclasses"] == ["G 11 år"]
+
+
+@pytest.mark.integration
+async def test_available_places_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should compute once per event until races are changed."""
+    monkeypatch.setitem(CACHE_TTLS, "late_registration", 10)
+    calls = []
+
+    async def get_raceclasses(self, token, event_id) -> list:
+        calls.append("raceclasses")
+        return RACECLASSES
+
+    async def get_all_races(self, token, event_id) -> list:
+        calls.append("races")
+        return RACES
+
+    monkeypatch.setattr(RaceclassesAdapter, "get_raceclasses", get_raceclasses)
+    monkeypatch.setattr(RaceplansAdapter, "get_all_races", get_all_races)
+    first = await get_available_etteranmelding("token", "event-1")
+    first[0]["available_places"] = 0
+    second = await get_available_etteranmelding("token", "event-1")
+    assert second[0]["available_places"] == 4
+    assert len(calls) == 2
+
+    event_cache.invalidate("races", "event-1")
+    await get_available_etteranmelding("token", "event-1")
+    assert len(calls) == 4
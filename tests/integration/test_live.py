@@ -0,0 +1,203 @@
+"""Integration test cases for live updates."""
+
+import asyncio
+import datetime
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient as _TestClient
+
+from event_service_gui.adapters import (
+    EventsAdapter,
+    RaceplansAdapter,
+    StatusAdapter,
+    TimeEventsAdapter,
+)
+from event_service_gui.adapters.event_cache import event_cache
+from event_service_gui.adapters.time_event_store import (
+    TimeEventStore,
+    get_time_event_store,
+)
+from event_service_gui.errors import BackendError
+from event_service_gui.services import event_poller
+from event_service_gui.services.event_poller import (
+    get_poller,
+    get_time_events,
+    poll_interval,
+)
+from event_service_gui.views import live
+
+
+@pytest.fixture
+def time_events(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Replace time events in race-service, count backend calls."""
+    backend = {"time_events": [{"id": "1", "bib": 1, "status": "OK"}], "calls": 0}
+
+    async def get_time_events_by_event_id(self, token, event_id) -> list:
+        backend["calls"] += 1
+        if token == "expired":
+            raise BackendError(401, reason="401 Unathorized - get_time_events")
+        return [dict(time_event) for time_event in backend["time_events"]]
+
+    async def get_event(self, token, event_id) -> dict:
+        return {"id": event_id, "timezone": "Europe/Oslo"}
+
+    async def get_all_races(self, token, event_id) -> list:
+        return []
+
+    async def get_status(self, token, event_id, count) -> list:
+        return backend["status"]
+
+    async def sync_time_events(self, token, event_id) -> TimeEventStore:
+        store = get_time_event_store(event_id)
+        store.merge(await get_time_events_by_event_id(self, token, event_id))
+        return store
+
+    backend["status"] = []
+    monkeypatch.setattr(
+        TimeEventsAdapter, "get_time_events_by_event_id", get_time_events_by_event_id
+    )
+    monkeypatch.setattr(TimeEventsAdapter, "sync_time_events", sync_time_events)
+    monkeypatch.setattr(EventsAdapter, "get_event", get_event)
+    monkeypatch.setattr(RaceplansAdapter, "get_all_races", get_all_races)
+    monkeypatch.setattr(StatusAdapter, "get_status", get_status)
+    monkeypatch.setattr(event_poller, "POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(event_poller, "POLL_INTERVAL_FAST", 0.01)
+    return backend
+
+
+@pytest.mark.integration
+async def test_poller_shared_by_listeners(time_events: dict) -> None:
+    """Should poll once for all listeners and send the same changes to all."""
+    poller = get_poller("event-1")
+    queues = [poller.listen("token") for _ in range(5)]
+    await asyncio.sleep(0.05)
+    time_events["time_events"].append({"id": "2", "bib": 2, "status": "Error"})
+
+    messages = [await asyncio.wait_for(queue.get(), 1) for queue in queues]
+    calls = time_events["calls"]
+    for queue in queues:
+        poller.stop_listening(queue)
+
+    assert all(message == messages[0] for message in messages)
+    assert messages[0]["added"] == [{"id": "2", "bib": 2, "status": "Error"}]
+    assert calls < 20
+    assert poller.task is None
+    assert "event-1" not in event_poller._pollers
+
+
+@pytest.mark.integration
+async def test_expired_token_rejects_only_its_listener(time_events: dict) -> None:
+    """Should tell the listener to log in again and poll on with another token."""
+    poller = get_poller("event-6")
+    queue = poller.listen("token")
+    expired = poller.listen("expired")
+
+    message = await asyncio.wait_for(expired.get(), 1)
+    assert message == {"type": "error", "unauthorized": True}
+    assert poller.token == "token"
+    time_events["time_events"].append({"id": "2", "bib": 2, "status": "OK"})
+    message = await asyncio.wait_for(queue.get(), 1)
+    assert message["type"] == "time_events"
+    assert not poller.is_fresh("expired")
+    poller.stop_listening(expired)
+    poller.stop_listening(queue)
+
+
+@pytest.mark.integration
+def test_poll_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should poll fast only when a race starts close to now."""
+    monkeypatch.setattr(event_poller, "POLL_INTERVAL", 30)
+    monkeypatch.setattr(event_poller, "POLL_INTERVAL_FAST", 2)
+    now = datetime.datetime(2026, 2, 1, 12, 0, 0)
+    races = [{"start_time": "2026-02-01T10:00:00"}, {"start_time": "invalid"}]
+    assert poll_interval(races, now) == 30
+    races.append({"start_time": "2026-02-01T12:08:00"})
+    assert poll_interval(races, now) == 2
+    assert poll_interval([], now) == 30
+
+
+@pytest.mark.integration
+async def test_readers_share_snapshot(
+    time_events: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should serve readers from the snapshot until a time event is written."""
+    poller = get_poller("event-3")
+    queue = poller.listen("token")
+    while not poller.is_fresh("token"):
+        await asyncio.sleep(0.001)
+    # slow polling - after the poll already scheduled
+    poller.interval = 60
+    monkeypatch.setattr(event_poller, "POLL_INTERVAL_FAST", 60)
+    await asyncio.sleep(0.05)
+    calls = time_events["calls"]
+
+    first = await get_time_events("token", "event-3")
+    first[0]["status"] = "changed by reader"
+    second = await get_time_events("token", "event-3")
+    assert time_events["calls"] == calls
+    assert second == [{"id": "1", "bib": 1, "status": "OK"}]
+
+    event_cache.invalidate("time_events", "event-3")
+    await get_time_events("token", "event-3")
+    assert time_events["calls"] == calls + 1
+    poller.stop_listening(queue)
+
+
+@pytest.mark.integration
+async def test_old_snapshot_not_served(time_events: dict) -> None:
+    """Should call backend when the snapshot is older than POLL_INTERVAL_FAST."""
+    poller = get_poller("event-5")
+    queue = poller.listen("token")
+    while not poller.is_fresh("token"):
+        await asyncio.sleep(0.001)
+    poller.interval = 60
+    await asyncio.sleep(0.05)
+    calls = time_events["calls"]
+
+    # snapshot is now older than POLL_INTERVAL_FAST of the fixture
+    await get_time_events("token", "event-5")
+    assert time_events["calls"] == calls + 1
+    poller.stop_listening(queue)
+
+
+@pytest.mark.integration
+async def test_new_status_messages_published(time_events: dict) -> None:
+    """Should publish status messages that are new since the previous poll."""
+    time_events["status"] = [{"id": "s1", "time": "10:00", "message": "Gammel"}]
+    poller = get_poller("event-4")
+    queue = poller.listen("token")
+    await asyncio.sleep(0.05)
+    time_events["status"] = [
+        {"id": "s2", "time": "10:01", "message": "Ny"},
+        *time_events["status"],
+    ]
+
+    message = await asyncio.wait_for(queue.get(), 1)
+    poller.stop_listening(queue)
+    assert message == {"type": "status", "message": "10:01 Ny"}
+
+
+@pytest.mark.integration
+async def test_live_route(
+    client: _TestClient, monkeypatch: pytest.MonkeyPatch, time_events: dict
+) -> None:
+    """Should stream changes as server-sent events."""
+
+    async def check_login(_view: web.View) -> dict:
+        return {"name": "test", "token": "token"}
+
+    monkeypatch.setattr(live, "check_login", check_login)
+    resp = await client.get("/live?event_id=event-2")
+    assert resp.headers["Content-Type"] == "text/event-stream"
+    await asyncio.sleep(0.05)
+    time_events["time_events"][0]["status"] = "Error"
+
+    event_line = await asyncio.wait_for(resp.content.readline(), 1)
+    data_line = await asyncio.wait_for(resp.content.readline(), 1)
+    resp.close()
+
+    assert event_line == b"event: time_events\n"
+    changes = json.loads(data_line.removeprefix(b"data: "))
+    assert changes["changed"] == [{"id": "1", "bib": 1, "status": "Error"}]
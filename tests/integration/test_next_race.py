@@ -0,0 +1,126 @@
+"""Integration test cases for next race calculations."""
+
+from collections import OrderedDict
+
+import pytest
+
+from event_service_gui.adapters import RaceplansAdapter, TimeEventsAdapter
+from event_service_gui.services import TimeEventsService
+from event_service_gui.services import RoutingTable, race_routing
+from event_service_gui.services.race_routing import get_next_start_entry
+
+
+def make_races() -> list:
+    """Return a raceplan with 4 quarter finals, semi finals A/C and finals."""
+    races = []
+
+    def add(round_: str, index: str, heat: int, rule: dict) -> None:
+        races.append(
+            {
+                "id": f"{round_}{index}{heat}",
+                "raceclass": "G11",
+                "round": round_,
+                "index": index,
+                "heat": heat,
+                "rule": rule,
+                "start_time": "2025-01-01T10:00:00",
+                "max_no_of_contestants": 8,
+            }
+        )
+
+    for heat in range(1, 5):
+        add("Q", "", heat, {"S": {"A": 4, "C": "REST"}})
+    for heat in range(1, 3):
+        add("S", "A", heat, {"F": {"A": 4, "B": "REST"}})
+    for heat in range(1, 3):
+        add("S", "C", heat, {"F": {"C": "REST"}})
+    for index in ["A", "B", "C"]:
+        add("F", index, 1, {})
+    return races
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    ("race_id", "rank", "next_race", "position"),
+    [
+        ("Q1", 1, "SA1", 1),
+        ("Q2", 1, "SA2", 1),
+        ("Q3", 1, "SA1", 2),
+        ("Q1", 5, "SC1", 1),
+        ("SA2", 4, "FA", 8),
+        ("SA1", 5, "FB", 1),
+    ],
+)
+def test_next_start_entry(
+    race_id: str, rank: int, next_race: str, position: int
+) -> None:
+    """Should distribute contestants evenly over heats in next round."""
+    time_event = {"bib": 1, "race_id": race_id, "rank": rank}
+    start_entry = get_next_start_entry(time_event, make_races())
+    assert start_entry["race_round"] == next_race
+    assert start_entry["starting_position"] == position
+
+
+@pytest.mark.integration
+async def test_generate_next_race_templates(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should replace old templates and summarize failed creates."""
+    deleted = []
+    created = []
+
+    async def get_templates(*args) -> list:
+        return [{"id": "old1"}, {"id": "old2"}]
+
+    async def get_all_races(*args) -> list:
+        return make_races()
+
+    async def delete_time_event(self, token, t_id) -> int:
+        deleted.append(t_id)
+        return 204
+
+    async def create_time_event(self, token, time_event) -> dict:
+        if time_event["race_id"] == "Q4" and time_event["rank"] == 8:
+            raise ValueError("400 - duplicate")
+        created.append(time_event)
+        return time_event
+
+    monkeypatch.setattr(
+        TimeEventsAdapter, "get_time_events_by_event_id_and_timing_point", get_templates
+    )
+    monkeypatch.setattr(RaceplansAdapter, "get_all_races", get_all_races)
+    monkeypatch.setattr(TimeEventsAdapter, "delete_time_event", delete_time_event)
+    monkeypatch.setattr(TimeEventsAdapter, "create_time_event", create_time_event)
+
+    event = {"id": "1", "timezone": "Europe/Oslo"}
+    informasjon = await TimeEventsService().generate_next_race_templates("t", event)
+    assert sorted(deleted) == ["old1", "old2"]
+    # 4 quarter finals and 4 semi finals, 8 ranks each
+    assert len(created) == 63
+    assert "63 av 64 utført. 1 feilet, første feil: 400 - duplicate." in informasjon
+
+
+@pytest.mark.integration
+def test_routing_table_compiled_once_per_raceclass() -> None:
+    """Should reuse compiled routes until the races of the raceclass change."""
+    races = make_races()
+    routing_table = RoutingTable("1", races)
+    assert routing_table.next_start_entry("Q3", 1)["race_id"] == "SA1"
+    assert routing_table.next_start_entry("FA1", 1) == {}
+
+    compiled = race_routing._compiled_routes[("1", "G11")]
+    assert RoutingTable("1", make_races())
+    assert race_routing._compiled_routes[("1", "G11")] is compiled
+
+    races[0]["rule"] = {"F": {"A": "ALL"}}
+    routing_table = RoutingTable("1", races)
+    assert race_routing._compiled_routes[("1", "G11")] is not compiled
+    assert routing_table.next_start_entry("Q1", 8)["race_round"] == "FA"
+
+
+@pytest.mark.integration
+def test_compiled_routes_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should keep at most CACHE_MAX_ENTRIES compiled raceclasses, evict least used."""
+    monkeypatch.setattr(race_routing, "_compiled_routes", OrderedDict())
+    monkeypatch.setattr(race_routing, "CACHE_MAX_ENTRIES", 2)
+    for event_id in ["1", "2", "1", "3"]:
+        RoutingTable(event_id, make_races())
+    assert list(race_routing._compiled_routes) == [("1", "G11"), ("3", "G11")]
@@ -0,0 +1,82 @@
+"""Integration test cases for the passering index."""
+
+import pytest
+
+from event_service_gui.adapters.time_event_store import TimeEventStore
+from event_service_gui.services.passering_index import (
+    ERRORS,
+    PASSERINGER,
+    TEMPLATES,
+    PasseringIndex,
+)
+
+
+def time_event(
+    te_id: str, race: str, status: str = "OK", point: str = "Finish"
+) -> dict:
+    """Return a time event."""
+    return {"id": te_id, "race": race, "status": status, "timing_point": point}
+
+
+@pytest.fixture
+def time_events() -> list:
+    """Return time events in several races and raceclasses."""
+    return [
+        time_event("1", "G11-QA1", "Error"),
+        time_event("2", "G11-QA1"),
+        time_event("3", "G12-QA1", "Error"),
+        time_event("4", "G11-SA1", "Error"),
+        time_event("5", "G11-QA1", point="Template"),
+        time_event("6", "G12-SA1", point="Template"),
+    ]
+
+
+@pytest.mark.integration
+def test_select_buckets(time_events: list) -> None:
+    """Should select time events by bucket and raceclass, in store order."""
+    store = TimeEventStore()
+    store.merge(time_events)
+    index = PasseringIndex()
+    index.update(store)
+
+    def ids(selected: list) -> list:
+        return [te["id"] for te in selected]
+
+    assert ids(index.select(PASSERINGER)) == ["1", "2", "3", "4"]
+    assert ids(index.select(ERRORS, "G11")) == ["1", "4"]
+    assert ids(index.select(TEMPLATES)) == ["5", "6"]
+    assert ids(index.select(TEMPLATES, "G12")) == ["6"]
+    # not a raceclass - matches part of race name
+    assert ids(index.select(ERRORS, "SA1")) == ["4"]
+
+
+@pytest.mark.integration
+def test_update_incremental(time_events: list) -> None:
+    """Should move changed time events between buckets and keep their order."""
+    store = TimeEventStore()
+    store.merge(time_events)
+    index = PasseringIndex()
+    index.update(store)
+
+    time_events[0] = time_event("1", "G11-QA1")
+    time_events[1] = time_event("2", "G11-QA1", "Error")
+    del time_events[3]
+    time_events.append(time_event("7", "G11-QA1", "Error"))
+    store.merge(time_events)
+    index.update(store)
+
+    assert [te["id"] for te in index.select(ERRORS, "G11")] == ["2", "7"]
+    assert [te["id"] for te in index.select(PASSERINGER, "G11")] == ["1", "2", "7"]
+    assert index.version == store.version
+
+
+@pytest.mark.integration
+def test_select_matches_part_of_race_name(time_events: list) -> None:
+    """Should select races containing valgt_klasse, also other raceclasses."""
+    store = TimeEventStore()
+    store.merge([time_event("0", "G1-QA1", "Error"), *time_events])
+    index = PasseringIndex()
+    index.update(store)
+
+    selected = index.select(ERRORS, "G1")
+    assert [te["id"] for te in selected] == ["0", "1", "3", "4"]
@@ -0,0 +1,101 @@
+"""Integration test cases for request profiling."""
+
+import asyncio
+from typing import Any
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient as _TestClient
+
+from event_service_gui.adapters.client_session import (
+    RACE_SERVICE,
+    backend_session,
+    close_backend_sessions,
+)
+from event_service_gui.middlewares import ROUTE_PROFILES, profiling_middleware
+from event_service_gui.profiling import (
+    Histogram,
+    profile_response_prepare,
+    profile_scope,
+)
+from event_service_gui.views import profiling
+
+
+@pytest.mark.integration
+def test_histogram() -> None:
+    """Should count durations in millisecond buckets."""
+    histogram = Histogram()
+    for seconds in [0.001, 0.02, 0.02, 30]:
+        histogram.add(seconds)
+    result = histogram.to_dict()
+    assert result["count"] == 4
+    assert result["max_ms"] == 30000
+    assert result["buckets"]["<=5"] == 1
+    assert result["buckets"]["<=25"] == 2
+    assert result["buckets"][">10000"] == 1
+
+
+@pytest.mark.integration
+async def test_backend_calls_recorded(aiohttp_server: Any) -> None:
+    """Should record outbound calls per backend service for the request."""
+
+    async def ok(_request: web.Request) -> web.Response:
+        return web.json_response([])
+
+    app = web.Application()
+    app.router.add_get("/races", ok)
+    server = await aiohttp_server(app)
+    with profile_scope() as profile:
+        for _ in range(2):
+            async with (
+                backend_session(RACE_SERVICE) as session,
+                session.get(str(server.make_url("/races"))) as resp,
+            ):
+                await resp.json()
+    await close_backend_sessions()
+    assert list(profile.backend_calls) == [RACE_SERVICE]
+    assert len(profile.backend_calls[RACE_SERVICE]) == 2
+
+
+@pytest.mark.integration
+async def test_profiling_route(
+    client: _TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should show latency and template render time per route."""
+
+    async def check_login(_view: web.View) -> dict:
+        return {"name": "test", "token": "token"}
+
+    monkeypatch.setattr(profiling, "check_login", check_login)
+    await client.get("/login")
+    await client.get("/login")
+    resp = await client.get("/profiling")
+    assert resp.status == 200
+    body = await resp.json()
+    login = body["routes"]["GET /login"]
+    assert login["requests"] == 2
+    assert login["template"]["count"] == 2
+    assert "request_cache" in body
+
+
+@pytest.mark.integration
+async def test_streamed_response_latency(aiohttp_client: Any) -> None:
+    """Should count latency of a streamed response until it started."""
+
+    async def stream(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await asyncio.sleep(0.3)
+        await response.write(b"done")
+        return response
+
+    app = web.Application(middlewares=[profiling_middleware])
+    app[ROUTE_PROFILES] = {}
+    app.on_response_prepare.append(profile_response_prepare)
+    app.router.add_get("/stream", stream)
+    client = await aiohttp_client(app)
+    resp = await client.get("/stream")
+    assert await resp.read() == b"done"
+    latency = app[ROUTE_PROFILES]["GET /stream"].latency
+    assert latency.count == 1
+    assert latency.max < 250
@@ -0,0 +1,107 @@
+"""Integration test cases for races formatted for print."""
+
+import asyncio
+from typing import Any
+
+from aiohttp import web
+import pytest
+
+from event_service_gui.adapters import raceplans_adapter, time_events_adapter
+from event_service_gui.concurrency import BACKEND_CONCURRENCY
+from event_service_gui.views.utils import get_races_for_print
+
+LATENCY = 0.005
+USER = {"token": "token"}
+RACECLASSES = [{"name": "G11"}, {"name": "J11"}]
+
+
+def make_races(no_of_heats: int) -> list:
+    """Return races alternating between raceclasses."""
+    return [
+        {
+            "id": f"r{i}",
+            "event_id": "1",
+            "raceclass": RACECLASSES[i % 2]["name"],
+            "round": "F",
+            "index": "A",
+            "heat": i,
+            "order": i,
+            "start_time": "2025-01-01T10:00:00",
+            "start_entries": [{"bib": i, "club": "Lyn"}],
+            "results": {},
+        }
+        for i in range(no_of_heats)
+    ]
+
+
+@pytest.fixture
+async def race_service(aiohttp_server: Any, monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Start a fake race-service with some latency per call."""
+    backend: dict = {
+        "races": {},
+        "calls": {"race": 0, "time_events": 0},
+        "in_flight": 0,
+        "max_in_flight": 0,
+    }
+
+    async def get_race(request: web.Request) -> web.Response:
+        backend["calls"]["race"] += 1
+        backend["in_flight"] += 1
+        backend["max_in_flight"] = max(backend["max_in_flight"], backend["in_flight"])
+        await asyncio.sleep(LATENCY)
+        backend["in_flight"] -= 1
+        return web.json_response(backend["races"][request.match_info["race_id"]])
+
+    async def get_time_events(request: web.Request) -> web.Response:
+        backend["calls"]["time_events"] += 1
+        await asyncio.sleep(LATENCY)
+        return web.json_response(
+            [
+                {
+                    "race_id": "r1",
+                    "timing_point": "DNS",
+                    "bib": 1,
+                    "registration_time": "10:00:00",
+                },
+                {
+                    "race_id": "r1",
+                    "timing_point": "Template",
+                    "rank": 1,
+                    "next_race": "SA1",
+                },
+            ]
+        )
+
+    app = web.Application()
+    app.router.add_get("/races/{race_id}", get_race)
+    app.router.add_get("/time-events", get_time_events)
+    server = await aiohttp_server(app)
+    url = str(server.make_url("")).rstrip("/")
+    monkeypatch.setattr(raceplans_adapter, "RACE_SERVICE_URL", url)
+    monkeypatch.setattr(time_events_adapter, "RACE_SERVICE_URL", url)
+    return backend
+
+
+@pytest.mark.integration
+async def test_races_grouped_by_raceclass(race_service: dict) -> None:
+    """Should keep raceclass order and use one event wide time events call."""
+    races = make_races(4)
+    race_service["races"] = {race["id"]: race for race in races}
+    result = await get_races_for_print(USER, races, RACECLASSES, "", "start")
+    assert [race["id"] for race in result] == ["r0", "r2", "r1", "r3"]
+    assert [race["first_in_class"] for race in result] == [True, False, True, False]
+    assert result[2]["startliste"][0]["start_status"] == "DNS"
+    assert result[2]["startliste"][0]["next_race"] == "SA1"
+    assert "start_status" not in result[0]["startliste"][0]
+    assert race_service["calls"] == {"race": 4, "time_events": 1}
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("no_of_heats", [10, 50, 150])
+async def test_heats_fetched_concurrently(race_service: dict, no_of_heats: int) -> None:
+    """Should fetch heats concurrently, up to the limit, and time events once."""
+    races = make_races(no_of_heats)
+    race_service["races"] = {race["id"]: race for race in races}
+    await get_races_for_print(USER, races, RACECLASSES, "", "start")
+    assert race_service["calls"] == {"race": no_of_heats, "time_events": 1}
+    assert race_service["max_in_flight"] == min(no_of_heats, BACKEND_CONCURRENCY)
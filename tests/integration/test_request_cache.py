@@ -0,0 +1,107 @@
+"""Integration test cases for the request scoped cache."""
+
+import asyncio
+from typing import Any
+
+from aiohttp import web
+import pytest
+
+from event_service_gui.adapters import RaceplansAdapter, raceplans_adapter
+from event_service_gui.adapters.request_cache import request_cache_scope
+
+RACEPLANS = [{"id": "p1", "event_id": "1", "no_of_contestants": 10}]
+
+
+@pytest.fixture
+async def race_service(aiohttp_server: Any, monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Start a fake race-service counting incoming requests."""
+    hits = {"GET": 0, "PUT": 0}
+
+    async def get_raceplans(request: web.Request) -> web.Response:
+        hits["GET"] += 1
+        await asyncio.sleep(0.01)
+        return web.json_response(RACEPLANS)
+
+    async def put_race(request: web.Request) -> web.Response:
+        hits["PUT"] += 1
+        await asyncio.sleep(0.05)
+        return web.Response(status=204)
+
+    app = web.Application()
+    app.router.add_get("/raceplans", get_raceplans)
+    app.router.add_put("/races/{race_id}", put_race)
+    server = await aiohttp_server(app)
+    monkeypatch.setattr(
+        raceplans_adapter, "RACE_SERVICE_URL", str(server.make_url("")).rstrip("/")
+    )
+    return hits
+
+
+@pytest.mark.integration
+async def test_identical_reads_share_one_backend_call(race_service: dict) -> None:
+    """Should only call backend once for identical reads in one request."""
+    with request_cache_scope() as cache:
+        raceplans = await RaceplansAdapter().get_all_raceplans("token", "1")
+        raceplans[0]["no_of_contestants"] = 0
+        results = await asyncio.gather(
+            RaceplansAdapter().get_all_raceplans("token", "1"),
+            RaceplansAdapter().get_all_raceplans("token", "1"),
+        )
+    assert race_service["GET"] == 1
+    assert results[0][0]["no_of_contestants"] == 10
+    assert cache.backend_calls == 1
+    assert cache.saved_calls == 2
+
+
+@pytest.mark.integration
+async def test_concurrent_reads_are_coalesced(race_service: dict) -> None:
+    """Should share one in-flight backend call between concurrent readers."""
+    with request_cache_scope():
+        await asyncio.gather(
+            *[RaceplansAdapter().get_all_raceplans("token", "1") for _ in range(5)]
+        )
+    assert race_service["GET"] == 1
+
+
+@pytest.mark.integration
+async def test_backend_write_clears_request_cache(race_service: dict) -> None:
+    """Should read again after a write within the same request."""
+    with request_cache_scope() as cache:
+        await RaceplansAdapter().get_all_raceplans("token", "1")
+        await RaceplansAdapter().update_race("token", "r1", {"id": "r1"})
+        await RaceplansAdapter().get_all_raceplans("token", "1")
+    assert race_service == {"GET": 2, "PUT": 1}
+    assert cache.saved_calls == 0
+
+
+@pytest.mark.integration
+async def test_read_during_write_not_memoized(race_service: dict) -> None:
+    """Should read again after a write that was running while reading."""
+    with request_cache_scope():
+        write = asyncio.create_task(
+            RaceplansAdapter().update_race("token", "r1", {"id": "r1"})
+        )
+        await asyncio.sleep(0.01)
+        await RaceplansAdapter().get_all_raceplans("token", "1")
+        assert race_service == {"GET": 1, "PUT": 1}
+        await write
+        await RaceplansAdapter().get_all_raceplans("token", "1")
+    assert race_service["GET"] == 2
+
+
+@pytest.mark.integration
+async def test_arguments_by_name_share_key(race_service: dict) -> None:
+    """Should memoize the same read whether arguments are given by position or name."""
+    with request_cache_scope() as cache:
+        await RaceplansAdapter().get_all_raceplans("token", "1")
+        await RaceplansAdapter().get_all_raceplans("token", event_id="1")
+    assert race_service["GET"] == 1
+    assert cache.saved_calls == 1
+
+
+@pytest.mark.integration
+async def test_no_memoization_outside_request(race_service: dict) -> None:
+    """Should call backend every time when no request scope is active."""
+    await RaceplansAdapter().get_all_raceplans("token", "1")
+    await RaceplansAdapter().get_all_raceplans("token", "1")
+    assert race_service["GET"] == 2
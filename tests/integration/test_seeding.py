@@ -0,0 +1,159 @@
+"""Integration test cases for seeding."""
+
+import random
+
+import pytest
+
+from event_service_gui.adapters import ContestantsAdapter, StartAdapter
+from event_service_gui.errors import BackendError
+from event_service_gui.views import utils
+from event_service_gui.views.utils import perform_seeding, plan_seeding
+
+
+def make_contestants(count: int, seed: int) -> list:
+    """Return contestants with bibs 1..count, some with seeding points."""
+    rnd = random.Random(seed)
+    return [
+        {
+            "id": f"c{bib}",
+            "bib": bib,
+            "seeding_points": rnd.choice([None, rnd.randint(1, 500)]),
+        }
+        for bib in range(1, count + 1)
+    ]
+
+
+def sequential_seeding(contestants: list, heat_separators: list) -> dict:
+    """Return final bibs as the previous one swap at a time implementation did."""
+    bibs = {c["id"]: c["bib"] for c in contestants}
+    seeded = sorted(
+        [c for c in contestants if c["seeding_points"]],
+        key=lambda x: x["seeding_points"],
+    )
+    for index, seeded_contestant in enumerate(seeded):
+        heat = index % len(heat_separators)
+        position = index // len(heat_separators)
+        bib_index = position if heat == 0 else heat_separators[heat - 1] + position
+        new_bib = contestants[bib_index]["bib"]
+        old_bib = bibs[seeded_contestant["id"]]
+        if new_bib != old_bib:
+            holder = next(cid for cid, bib in bibs.items() if bib == new_bib)
+            bibs[holder] = old_bib
+            bibs[seeded_contestant["id"]] = new_bib
+    return bibs
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("seed", range(5))
+def test_plan_matches_sequential_swaps(seed: int) -> None:
+    """Should end with the same bibs as swapping one at a time."""
+    contestants = make_contestants(50, seed)
+    heat_separators = [7, 14, 21, 28, 35, 42, 50]
+    swaps, new_bibs = plan_seeding(contestants, heat_separators)
+    expected = sequential_seeding(contestants, heat_separators)
+    planned = {c["id"]: c["bib"] for c in contestants}
+    planned.update({contestant["id"]: bib for contestant, bib in new_bibs})
+    assert planned == expected
+    assert sorted(planned.values()) == list(range(1, 51))
+    assert len(new_bibs) <= 2 * len(swaps)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("dry_run", [True, False])
+async def test_perform_seeding(monkeypatch: pytest.MonkeyPatch, dry_run: bool) -> None:
+    """Should only update contestants with new bib, and nothing on dry run."""
+    contestants = make_contestants(20, 1)
+    updates = []
+
+    async def get_contestants_by_raceclass(*args) -> list:
+        return [dict(contestant) for contestant in contestants]
+
+    async def get_heat_separators(*args) -> list:
+        return [10, 20]
+
+    async def update_contestant(self, token, event_id, contestant) -> str:
+        updates.append(contestant["bib"])
+        return "204"
+
+    async def get_all_starts_by_event(self, token, event_id) -> list:
+        return [{"start_entries": []}]
+
+    monkeypatch.setattr(
+        ContestantsAdapter, "get_contestants_by_raceclass", get_contestants_by_raceclass
+    )
+    monkeypatch.setattr(ContestantsAdapter, "update_contestant", update_contestant)
+    monkeypatch.setattr(
+        StartAdapter, "get_all_starts_by_event", get_all_starts_by_event
+    )
+    monkeypatch.setattr(utils, "get_heat_separators", get_heat_separators)
+
+    informasjon = await perform_seeding("token", "1", "G11", dry_run=dry_run)
+    _swaps, new_bibs = plan_seeding(contestants, [10, 20])
+    if dry_run:
+        assert updates == []
+        assert f"{len(new_bibs)} startnummer endres" in informasjon
+    else:
+        assert updates == [None] * len(new_bibs) + [bib for _c, bib in new_bibs]
+
+
+def patch_seeding(
+    monkeypatch: pytest.MonkeyPatch, contestants: list, start_entries: list
+) -> dict:
+    """Patch backend for seeding, return bib by contestant id as stored."""
+    stored = {c["id"]: c["bib"] for c in contestants}
+
+    async def get_contestants_by_raceclass(*args) -> list:
+        return [dict(contestant) for contestant in contestants]
+
+    async def get_heat_separators(*args) -> list:
+        return [10, 20]
+
+    async def update_contestant(self, token, event_id, contestant) -> str:
+        if contestant["bib"] == 3 and contestant["id"] != "c3":
+            raise BackendError(422, reason="Error - 422: Bib in use.")
+        stored[contestant["id"]] = contestant["bib"]
+        return "204"
+
+    async def get_all_starts_by_event(self, token, event_id) -> list:
+        return [{"start_entries": start_entries}]
+
+    monkeypatch.setattr(
+        ContestantsAdapter, "get_contestants_by_raceclass", get_contestants_by_raceclass
+    )
+    monkeypatch.setattr(ContestantsAdapter, "update_contestant", update_contestant)
+    monkeypatch.setattr(
+        StartAdapter, "get_all_starts_by_event", get_all_starts_by_event
+    )
+    monkeypatch.setattr(utils, "get_heat_separators", get_heat_separators)
+    return stored
+
+
+@pytest.mark.integration
+async def test_perform_seeding_rolls_back(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should put the old bibs back when a new bib can not be written."""
+    contestants = make_contestants(20, 1)
+    _swaps, new_bibs = plan_seeding(contestants, [10, 20])
+    assert 3 in [bib for _c, bib in new_bibs]
+    stored = patch_seeding(monkeypatch, contestants, [])
+
+    informasjon = await perform_seeding("token", "1", "G11")
+    assert "Seeding feilet og er tilbakestilt" in informasjon
+    assert "Bib in use" in informasjon
+    assert stored == {c["id"]: c["bib"] for c in contestants}
+
+
+@pytest.mark.integration
+async def test_perform_seeding_blocked_by_startlist(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Should not update anything when a contestant to change is started."""
+    contestants = make_contestants(20, 1)
+    _swaps, new_bibs = plan_seeding(contestants, [10, 20])
+    started_bib = new_bibs[0][0]["bib"]
+    stored = patch_seeding(monkeypatch, contestants, [{"bib": started_bib}])
+
+    informasjon = await perform_seeding("token", "1", "G11")
+    assert f"Seeding avbrutt, startnummer finnes i startliste: {started_bib}" in (
+        informasjon
+    )
+    assert stored == {c["id"]: c["bib"] for c in contestants}
@@ -0,0 +1,102 @@
+"""Integration test cases for shuffling round 2 start-lists."""
+
+import pytest
+
+from event_service_gui.adapters import (
+    RaceclassesAdapter,
+    RaceplansAdapter,
+    StartAdapter,
+)
+from event_service_gui.adapters.start_adapter import shuffle_round2
+from event_service_gui.errors import BackendError
+
+RACES = [
+    {"id": "r1", "raceclass": "G9", "round": "R1", "heat": 1},
+    {"id": "h1", "raceclass": "G9", "round": "R2", "heat": 1},
+    {"id": "h2", "raceclass": "G9", "round": "R2", "heat": 2},
+    {"id": "h3", "raceclass": "G9", "round": "R2", "heat": 3},
+]
+
+
+def start_entry(race_id: str, position: int, bib: int) -> dict:
+    """Return a start entry."""
+    return {
+        "id": f"{race_id}-{position}",
+        "startlist_id": "s1",
+        "race_id": race_id,
+        "bib": bib,
+        "starting_position": position,
+        "scheduled_start_time": "2026-02-01T10:00:00",
+        "name": f"Løper {bib}",
+        "club": "Lyn",
+    }
+
+
+@pytest.fixture
+def backend(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Replace race-service with a start-list in memory."""
+    entries = {
+        (race_id, position): start_entry(race_id, position, heat * 10 + position)
+        for heat, race_id in enumerate(["h1", "h2", "h3"], start=1)
+        for position in range(1, 6)
+    }
+    state: dict = {"entries": entries, "calls": 0, "fail": None}
+
+    async def get_raceclasses(self, token, event_id) -> list:
+        return [{"name": "G9", "ranking": False}]
+
+    async def get_all_races(self, token, event_id) -> list:
+        return RACES
+
+    async def get_all_starts_by_event(self, token, event_id) -> list:
+        return [{"id": "s1", "start_entries": list(state["entries"].values())}]
+
+    async def delete_start_entry(self, token, race_id, start_entry_id) -> str:
+        state["calls"] += 1
+        key = next(k for k, v in state["entries"].items() if v["id"] == start_entry_id)
+        del state["entries"][key]
+        return "204"
+
+    async def create_start_entry(self, token, new_start) -> int:
+        state["calls"] += 1
+        if (new_start["race_id"], new_start["bib"]) == state["fail"]:
+            raise BackendError(409, reason="create_start_entry failed - Conflict.")
+        key = (new_start["race_id"], new_start["starting_position"])
+        state["entries"][key] = {**new_start, "id": f"new-{new_start['bib']}"}
+        return 201
+
+    monkeypatch.setattr(RaceclassesAdapter, "get_raceclasses", get_raceclasses)
+    monkeypatch.setattr(RaceplansAdapter, "get_all_races", get_all_races)
+    monkeypatch.setattr(
+        StartAdapter, "get_all_starts_by_event", get_all_starts_by_event
+    )
+    monkeypatch.setattr(StartAdapter, "delete_start_entry", delete_start_entry)
+    monkeypatch.setattr(StartAdapter, "create_start_entry", create_start_entry)
+    return state
+
+
+def bibs(state: dict, race_id: str) -> list:
+    """Return bibs in race, in start order."""
+    return [state["entries"][(race_id, position)]["bib"] for position in range(1, 6)]
+
+
+@pytest.mark.integration
+async def test_shuffle_round2(backend: dict) -> None:
+    """Should swap with the previous heat, writing only changed entries."""
+    informasjon = await shuffle_round2("token", "event-1")
+    assert bibs(backend, "h1") == [21, 12, 23, 14, 25]
+    assert bibs(backend, "h2") == [11, 32, 13, 34, 15]
+    assert bibs(backend, "h3") == [31, 22, 33, 24, 35]
+    assert backend["calls"] == 20
+    assert "5 flyttinger" in informasjon
+
+
+@pytest.mark.integration
+async def test_shuffle_round2_rolled_back(backend: dict) -> None:
+    """Should restore the start-lists when a change fails."""
+    backend["fail"] = ("h2", 32)
+    informasjon = await shuffle_round2("token", "event-1")
+    assert bibs(backend, "h1") == [11, 12, 13, 14, 15]
+    assert bibs(backend, "h2") == [21, 22, 23, 24, 25]
+    assert bibs(backend, "h3") == [31, 32, 33, 34, 35]
+    assert "ble ikke stokket" in informasjon
@@ -0,0 +1,100 @@
+"""Integration test cases for shifting race start times."""
+
+import datetime
+
+import pytest
+from aiohttp import web
+
+from event_service_gui.adapters import RaceplansAdapter
+from event_service_gui.adapters.raceplans_adapter import shift_start_times
+from event_service_gui.errors import BackendError
+
+RACES = [
+    {"id": f"r{order}", "order": order, "start_time": f"2026-02-01T10:0{order}:00"}
+    for order in range(1, 6)
+]
+
+
+@pytest.mark.integration
+def test_shift_start_times() -> None:
+    """Should move race to new time and shift following races as much."""
+    shifted, delta = shift_start_times(RACES, 3, "10:13:30")
+    assert delta == datetime.timedelta(minutes=10, seconds=30)
+    assert [race["start_time"][-8:] for race in shifted] == [
+        "10:13:30",
+        "10:14:30",
+        "10:15:30",
+    ]
+    assert RACES[2]["start_time"] == "2026-02-01T10:03:00"
+    assert shift_start_times(RACES, 3, "10:03:00") == ([], datetime.timedelta(0))
+    assert shift_start_times(RACES, 9, "10:03:00")[0] == []
+
+
+@pytest.fixture
+def backend(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Replace race-service, record updates."""
+    calls: dict = {"bulk": [], "races": [], "bulk_error": 0}
+
+    async def get_all_races(self, token, event_id) -> list:
+        return [dict(race) for race in RACES]
+
+    async def update_race_start_time(self, token, event_id, order, new_time) -> str:
+        calls["bulk"].append((order, new_time))
+        if calls["bulk_error"]:
+            status = calls["bulk_error"]
+            raise BackendError(status, reason=f"Error - {status}: Failed.")
+        return "Tidplan er oppdatert 204"
+
+    async def update_race(self, token, my_id, new_data) -> int:
+        calls["races"].append(new_data)
+        return 204
+
+    monkeypatch.setattr(RaceplansAdapter, "get_all_races", get_all_races)
+    monkeypatch.setattr(
+        RaceplansAdapter, "update_race_start_time", update_race_start_time
+    )
+    monkeypatch.setattr(RaceplansAdapter, "update_race", update_race)
+    return calls
+
+
+@pytest.mark.integration
+async def test_shift_in_one_call(backend: dict) -> None:
+    """Should shift all following races with one call to race-service."""
+    informasjon = await RaceplansAdapter().update_start_time(
+        "token", "event-1", 2, "10:07:00"
+    )
+    assert backend["bulk"] == [("2", "10:07:00")]
+    assert backend["races"] == []
+    assert informasjon == "Utsettelse på 0:05:00 fra heat 2. "
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("bulk_error", [404, 503])
+async def test_shift_falls_back_to_race_updates(backend: dict, bulk_error: int) -> None:
+    """Should update the races one by one when the shift endpoint is missing or down."""
+    backend["bulk_error"] = bulk_error
+    await RaceplansAdapter().update_start_time("token", "event-1", 4, "10:02:00")
+    assert sorted(race["start_time"][-8:] for race in backend["races"]) == [
+        "10:02:00",
+        "10:03:00",
+    ]
+
+
+@pytest.mark.integration
+async def test_shift_error_not_hidden(backend: dict) -> None:
+    """Should raise other errors from the shift call, without updating races."""
+    backend["bulk_error"] = 422
+    with pytest.raises(web.HTTPBadRequest):
+        await RaceplansAdapter().update_start_time("token", "event-1", 4, "10:02:00")
+    assert backend["races"] == []
+
+
+@pytest.mark.integration
+async def test_shift_past_midnight_rejected(backend: dict) -> None:
+    """Should not move races to another day, neither in preview nor update."""
+    with pytest.raises(ValueError, match="midnatt"):
+        shift_start_times(RACES, 3, "23:58:00")
+    with pytest.raises(ValueError, match="midnatt"):
+        await RaceplansAdapter().update_start_time("token", "event-1", 3, "23:58:00")
+    assert backend["bulk"] == []
+    assert backend["races"] == []
@@ -0,0 +1,87 @@
+"""Integration test cases for the task status dashboard."""
+
+import asyncio
+
+import pytest
+
+from event_service_gui.adapters import (
+    ContestantsAdapter,
+    RaceclassesAdapter,
+    RaceplansAdapter,
+    StartAdapter,
+    TimeEventsAdapter,
+)
+from event_service_gui.views import tasks
+
+
+@pytest.fixture
+def backend(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Replace backend reads, start list is slow."""
+    delays = {"start": 0.0}
+
+    async def get_all_contestants(*args) -> list:
+        return [{"bib": 1}, {"bib": None}]
+
+    async def get_raceclasses(*args) -> list:
+        return [{"order": 1}]
+
+    async def get_all_races(*args) -> list:
+        return [{"id": "r1"}]
+
+    async def get_all_raceplans(*args) -> list:
+        return [{"id": "p1"}]
+
+    async def validate_raceplan(*args) -> dict:
+        return {}
+
+    async def get_all_starts_by_event(*args) -> list:
+        await asyncio.sleep(delays["start"])
+        return [{"start_entries": [{"bib": 1}]}]
+
+    async def get_time_events_by_event_id(*args) -> list:
+        return [{"timing_point": "Template"}, {"timing_point": "Finish"}]
+
+    monkeypatch.setattr(ContestantsAdapter, "get_all_contestants", get_all_contestants)
+    monkeypatch.setattr(RaceclassesAdapter, "get_raceclasses", get_raceclasses)
+    monkeypatch.setattr(RaceplansAdapter, "get_all_races", get_all_races)
+    monkeypatch.setattr(RaceplansAdapter, "get_all_raceplans", get_all_raceplans)
+    monkeypatch.setattr(RaceplansAdapter, "validate_raceplan", validate_raceplan)
+    monkeypatch.setattr(
+        StartAdapter, "get_all_starts_by_event", get_all_starts_by_event
+    )
+    monkeypatch.setattr(
+        TimeEventsAdapter, "get_time_events_by_event_id", get_time_events_by_event_id
+    )
+    return delays
+
+
+@pytest.mark.integration
+async def test_task_status(backend: dict) -> None:
+    """Should return status from all sections with timings."""
+    task_status = await tasks.get_task_status("token", "1")
+    assert task_status["bib_missing"] == 1
+    assert task_status["done_4"] is True
+    assert task_status["done_6"] is True
+    assert task_status["no_of_starts"] == 1
+    assert task_status["no_of_next_race"] == 1
+    assert task_status["unavailable"] == []
+    assert set(task_status["timings"]) == {
+        "contestants",
+        "raceclasses",
+        "raceplan",
+        "startlist",
+        "next_race",
+    }
+
+
+@pytest.mark.integration
+async def test_slow_section_is_skipped(
+    backend: dict, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should return the other sections when one backend is slow."""
+    backend["start"] = 1
+    monkeypatch.setattr(tasks, "TASK_STATUS_TIMEOUT", 0.05)
+    task_status = await tasks.get_task_status("token", "1")
+    assert task_status["unavailable"] == ["startlist"]
+    assert "done_8" not in task_status
+    assert task_status["done_9"] is True
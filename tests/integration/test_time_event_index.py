@@ -0,0 +1,53 @@
+"""Integration test cases for the time event index."""
+
+import pytest
+
+from event_service_gui.services import TimeEventIndex
+from event_service_gui.views.utils import get_enrichced_startlist
+
+TIME_EVENTS = [
+    {"race_id": "r1", "timing_point": "Template", "rank": 1, "next_race": "SA1"},
+    {"race_id": "r1", "timing_point": "Template", "rank": 2, "next_race": "Ute"},
+    {"race_id": "r1", "timing_point": "Start", "bib": 10, "registration_time": "1"},
+    {"race_id": "r1", "timing_point": "DNS", "bib": 10, "registration_time": "2"},
+    {"race_id": "r2", "timing_point": "Start", "bib": 11, "registration_time": "3"},
+]
+
+
+@pytest.mark.integration
+def test_lookup_by_bib_and_rank() -> None:
+    """Should find time events by timing point and bib, and templates by rank."""
+    index = TimeEventIndex(TIME_EVENTS)
+    assert index.get("Start", 11)["race_id"] == "r2"
+    assert index.get("Finish", 11) == {}
+    assert index.template("r1", 2)["next_race"] == "Ute"
+    assert index.template("r2", 1) == {}
+    assert len(index.of_timing_point("Template")) == 2
+
+
+@pytest.mark.integration
+def test_latest_registration_wins() -> None:
+    """Should return the last registered of several timing points."""
+    index = TimeEventIndex(TIME_EVENTS)
+    assert index.latest(10, ["Start", "DNS"])["timing_point"] == "DNS"
+    assert index.of_race("r2").latest(10, ["Start", "DNS"]) == {}
+
+
+@pytest.mark.integration
+async def test_startlist_shows_next_race_per_position() -> None:
+    """Should set next race from the template of each starting position."""
+    race = {
+        "id": "r1",
+        "start_entries": [
+            {"bib": 10, "club": "Lyn"},
+            {"bib": 12, "club": "Lyn"},
+            {"bib": 13, "club": "Lyn"},
+        ],
+    }
+    startlist = await get_enrichced_startlist(
+        {"token": "token"}, race, TimeEventIndex(TIME_EVENTS)
+    )
+
+    # before the index this was never set, the template branch was unreachable
+    assert [entry.get("next_race") for entry in startlist] == ["SA1", "Ute", None]
+    assert startlist[0]["start_status"] == "DNS"
@@ -0,0 +1,135 @@
+"""Integration test cases for the time event store."""
+
+from collections import OrderedDict
+from typing import Any
+
+from aiohttp import hdrs, web
+import pytest
+
+from event_service_gui.adapters import (
+    TimeEventsAdapter,
+    time_event_store,
+    time_events_adapter,
+)
+from event_service_gui.adapters.time_event_store import (
+    TimeEventStore,
+    get_time_event_store,
+)
+
+
+def time_event(te_id: str, rank: int = 1) -> dict:
+    """Return a time event."""
+    return {"id": te_id, "bib": int(te_id), "rank": rank}
+
+
+@pytest.mark.integration
+def test_merge_returns_changes() -> None:
+    """Should find added, changed and removed time events."""
+    store = TimeEventStore()
+    first_version = store.version
+    store.merge([time_event("1"), time_event("2")])
+    changes = store.merge([time_event("1", rank=3), time_event("3")])
+    assert changes == {
+        "added": [time_event("3")],
+        "changed": [time_event("1", rank=3)],
+        "removed": ["2"],
+    }
+    assert store.version == first_version + 2
+
+
+@pytest.mark.integration
+def test_merge_keeps_unchanged_time_events() -> None:
+    """Should keep identity of unchanged time events and version if no change."""
+    store = TimeEventStore()
+    store.merge([time_event("1"), time_event("2")])
+    first = store.time_events["1"]
+    version = store.version
+    store.merge([time_event("1"), time_event("2")])
+    assert store.time_events["1"] is first
+    assert store.version == version
+
+
+@pytest.mark.integration
+def test_changes_since_cursor() -> None:
+    """Should combine changes of several merges since a version."""
+    store = TimeEventStore()
+    store.merge([time_event("1"), time_event("2"), time_event("3")])
+    cursor = store.version
+    store.merge([time_event("1", rank=2), time_event("2"), time_event("4")])
+    store.merge([time_event("1", rank=3), time_event("3"), time_event("5")])
+    store.merge([time_event("1", rank=3), time_event("3")])
+
+    changes = store.changes_since(cursor)
+    assert changes == {
+        "added": [],
+        "changed": [time_event("1", rank=3), time_event("3")],
+        "removed": ["2"],
+    }
+    assert store.changes_since(store.version) == {
+        "added": [],
+        "changed": [],
+        "removed": [],
+    }
+
+
+@pytest.mark.integration
+def test_changes_since_too_old() -> None:
+    """Should return None when the cursor is older than the log."""
+    store = TimeEventStore()
+    for rank in range(150):
+        store.merge([time_event("1", rank=rank)])
+    assert store.changes_since(1) is None
+    assert store.changes_since(store.version - 5)["changed"] == [
+        time_event("1", rank=149)
+    ]
+
+
+@pytest.mark.integration
+async def test_sync_time_events(
+    aiohttp_server: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Should merge fetched time events, and not fetch them again if unchanged."""
+    requests = []
+
+    async def get_time_events(request: web.Request) -> web.Response:
+        requests.append(request.headers.get(hdrs.IF_NONE_MATCH))
+        if request.headers.get(hdrs.IF_NONE_MATCH) == '"v1"':
+            return web.Response(status=304)
+        return web.json_response(
+            [time_event("1"), time_event("2")], headers={hdrs.ETAG: '"v1"'}
+        )
+
+    app = web.Application()
+    app.router.add_get("/time-events", get_time_events)
+    server = await aiohttp_server(app)
+    url = str(server.make_url("")).rstrip("/")
+    monkeypatch.setattr(time_events_adapter, "RACE_SERVICE_URL", url)
+
+    cursor = get_time_event_store("store-event").version
+    store = await TimeEventsAdapter().sync_time_events("token", "store-event")
+    assert [te["id"] for te in store.list()] == ["1", "2"]
+    assert store.changes_since(cursor)["added"] == [time_event("1"), time_event("2")]
+
+    version = store.version
+    await TimeEventsAdapter().sync_time_events("token", "store-event")
+    assert requests == [None, '"v1"']
+    assert store.version == version
+    assert len(store.list()) == 2
+
+
+@pytest.mark.integration
+def test_stores_evicted_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Should keep at most CACHE_MAX_ENTRIES stores, and not mix up their versions."""
+    monkeypatch.setattr(time_event_store, "CACHE_MAX_ENTRIES", 2)
+    monkeypatch.setattr(time_event_store, "_stores", OrderedDict())
+    evicted = get_time_event_store("1")
+    evicted.merge([time_event("1")])
+    cursor = evicted.version
+    get_time_event_store("2")
+    get_time_event_store("3")
+    assert list(time_event_store._stores) == ["2", "3"]
+
+    store = get_time_event_store("1")
+    assert store is not evicted
+    store.merge([time_event("1", rank=2)])
+    assert store.changes_since(cursor) is None